@@ -1,4 +1,21 @@
 db = db.getSiblingDB("swift_codes_db");
 db.swift_codes.createIndex({ swiftCode: 1 }, { unique: true });
-db.swift_codes.createIndex({ swiftCodePrefix8: 1, isHeadquarter: 1 });
-db.swift_codes.createIndex({ countryISO2: 1 });
\ No newline at end of file
+// Covering indexes: they hold every field branch lookups and country listings return
+db.swift_codes.createIndex({
+  swiftCodePrefix8: 1,
+  isHeadquarter: 1,
+  swiftCode: 1,
+  address: 1,
+  bankName: 1,
+  countryISO2: 1,
+  countryName: 1,
+});
+db.swift_codes.createIndex({
+  countryISO2: 1,
+  swiftCode: 1,
+  address: 1,
+  bankName: 1,
+  isHeadquarter: 1,
+  countryName: 1,
+});
+db.swift_codes.createIndex({ updatedAt: -1 });
@@ -0,0 +1,102 @@
+import json
+import argparse
+import timeit
+
+from pydantic import TypeAdapter
+
+from swiftatlas.schemas.swift_schemas import (
+    SwiftCodeBase,
+    SwiftCodeCountryGroup,
+    construct_country_group,
+)
+
+DEFAULT_SIZES = [100, 1000, 5000]
+DEFAULT_REPEAT = 20
+
+country_group_adapter = TypeAdapter(SwiftCodeCountryGroup)
+
+
+def bank_code(n: int) -> str:
+    letters = ""
+    for _ in range(4):
+        n, r = divmod(n, 26)
+        letters += chr(ord("A") + r)
+    return letters
+
+
+def make_docs(size: int) -> list[dict]:
+    """Country documents shaped like the swift_codes collection, one HQ per 10 codes."""
+    docs = []
+    for i in range(size):
+        suffix = "XXX" if i % 10 == 0 else f"{i % 10:03d}"
+        docs.append(
+            {
+                "address": f"{i} BENCHMARK STREET, NEW YORK",
+                "bankName": f"BENCHMARK BANK {i // 10}",
+                "countryISO2": "US",
+                "countryName": "UNITED STATES",
+                "isHeadquarter": suffix == "XXX",
+                "swiftCode": f"{bank_code(i // 10)}US33{suffix}",
+            }
+        )
+    return docs
+
+
+def validated_response(docs: list[dict]) -> bytes:
+    """The previous read path: validate every document, then let FastAPI validate
+    the returned model against response_model and encode it with json.dumps."""
+    group = SwiftCodeCountryGroup(
+        countryISO2="US",
+        countryName=docs[0]["countryName"],
+        swiftCodes=[SwiftCodeBase.model_validate(doc) for doc in docs],
+    )
+    checked = country_group_adapter.validate_python(group.model_dump())
+    content = country_group_adapter.dump_python(checked, mode="json", exclude_none=True)
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+def trusted_response(docs: list[dict]) -> bytes:
+    """The trusted read path: model_construct and a single model_dump_json."""
+    group = construct_country_group("US", docs[0]["countryName"], docs)
+    return group.model_dump_json(exclude_none=True).encode()
+
+
+def run(sizes: list[int], repeat: int):
+    print(f"{'codes':>8} {'validated ms':>14} {'trusted ms':>12} {'saved':>8}")
+    for size in sizes:
+        docs = make_docs(size)
+        assert json.loads(validated_response(docs)) == json.loads(
+            trusted_response(docs)
+        )
+        validated = min(
+            timeit.repeat(lambda: validated_response(docs), number=1, repeat=repeat)
+        )
+        trusted = min(
+            timeit.repeat(lambda: trusted_response(docs), number=1, repeat=repeat)
+        )
+        print(
+            f"{size:>8} {validated * 1000:>14.2f} {trusted * 1000:>12.2f} "
+            f"{(1 - trusted / validated) * 100:>7.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-request CPU of the validated and trusted read paths "
+        "for GET /v1/swift-codes/country/{country_iso2_code}."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Number of SWIFT codes in the benchmarked country.",
+        default=DEFAULT_SIZES,
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="Runs per size; the fastest one is reported.",
+        default=DEFAULT_REPEAT,
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
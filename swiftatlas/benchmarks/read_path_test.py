@@ -0,0 +1,12 @@
+import json
+
+from swiftatlas.benchmarks.read_path import (
+    make_docs,
+    trusted_response,
+    validated_response,
+)
+
+
+def test_read_paths_return_the_same_body():
+    docs = make_docs(25)
+    assert json.loads(trusted_response(docs)) == json.loads(validated_response(docs))
@@ -0,0 +1,48 @@
+import argparse
+import timeit
+
+from swiftatlas.benchmarks.read_path import DEFAULT_REPEAT, DEFAULT_SIZES, make_docs
+from swiftatlas.routers.responses import JSON_SERIALIZERS, model_response
+from swiftatlas.schemas.swift_schemas import construct_country_group
+
+
+def run(sizes: list[int], repeat: int):
+    print(
+        f"{'codes':>8} " + " ".join(f"{name + ' ms':>12}" for name in JSON_SERIALIZERS)
+    )
+    for size in sizes:
+        docs = make_docs(size)
+        group = construct_country_group("US", docs[0]["countryName"], docs)
+        timings = []
+        for serializer in JSON_SERIALIZERS:
+            best = min(
+                timeit.repeat(
+                    lambda: model_response(group, serializer, exclude_none=True),
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+            timings.append(best)
+        print(f"{size:>8} " + " ".join(f"{t * 1000:>12.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the response serializers selectable with "
+        "SWIFT_JSON_SERIALIZER on a country response."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Number of SWIFT codes in the benchmarked country.",
+        default=DEFAULT_SIZES,
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="Runs per size; the fastest one is reported.",
+        default=DEFAULT_REPEAT,
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
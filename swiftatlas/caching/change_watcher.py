@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from swiftatlas.repositories.swift_repository import SwiftRepository
+
+logger = logging.getLogger(__name__)
+
+# Returned by standalone servers, which do not support change streams
+CHANGE_STREAMS_UNSUPPORTED_CODES = {40573}
+UPSERT_OPERATIONS = {"insert", "replace", "update"}
+RESET_OPERATIONS = {"drop", "rename", "dropDatabase", "invalidate"}
+# Resets requested within this delay of each other share a single index rebuild
+RESET_DELAY_SECONDS = 0.1
+
+
+class ChangeWatcher:
+    """
+    Keeps this replica's lookup cache and in-memory index in line with writes made
+    through other replicas. Follows the collection's change stream, and falls back
+    to polling the updatedAt/count watermark when change streams are unavailable.
+    """
+
+    def __init__(
+        self,
+        swift_repo: SwiftRepository,
+        poll_interval: float,
+        reset_delay: float = RESET_DELAY_SECONDS,
+    ):
+        self.swift_repo = swift_repo
+        self.poll_interval = poll_interval
+        self.reset_delay = reset_delay
+        self.reset_task: asyncio.Task | None = None
+        self._reset_requested = False
+
+    async def run(self):
+        try:
+            await self._run()
+        finally:
+            if self.reset_task is not None:
+                self.reset_task.cancel()
+
+    async def _run(self):
+        resync = False
+        while True:
+            try:
+                await self._watch(resync)
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED_CODES:
+                    logger.warning(
+                        f"Change streams unavailable ({e}), polling for changes "
+                        f"every {self.poll_interval} s"
+                    )
+                    await self._poll()
+                    return
+                logger.error(f"Change stream failed: {e}")
+            except PyMongoError as e:
+                logger.error(f"Change stream failed: {e}")
+            resync = True
+            await asyncio.sleep(self.poll_interval)
+
+    async def _watch(self, resync: bool):
+        async with self.swift_repo.client.watch(
+            full_document="updateLookup",
+            full_document_before_change="whenAvailable",
+        ) as stream:
+            logger.info("Watching SWIFT code changes through a change stream")
+            if resync:
+                # Anything may have changed while no stream was open
+                await self.reset()
+            async for change in stream:
+                await self.apply_change(change)
+
+    async def _poll(self):
+        watermark = None
+        while True:
+            try:
+                current = await self.swift_repo.get_watermark()
+                if watermark is not None and current != watermark:
+                    logger.info("SWIFT codes changed, resetting local state")
+                    await self.reset()
+                watermark = current
+            except PyMongoError as e:
+                logger.error(f"Polling for SWIFT code changes failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def apply_change(self, change: dict):
+        operation = change["operationType"]
+        if operation in UPSERT_OPERATIONS and change.get("fullDocument"):
+            doc = change["fullDocument"]
+            self.swift_repo.invalidate([doc["swiftCode"]])
+            if self.swift_repo.index is not None:
+                self.swift_repo.index.upsert(doc)
+        elif operation == "delete":
+            swift_code = self._deleted_swift_code(change)
+            if swift_code is None:
+                # Neither a pre-image nor an indexed _id tells which code it was
+                self.request_reset()
+                return
+            self.swift_repo.invalidate([swift_code])
+            if self.swift_repo.index is not None:
+                self.swift_repo.index.remove(swift_code)
+        elif operation in UPSERT_OPERATIONS or operation in RESET_OPERATIONS:
+            # Updates without a document, or the whole collection changed
+            self.request_reset()
+
+    def _deleted_swift_code(self, change: dict) -> str | None:
+        if change.get("fullDocumentBeforeChange"):
+            return change["fullDocumentBeforeChange"]["swiftCode"]
+        doc_id = change.get("documentKey", {}).get("_id")
+        if doc_id is None or self.swift_repo.index is None:
+            return None
+        return self.swift_repo.index.swift_code_for_id(doc_id)
+
+    def request_reset(self):
+        """
+        Drops cached lookups at once and schedules an index rebuild, shared by
+        every reset requested until it starts.
+        """
+        if self.swift_repo.cache is not None:
+            self.swift_repo.cache.clear()
+        self._reset_requested = True
+        if self.reset_task is None or self.reset_task.done():
+            self.reset_task = asyncio.create_task(self._run_requested_resets())
+
+    async def _run_requested_resets(self):
+        while self._reset_requested:
+            await asyncio.sleep(self.reset_delay)
+            self._reset_requested = False
+            try:
+                await self.reset()
+            except PyMongoError as e:
+                logger.error(f"Error resetting local SWIFT state: {e}")
+
+    async def reset(self):
+        """Drops all cached lookups and rebuilds the in-memory index."""
+        if self.swift_repo.cache is not None:
+            self.swift_repo.cache.clear()
+        if self.swift_repo.index is not None:
+            await self.swift_repo.index.refresh(self.swift_repo.client)
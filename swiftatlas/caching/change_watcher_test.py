@@ -0,0 +1,204 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import OperationFailure
+
+from swiftatlas.caching.change_watcher import ChangeWatcher
+from swiftatlas.caching.swift_index import SwiftIndex
+from swiftatlas.caching.ttl_cache import TTLCache
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.swift_repository import SwiftRepository
+
+
+def make_doc(swift_code, doc_id=None):
+    return {
+        "_id": doc_id or f"id-{swift_code}",
+        "swiftCode": swift_code,
+        "address": "1 Main St",
+        "bankName": "Test Bank",
+        "countryISO2": "PL",
+        "isHeadquarter": swift_code.endswith("XXX"),
+        "countryName": "POLAND",
+    }
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for change in self.changes:
+            yield change
+
+
+@pytest.fixture
+def mock_mongo_client():
+    client = MagicMock(spec=MongoMotorClient)
+    client.watch = MagicMock()
+    return client
+
+
+@pytest.fixture
+def swift_cache():
+    return TTLCache(max_size=10, ttl=60)
+
+
+@pytest.fixture
+def swift_index():
+    index = SwiftIndex()
+    index.upsert(make_doc("BANKPLPWXXX"))
+    index.upsert(make_doc("BANKPLPWAAA"))
+    index.refresh = AsyncMock()
+    return index
+
+
+@pytest.fixture
+def swift_repository(mock_mongo_client, swift_cache, swift_index):
+    repo = SwiftRepository(mock_mongo_client, cache=swift_cache, index=swift_index)
+    repo.get_watermark = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def watcher(swift_repository):
+    return ChangeWatcher(swift_repository, poll_interval=0.01, reset_delay=0.01)
+
+
+@pytest.mark.asyncio
+async def test_apply_insert(watcher, swift_cache, swift_index):
+    swift_cache.set("BANKPLPWXXX", "cached hq")
+
+    await watcher.apply_change(
+        {"operationType": "insert", "fullDocument": make_doc("BANKPLPWBBB")}
+    )
+
+    assert swift_cache.get("BANKPLPWXXX") is None
+    hq = swift_index.get_swift_with_branches("BANKPLPWXXX")
+    assert [b.swiftCode for b in hq.branches] == ["BANKPLPWAAA", "BANKPLPWBBB"]
+    swift_index.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_apply_delete_with_pre_image(watcher, swift_cache, swift_index):
+    swift_cache.set("BANKPLPWAAA", "cached branch")
+
+    await watcher.apply_change(
+        {
+            "operationType": "delete",
+            "fullDocumentBeforeChange": make_doc("BANKPLPWAAA"),
+        }
+    )
+
+    assert len(swift_cache) == 0
+    assert swift_index.get_swift_with_branches("BANKPLPWAAA") is None
+    swift_index.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_apply_bulk_delete_by_document_key(watcher, swift_cache, swift_index):
+    swift_cache.set("BANKPLPWXXX", "cached hq")
+    swift_cache.set("OTHRPLPWXXX", "cached other")
+
+    # One deleteMany, one event per document, without pre-images
+    for swift_code in ["BANKPLPWAAA", "BANKPLPWXXX"]:
+        await watcher.apply_change(
+            {"operationType": "delete", "documentKey": {"_id": f"id-{swift_code}"}}
+        )
+
+    assert swift_cache.get("BANKPLPWXXX") is None
+    assert swift_cache.get("OTHRPLPWXXX") == "cached other"
+    assert len(swift_index) == 0
+    assert swift_index.swift_code_for_id("id-BANKPLPWXXX") is None
+    assert watcher.reset_task is None
+    swift_index.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_apply_bulk_delete_of_unknown_ids_resets_once(
+    watcher, mock_mongo_client, swift_cache, swift_index
+):
+    swift_cache.set("OTHRPLPWXXX", "cached")
+
+    for i in range(50):
+        await watcher.apply_change(
+            {"operationType": "delete", "documentKey": {"_id": f"unknown-{i}"}}
+        )
+
+    assert len(swift_cache) == 0
+    await watcher.reset_task
+    swift_index.refresh.assert_awaited_once_with(mock_mongo_client)
+
+
+@pytest.mark.asyncio
+async def test_reset_requested_during_rebuild_runs_once_more(watcher, swift_index):
+    rebuilding = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_refresh(client):
+        rebuilding.set()
+        await release.wait()
+
+    swift_index.refresh.side_effect = slow_refresh
+    await watcher.apply_change({"operationType": "drop"})
+    await rebuilding.wait()
+    for _ in range(3):
+        await watcher.apply_change({"operationType": "delete", "documentKey": {}})
+    release.set()
+    await watcher.reset_task
+
+    assert swift_index.refresh.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_apply_drop_resets(watcher, swift_index):
+    await watcher.apply_change({"operationType": "drop"})
+    await watcher.reset_task
+    swift_index.refresh.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_follows_change_stream(watcher, mock_mongo_client, swift_index):
+    mock_mongo_client.watch.return_value = FakeChangeStream(
+        [{"operationType": "insert", "fullDocument": make_doc("BANKPLPWBBB")}]
+    )
+
+    task = asyncio.create_task(watcher.run())
+    await asyncio.sleep(0.005)
+    task.cancel()
+
+    mock_mongo_client.watch.assert_called_with(
+        full_document="updateLookup", full_document_before_change="whenAvailable"
+    )
+    assert swift_index.get_swift_with_branches("BANKPLPWBBB") is not None
+
+
+@pytest.mark.asyncio
+async def test_run_falls_back_to_polling(
+    watcher, mock_mongo_client, swift_repository, swift_cache, swift_index
+):
+    mock_mongo_client.watch.side_effect = OperationFailure(
+        "The $changeStream stage is only supported on replica sets", code=40573
+    )
+    swift_repository.get_watermark.side_effect = [
+        ("t1", 2),
+        ("t1", 2),
+        ("t2", 3),
+    ] + [("t2", 3)] * 100
+    swift_cache.set("BANKPLPWXXX", "cached")
+
+    task = asyncio.create_task(watcher.run())
+    await asyncio.sleep(0.1)
+    task.cancel()
+
+    assert swift_repository.get_watermark.await_count >= 3
+    assert len(swift_cache) == 0
+    swift_index.refresh.assert_awaited_once()
@@ -0,0 +1,207 @@
+import time
+import asyncio
+import logging
+
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.schemas.swift_schemas import (
+    SwiftCodeBase,
+    SwiftCodeDetailed,
+    SwiftCodeHeadquarterGroup,
+    SwiftCodeCountryGroup,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_PROJECTION = {
+    "_id": 1,
+    "swiftCode": 1,
+    "address": 1,
+    "bankName": 1,
+    "countryISO2": 1,
+    "isHeadquarter": 1,
+    "countryName": 1,
+}
+
+
+class SwiftIndex:
+    """
+    In-memory copy of the swift_codes collection, indexed by code, by 8-character
+    prefix and by country, so lookups are answered without a database round trip.
+    Entries come from validated documents, so models are built with model_construct.
+    MongoDB stays the source of truth: the index is rebuilt by refresh() and kept
+    current between rebuilds through upsert() and remove().
+    """
+
+    def __init__(self):
+        # swiftCode -> (address, bankName, countryISO2, isHeadquarter, countryName)
+        self._by_code: dict[str, tuple] = {}
+        # Insertion-ordered sets of swiftCodes, dicts with None values
+        self._branches_by_prefix: dict[str, dict[str, None]] = {}
+        self._by_country: dict[str, dict[str, None]] = {}
+        # Document _id <-> swiftCode, so deletes known by documentKey only apply
+        self._code_by_id: dict = {}
+        self._id_by_code: dict = {}
+        self.built_at: float | None = None
+        self.build_seconds: float | None = None
+        # One log per rebuild in progress of the writes made meanwhile, replayed
+        # on the rebuilt maps so that they are not lost in the swap
+        self._rebuild_logs: list[list[tuple[str, dict | str]]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "countries": len(self._by_country),
+            "builtAt": self.built_at,
+            "buildSeconds": self.build_seconds,
+        }
+
+    async def refresh(self, client: MongoMotorClient):
+        """Rebuilds the index from the collection and swaps it in at once."""
+        started = time.perf_counter()
+        fresh = SwiftIndex()
+        writes: list[tuple[str, dict | str]] = []
+        self._rebuild_logs.append(writes)
+        try:
+            async for doc in client.find({}, INDEX_PROJECTION):
+                fresh.upsert(doc)
+        finally:
+            self._rebuild_logs.remove(writes)
+        for operation, value in writes:
+            if operation == "upsert":
+                fresh.upsert(value)
+            else:
+                fresh.remove(value)
+
+        self._by_code = fresh._by_code
+        self._branches_by_prefix = fresh._branches_by_prefix
+        self._by_country = fresh._by_country
+        self._code_by_id = fresh._code_by_id
+        self._id_by_code = fresh._id_by_code
+        self.build_seconds = time.perf_counter() - started
+        self.built_at = time.time()
+        logger.info(
+            f"Built in-memory SWIFT index with {len(self)} codes "
+            f"in {self.build_seconds:.2f} s"
+        )
+
+    async def refresh_periodically(self, client: MongoMotorClient, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh(client)
+            except Exception as e:
+                logger.error(f"Error refreshing in-memory SWIFT index: {e}")
+
+    def upsert(self, doc: dict):
+        for writes in self._rebuild_logs:
+            writes.append(("upsert", doc))
+        swift_code = doc["swiftCode"]
+        # Replacements made by swiftCode keep the _id of the replaced document
+        doc_id = doc.get("_id", self._id_by_code.get(swift_code))
+        self._remove(swift_code)
+        self._by_code[swift_code] = (
+            doc["address"],
+            doc["bankName"],
+            doc["countryISO2"],
+            doc["isHeadquarter"],
+            doc["countryName"],
+        )
+        if not doc["isHeadquarter"]:
+            self._branches_by_prefix.setdefault(swift_code[:8], {})[swift_code] = None
+        self._by_country.setdefault(doc["countryISO2"], {})[swift_code] = None
+        if doc_id is not None:
+            self._code_by_id[doc_id] = swift_code
+            self._id_by_code[swift_code] = doc_id
+
+    def swift_code_for_id(self, doc_id) -> str | None:
+        return self._code_by_id.get(doc_id)
+
+    def remove(self, swift_code: str):
+        for writes in self._rebuild_logs:
+            writes.append(("remove", swift_code))
+        self._remove(swift_code)
+
+    def _remove(self, swift_code: str):
+        doc_id = self._id_by_code.pop(swift_code, None)
+        if doc_id is not None:
+            self._code_by_id.pop(doc_id, None)
+        entry = self._by_code.pop(swift_code, None)
+        if entry is None:
+            return
+        _, _, country_iso2, is_headquarter, _ = entry
+        if not is_headquarter:
+            self._discard(self._branches_by_prefix, swift_code[:8], swift_code)
+        self._discard(self._by_country, country_iso2, swift_code)
+
+    @staticmethod
+    def _discard(index: dict[str, dict[str, None]], key: str, swift_code: str):
+        codes = index.get(key)
+        if codes is None:
+            return
+        codes.pop(swift_code, None)
+        if not codes:
+            del index[key]
+
+    def _base(self, swift_code: str) -> SwiftCodeBase:
+        address, bank_name, country_iso2, is_headquarter, _ = self._by_code[swift_code]
+        return SwiftCodeBase.model_construct(
+            address=address,
+            bankName=bank_name,
+            countryISO2=country_iso2,
+            isHeadquarter=is_headquarter,
+            swiftCode=swift_code,
+        )
+
+    def get_swift_with_branches(
+        self, swift_code: str
+    ) -> SwiftCodeHeadquarterGroup | SwiftCodeDetailed | None:
+        entry = self._by_code.get(swift_code)
+        if entry is None:
+            return None
+        address, bank_name, country_iso2, is_headquarter, country_name = entry
+        fields = dict(
+            address=address,
+            bankName=bank_name,
+            countryISO2=country_iso2,
+            isHeadquarter=is_headquarter,
+            swiftCode=swift_code,
+            countryName=country_name,
+        )
+        if is_headquarter:
+            branches = [
+                self._base(code)
+                for code in self._branches_by_prefix.get(swift_code[:8], {})
+            ]
+            return SwiftCodeHeadquarterGroup.model_construct(
+                **fields, branches=branches
+            )
+        return SwiftCodeDetailed.model_construct(**fields)
+
+    def get_swifts_by_country(
+        self, country_iso2_code: str, limit: int | None = None, after: str | None = None
+    ) -> SwiftCodeCountryGroup | None:
+        codes = self._by_country.get(country_iso2_code)
+        if not codes:
+            return None
+        country_name = self._by_code[next(iter(codes))][4]
+        next_after = None
+        if limit is not None or after is not None:
+            codes = sorted(c for c in codes if after is None or c > after)
+            if limit is not None and len(codes) > limit:
+                codes = codes[:limit]
+                next_after = codes[-1]
+            if not codes:
+                return None
+        return SwiftCodeCountryGroup.model_construct(
+            countryISO2=country_iso2_code,
+            countryName=country_name,
+            swiftCodes=[self._base(code) for code in codes],
+            nextAfter=next_after,
+        )
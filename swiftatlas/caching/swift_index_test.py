@@ -0,0 +1,189 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from swiftatlas.caching.swift_index import INDEX_PROJECTION, SwiftIndex
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.schemas.swift_schemas import (
+    SwiftCodeDetailed,
+    SwiftCodeHeadquarterGroup,
+    SwiftCodeCountryGroup,
+)
+
+
+def make_doc(swift_code, country_iso2="PL", country_name="POLAND"):
+    return {
+        "swiftCode": swift_code,
+        "address": f"Address of {swift_code}",
+        "bankName": f"Bank {swift_code[:4]}",
+        "countryISO2": country_iso2,
+        "isHeadquarter": swift_code.endswith("XXX"),
+        "countryName": country_name,
+    }
+
+
+DOCS = [
+    make_doc("BANKPLPWXXX"),
+    make_doc("BANKPLPWAAA"),
+    make_doc("BANKPLPWBBB"),
+    make_doc("OTHRDEFFXXX", "DE", "GERMANY"),
+]
+
+
+@pytest.fixture
+def mock_mongo_client():
+    client = MagicMock(spec=MongoMotorClient)
+
+    def find(query, projection=None):
+        async def async_gen():
+            for doc in DOCS:
+                yield doc
+
+        return async_gen()
+
+    client.find = MagicMock(side_effect=find)
+    return client
+
+
+@pytest.fixture
+def swift_index():
+    index = SwiftIndex()
+    for doc in DOCS:
+        index.upsert(doc)
+    return index
+
+
+@pytest.mark.asyncio
+async def test_refresh(mock_mongo_client):
+    index = SwiftIndex()
+    assert not index.ready
+
+    await index.refresh(mock_mongo_client)
+
+    mock_mongo_client.find.assert_called_once_with({}, INDEX_PROJECTION)
+    assert index.ready
+    stats = index.stats()
+    assert stats["size"] == 4
+    assert stats["countries"] == 2
+    assert stats["buildSeconds"] >= 0
+    assert stats["builtAt"] is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_replaces_previous_content(mock_mongo_client, swift_index):
+    swift_index.upsert(make_doc("GONEPLPWXXX"))
+
+    await swift_index.refresh(mock_mongo_client)
+
+    assert swift_index.get_swift_with_branches("GONEPLPWXXX") is None
+    assert len(swift_index) == 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_periodically(mock_mongo_client):
+    index = SwiftIndex()
+    task = asyncio.create_task(index.refresh_periodically(mock_mongo_client, 0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    assert index.ready
+    assert mock_mongo_client.find.call_count >= 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_writes_made_during_rebuild(swift_index):
+    client = MagicMock(spec=MongoMotorClient)
+
+    def find(query, projection=None):
+        async def slow_cursor():
+            for doc in DOCS:
+                yield doc
+                # API writes landing while the rebuild is still reading
+                if doc["swiftCode"] == "BANKPLPWXXX":
+                    swift_index.upsert(make_doc("NEWWPLPWXXX"))
+                    swift_index.remove("OTHRDEFFXXX")
+
+        return slow_cursor()
+
+    client.find = MagicMock(side_effect=find)
+
+    await swift_index.refresh(client)
+
+    assert swift_index.get_swift_with_branches("NEWWPLPWXXX") is not None
+    assert swift_index.get_swift_with_branches("OTHRDEFFXXX") is None
+    assert len(swift_index) == 4
+    assert swift_index._rebuild_logs == []
+
+
+def test_get_headquarter_with_branches(swift_index):
+    result = swift_index.get_swift_with_branches("BANKPLPWXXX")
+    assert isinstance(result, SwiftCodeHeadquarterGroup)
+    assert result.countryName == "POLAND"
+    assert [b.swiftCode for b in result.branches] == ["BANKPLPWAAA", "BANKPLPWBBB"]
+
+
+def test_get_branch(swift_index):
+    result = swift_index.get_swift_with_branches("BANKPLPWAAA")
+    assert isinstance(result, SwiftCodeDetailed)
+    assert not isinstance(result, SwiftCodeHeadquarterGroup)
+    assert result.isHeadquarter is False
+
+
+def test_get_missing(swift_index):
+    assert swift_index.get_swift_with_branches("MISSPLPWXXX") is None
+    assert swift_index.get_swifts_by_country("FR") is None
+
+
+def test_get_swifts_by_country(swift_index):
+    result = swift_index.get_swifts_by_country("PL")
+    assert isinstance(result, SwiftCodeCountryGroup)
+    assert result.countryName == "POLAND"
+    assert [s.swiftCode for s in result.swiftCodes] == [
+        "BANKPLPWXXX",
+        "BANKPLPWAAA",
+        "BANKPLPWBBB",
+    ]
+
+
+def test_upsert_replaces_entry(swift_index):
+    moved = make_doc("BANKPLPWAAA", "DE", "GERMANY")
+    swift_index.upsert(moved)
+
+    assert len(swift_index) == 4
+    pl_codes = [s.swiftCode for s in swift_index.get_swifts_by_country("PL").swiftCodes]
+    assert "BANKPLPWAAA" not in pl_codes
+    assert swift_index.get_swift_with_branches("BANKPLPWAAA").countryISO2 == "DE"
+
+
+def test_remove(swift_index):
+    swift_index.remove("BANKPLPWAAA")
+    swift_index.remove("OTHRDEFFXXX")
+    swift_index.remove("MISSPLPWXXX")
+
+    hq = swift_index.get_swift_with_branches("BANKPLPWXXX")
+    assert [b.swiftCode for b in hq.branches] == ["BANKPLPWBBB"]
+    assert swift_index.get_swifts_by_country("DE") is None
+    assert len(swift_index) == 2
+
+
+def test_swift_code_for_id(swift_index):
+    swift_index.upsert({**make_doc("NEWWPLPWXXX"), "_id": "id-1"})
+    assert swift_index.swift_code_for_id("id-1") == "NEWWPLPWXXX"
+
+    # Replacements by swiftCode carry no _id and keep the known one
+    swift_index.upsert(make_doc("NEWWPLPWXXX"))
+    assert swift_index.swift_code_for_id("id-1") == "NEWWPLPWXXX"
+
+    swift_index.remove("NEWWPLPWXXX")
+    assert swift_index.swift_code_for_id("id-1") is None
+
+
+def test_get_swifts_by_country_pages(swift_index):
+    first = swift_index.get_swifts_by_country("PL", limit=2)
+    assert [s.swiftCode for s in first.swiftCodes] == ["BANKPLPWAAA", "BANKPLPWBBB"]
+    assert first.nextAfter == "BANKPLPWBBB"
+
+    last = swift_index.get_swifts_by_country("PL", limit=2, after=first.nextAfter)
+    assert [s.swiftCode for s in last.swiftCodes] == ["BANKPLPWXXX"]
+    assert last.nextAfter is None
+
+    assert swift_index.get_swifts_by_country("PL", after="BANKPLPWXXX") is None
@@ -0,0 +1,66 @@
+import pytest
+
+from swiftatlas.caching.ttl_cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+def test_get_and_set(timer):
+    cache = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_entries_expire(timer):
+    cache = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    timer.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted(timer):
+    cache = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_set_refreshes_ttl(timer):
+    cache = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 8
+    cache.set("a", 2)
+    timer.now = 15
+    assert cache.get("a") == 2
+
+
+def test_delete_and_clear(timer):
+    cache = TTLCache(max_size=3, ttl=10, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
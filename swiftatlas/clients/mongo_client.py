@@ -1,37 +1,166 @@
 import logging
 from bson import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+    _ServerMode,
+)
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from swiftatlas import settings
 
 logger = logging.getLogger(__name__)
 
+INDEX_NOT_FOUND_ERROR_CODE = 27
+
+
+def mongo_client_options() -> dict:
+    """
+    AsyncIOMotorClient keyword arguments from settings. Options left unset keep the
+    driver defaults.
+    """
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+    }
+    if settings.MONGODB_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = int(settings.MONGODB_MAX_IDLE_TIME_MS)
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS)
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    return options
+
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference() -> _ServerMode:
+    """Read preference of the API's read handles, from settings."""
+    mode = READ_PREFERENCES.get(settings.MONGODB_READ_PREFERENCE)
+    if mode is None:
+        raise ValueError(
+            f"MONGODB_READ_PREFERENCE must be one of {', '.join(READ_PREFERENCES)}, "
+            f"got '{settings.MONGODB_READ_PREFERENCE}'"
+        )
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=settings.MONGODB_MAX_STALENESS_SECONDS)
+
 
 class MongoMotorClient:
+    """
+    Wraps one collection. Writes always go to the primary; find, aggregate and
+    get_item use the read handle, built with read_preference, unless primary=True
+    asks for reads that must see the latest writes.
+    """
 
-    def __init__(self, mongo_db: AsyncIOMotorDatabase, collection_name: str):
+    def __init__(
+        self,
+        mongo_db: AsyncIOMotorDatabase,
+        collection_name: str,
+        read_preference: _ServerMode | None = None,
+    ):
         self.db = mongo_db
         self.collection = collection_name
+        self.read_preference = read_preference
+        self._resolve()
+
+    def _resolve(self):
+        # Resolved once instead of on every call; the client reads from the primary
+        self.handle = self.db[self.collection]
+        self.read_handle = (
+            self.db[self.collection].with_options(read_preference=self.read_preference)
+            if self.read_preference is not None
+            else self.handle
+        )
+
+    def find(self, query: dict, projection: dict | None = None, primary: bool = False):
+        handle = self.handle if primary else self.read_handle
+        return handle.find(query, projection)
 
-    def find(self, query: dict):
-        return self.db[self.collection].find(query)
+    def aggregate(self, pipeline: list[dict], primary: bool = False):
+        handle = self.handle if primary else self.read_handle
+        return handle.aggregate(pipeline)
 
     async def put_item(self, item: dict):
-        return await self.db[self.collection].insert_one(item)
+        return await self.handle.insert_one(item)
 
-    async def get_item(self, query: dict):
-        return await self.db[self.collection].find_one(query)
+    async def put_items(self, items: list[dict], ordered: bool = False):
+        return await self.handle.insert_many(items, ordered=ordered)
+
+    async def bulk_write(self, requests: list, ordered: bool = False):
+        return await self.handle.bulk_write(requests, ordered=ordered)
+
+    async def get_item(
+        self, query: dict, projection: dict | None = None, primary: bool = False
+    ):
+        handle = self.handle if primary else self.read_handle
+        return await handle.find_one(query, projection)
 
     async def update_item(self, query: dict, update: dict):
-        return await self.db[self.collection].update_one(query, update)
+        return await self.handle.update_one(query, update)
 
     async def replace_item(self, obj_id: str, item: dict):
-        return await self.db[self.collection].replace_one(
-            {"_id": ObjectId(obj_id)}, item
-        )
+        return await self.handle.replace_one({"_id": ObjectId(obj_id)}, item)
 
     async def delete_item(self, query: dict):
-        return await self.db[self.collection].delete_one(query)
+        return await self.handle.delete_one(query)
+
+    async def find_one_and_delete(self, query: dict, projection: dict | None = None):
+        return await self.handle.find_one_and_delete(query, projection=projection)
+
+    async def create_indexes(self, indexes: list[IndexModel]):
+        return await self.handle.create_indexes(indexes)
+
+    async def drop_indexes(self, names: list[str]):
+        """Drops those of the named indexes that exist."""
+        existing = await self.handle.index_information()
+        for name in names:
+            if name in existing:
+                try:
+                    await self.handle.drop_index(name)
+                except OperationFailure as e:
+                    # Dropped meanwhile, e.g. by another replica starting up
+                    if e.code != INDEX_NOT_FOUND_ERROR_CODE:
+                        raise
+
+    async def explain(
+        self,
+        query: dict,
+        projection: dict | None = None,
+        sort: list[tuple[str, int]] | None = None,
+    ) -> dict:
+        cursor = self.handle.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.explain()
+
+    async def rename(self, new_name: str, drop_target: bool = False):
+        await self.handle.rename(new_name, dropTarget=drop_target)
+        self.collection = new_name
+        self._resolve()
+
+    async def drop(self):
+        return await self.handle.drop()
+
+    async def count(self):
+        return await self.handle.estimated_document_count()
+
+    def watch(self, **kwargs):
+        return self.handle.watch(**kwargs)
 
-    async def scan(self):
+    async def scan(self, projection: dict | None = None):
         # Pass empty dict to find all documents
-        return self.db[self.collection].find({})
+        return self.handle.find({}, projection)
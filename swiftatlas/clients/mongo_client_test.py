@@ -1,8 +1,15 @@
 import pytest
 import pytest_asyncio
+from unittest.mock import MagicMock, patch
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.read_preferences import Primary, SecondaryPreferred
 import motor.motor_asyncio
-from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.clients.mongo_client import (
+    MongoMotorClient,
+    mongo_client_options,
+    read_preference,
+)
 from swiftatlas.settings import MONGODB_URL
 
 TEST_COLLECTION = "test_items"
@@ -31,6 +38,15 @@ async def test_put_item(test_mongo_client: MongoMotorClient):
     assert inserted_item["name"] == "test_item"
 
 
+@pytest.mark.asyncio
+async def test_put_items(test_mongo_client: MongoMotorClient):
+    items = [{"name": "first"}, {"name": "second"}]
+    result = await test_mongo_client.put_items(items)
+    assert len(result.inserted_ids) == 2
+    count = await test_mongo_client.db[TEST_COLLECTION].count_documents({})
+    assert count == 2
+
+
 @pytest.mark.asyncio
 async def test_put_and_get_item(test_mongo_client: MongoMotorClient):
     """Test putting an item and then retrieving it."""
@@ -134,6 +150,65 @@ async def test_scan(test_mongo_client: MongoMotorClient):
     assert names == {"item1", "item2", "item3"}
 
 
+@pytest.mark.asyncio
+async def test_aggregate(test_mongo_client: MongoMotorClient):
+    await test_mongo_client.put_items(
+        [{"name": "item1", "group": "a"}, {"name": "item2", "group": "b"}]
+    )
+    cursor = test_mongo_client.aggregate(
+        [{"$match": {"group": "a"}}, {"$project": {"_id": 0, "name": 1}}]
+    )
+    results = await cursor.to_list(length=10)
+    assert results == [{"name": "item1"}]
+
+
+@pytest.mark.asyncio
+async def test_create_indexes(test_mongo_client: MongoMotorClient):
+    names = await test_mongo_client.create_indexes(
+        [IndexModel([("name", ASCENDING)], unique=True)]
+    )
+    assert names == ["name_1"]
+    info = await test_mongo_client.db[TEST_COLLECTION].index_information()
+    assert info["name_1"]["unique"] is True
+    await test_mongo_client.drop()
+
+
+@pytest.mark.asyncio
+async def test_drop_indexes(test_mongo_client: MongoMotorClient):
+    await test_mongo_client.create_indexes([IndexModel([("name", ASCENDING)])])
+
+    await test_mongo_client.drop_indexes(["name_1", "missing_1"])
+
+    info = await test_mongo_client.db[TEST_COLLECTION].index_information()
+    assert "name_1" not in info
+
+
+@pytest.mark.asyncio
+async def test_explain(test_mongo_client: MongoMotorClient):
+    await test_mongo_client.create_indexes([IndexModel([("name", ASCENDING)])])
+    await test_mongo_client.put_item({"name": "indexed"})
+
+    explained = await test_mongo_client.explain(
+        {"name": "indexed"}, {"_id": 0, "name": 1}, [("name", ASCENDING)]
+    )
+
+    assert "COLLSCAN" not in str(explained["queryPlanner"]["winningPlan"])
+
+
+@pytest.mark.asyncio
+async def test_rename_drops_target(test_mongo_client: MongoMotorClient):
+    target = f"{TEST_COLLECTION}_renamed"
+    await test_mongo_client.db[target].insert_one({"name": "old"})
+    await test_mongo_client.put_item({"name": "new"})
+
+    await test_mongo_client.rename(target, drop_target=True)
+
+    assert test_mongo_client.collection == target
+    results = await test_mongo_client.find({}).to_list(length=10)
+    assert [r["name"] for r in results] == ["new"]
+    await test_mongo_client.drop()
+
+
 @pytest.mark.asyncio
 async def test_get_item_not_found(test_mongo_client: MongoMotorClient):
     non_existent_id = ObjectId()
@@ -166,3 +241,60 @@ async def test_delete_item_not_found(test_mongo_client: MongoMotorClient):
     delete_query = {"_id": non_existent_id}
     result = await test_mongo_client.delete_item(delete_query)
     assert result.deleted_count == 0
+
+
+def test_mongo_client_options():
+    with patch.multiple(
+        "swiftatlas.settings",
+        MONGODB_MAX_POOL_SIZE=50,
+        MONGODB_MIN_POOL_SIZE=5,
+        MONGODB_MAX_IDLE_TIME_MS="60000",
+        MONGODB_WAIT_QUEUE_TIMEOUT_MS=None,
+        MONGODB_COMPRESSORS="zlib",
+    ):
+        options = mongo_client_options()
+
+    assert options == {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "maxIdleTimeMS": 60000,
+        "compressors": "zlib",
+    }
+    # The options are accepted by the driver
+    motor.motor_asyncio.AsyncIOMotorClient(MONGODB_URL, **options).close()
+
+
+def test_read_preference():
+    with patch.multiple(
+        "swiftatlas.settings",
+        MONGODB_READ_PREFERENCE="secondaryPreferred",
+        MONGODB_MAX_STALENESS_SECONDS=120,
+    ):
+        assert read_preference() == SecondaryPreferred(max_staleness=120)
+    with patch("swiftatlas.settings.MONGODB_READ_PREFERENCE", "primary"):
+        assert read_preference() == Primary()
+    with patch("swiftatlas.settings.MONGODB_READ_PREFERENCE", "secondaryOnly"):
+        with pytest.raises(ValueError):
+            read_preference()
+
+
+def test_reads_use_read_handle_and_writes_primary():
+    db = MagicMock()
+    client = MongoMotorClient(db, TEST_COLLECTION, SecondaryPreferred())
+    db[TEST_COLLECTION].with_options.assert_called_once_with(
+        read_preference=SecondaryPreferred()
+    )
+    assert client.read_handle is not client.handle
+
+    client.find({"name": "read"})
+    client.find({"name": "latest"}, primary=True)
+    client.aggregate([], primary=False)
+
+    client.read_handle.find.assert_called_once_with({"name": "read"}, None)
+    client.handle.find.assert_called_once_with({"name": "latest"}, None)
+    client.read_handle.aggregate.assert_called_once_with([])
+
+
+def test_reads_default_to_primary():
+    client = MongoMotorClient(MagicMock(), TEST_COLLECTION)
+    assert client.read_handle is client.handle
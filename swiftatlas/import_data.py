@@ -3,48 +3,328 @@ import pandas as pd
 import asyncio
 import logging
 import argparse
+import time
+from dataclasses import dataclass
+from typing import Iterable
 from swiftatlas import settings
 
 from swiftatlas.schemas.swift_schemas import SwiftCodeDetailed
+from swiftatlas.schemas.swift_frames import REASON_COLUMN, validate_frame
 from motor.motor_asyncio import AsyncIOMotorClient
+from swiftatlas.repositories.snapshot_repository import CountrySnapshotRepository
 from swiftatlas.repositories.swift_repository import SwiftRepository
-from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.version_repository import (
+    GLOBAL_VERSION_KEY,
+    VersionRepository,
+)
+from swiftatlas.clients.mongo_client import MongoMotorClient, mongo_client_options
+from swiftatlas.readers.swift_readers import FILE_FORMATS, iter_chunks
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 1
 
-async def import_data(file_path: str):
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+
+
+@dataclass
+class DeltaReport:
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Maps spreadsheet columns to SwiftCodeDetailed fields and derives isHeadquarter."""
+    df = df.drop(columns=["CODE TYPE", "TOWN NAME", "TIME ZONE"])
+    df = df.rename(
+        columns={
+            "ADDRESS": "address",
+            "NAME": "bankName",
+            "COUNTRY ISO2 CODE": "countryISO2",
+            "COUNTRY NAME": "countryName",
+            "SWIFT CODE": "swiftCode",
+        },
+    )
+    df["isHeadquarter"] = df["swiftCode"].apply(
+        lambda x: x[8:11] == "XXX" if isinstance(x, str) and len(x) >= 11 else False
+    )
+    return df
+
+
+def validate_chunk(df: pd.DataFrame) -> tuple[list[SwiftCodeDetailed], int]:
+    """
+    Validates a chunk column-wise and returns SwiftCodeDetailed models for the clean
+    rows, together with the invalid row count. The models are built without running
+    the pydantic validators again, since validate_frame already applied the same rules.
+    """
+    clean, rejects = validate_frame(df)
+    for record in rejects.to_dict("records"):
+        logger.warning(
+            f"Skipping invalid row {record.get('swiftCode')}: {record[REASON_COLUMN]}"
+        )
+    swift_codes = [
+        SwiftCodeDetailed.model_construct(**record)
+        for record in clean.to_dict("records")
+    ]
+    return swift_codes, len(rejects)
+
+
+async def import_chunks(
+    chunks: Iterable[pd.DataFrame],
+    swift_repo: SwiftRepository,
+    workers: int = 1,
+    deduplicate: bool = False,
+) -> ImportReport:
+    """
+    Parses and validates raw spreadsheet chunks in a background thread and hands them
+    to `workers` concurrent batch writers through a bounded queue. The producer waits
+    whenever the writers fall behind, so at most 2 * workers + 1 chunks are held in
+    memory, and parsing of the next chunk overlaps with the writes in flight.
+
+    With deduplicate, repeated swiftCodes are dropped before writing, for target
+    collections that do not have the unique swiftCode index yet.
+    """
+    report = ImportReport()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    iterator = iter(chunks)
+    seen_codes: set[str] = set()
+    started = time.perf_counter()
+
+    def parse_next() -> tuple[list[SwiftCodeDetailed], int, int] | None:
+        chunk = next(iterator, None)
+        if chunk is None:
+            return None
+        swift_codes, invalid = validate_chunk(prepare_frame(chunk))
+        if not deduplicate:
+            return swift_codes, invalid, 0
+        unique_codes = []
+        for swift in swift_codes:
+            if swift.swiftCode not in seen_codes:
+                seen_codes.add(swift.swiftCode)
+                unique_codes.append(swift)
+        return unique_codes, invalid, len(swift_codes) - len(unique_codes)
+
+    async def produce():
+        while (parsed := await asyncio.to_thread(parse_next)) is not None:
+            swift_codes, invalid, duplicates = parsed
+            report.invalid += invalid
+            report.duplicates += duplicates
+            await queue.put(swift_codes)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def write(worker: int):
+        while (swift_codes := await queue.get()) is not None:
+            batch_started = time.perf_counter()
+            # Embedded branches are backfilled once every batch is in
+            results = await swift_repo.create_swifts(
+                swift_codes, maintain_embedded=False
+            )
+            elapsed = time.perf_counter() - batch_started
+            report.inserted += sum(results)
+            report.duplicates += len(results) - sum(results)
+            logger.info(
+                f"Worker {worker} wrote batch of {len(results)} in {elapsed * 1000:.1f} ms "
+                f"({len(results) / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+    async with asyncio.TaskGroup() as tasks:
+        tasks.create_task(produce())
+        for worker in range(workers):
+            tasks.create_task(write(worker))
+
+    elapsed = time.perf_counter() - started
+    written = report.inserted + report.duplicates + report.invalid
+    logger.info(
+        f"Processed {written} rows with {workers} worker(s) in {elapsed:.2f} s "
+        f"({written / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    return report
+
+
+async def replace_swift_codes(
+    shadow_client: MongoMotorClient,
+    chunks: Iterable[pd.DataFrame],
+    target_collection: str,
+    workers: int = 1,
+) -> ImportReport:
+    """
+    Bulk-loads chunks into an empty shadow collection, builds the indexes once the
+    data is in place and atomically swaps the shadow collection in for
+    target_collection. The shadow collection is dropped if anything fails.
+    """
+    swift_repo = SwiftRepository(
+        shadow_client, embed_branches=settings.SWIFT_EMBED_BRANCHES
+    )
     try:
-        mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL)
-        mongodb = mongodb_client[settings.MONGODB_DB_NAME]
-        swift_repo = SwiftRepository(MongoMotorClient(mongodb, "swift_codes"))
-
-        df = pd.read_excel(file_path)
-        df.drop(columns=["CODE TYPE", "TOWN NAME", "TIME ZONE"], inplace=True)
-        df.rename(
-            columns={
-                "ADDRESS": "address",
-                "NAME": "bankName",
-                "COUNTRY ISO2 CODE": "countryISO2",
-                "COUNTRY NAME": "countryName",
-                "SWIFT CODE": "swiftCode",
-            },
-            inplace=True,
+        report = await import_chunks(chunks, swift_repo, workers, deduplicate=True)
+        index_started = time.perf_counter()
+        await swift_repo.ensure_indexes()
+        logger.info(
+            f"Built indexes on '{shadow_client.collection}' "
+            f"in {time.perf_counter() - index_started:.2f} s"
         )
-        df["isHeadquarter"] = df["swiftCode"].apply(
-            lambda x: x[8:11] == "XXX" if isinstance(x, str) and len(x) >= 11 else False
+        # $merge on swiftCode needs the unique index built above
+        await backfill_branches(swift_repo)
+        await shadow_client.rename(target_collection, drop_target=True)
+    except BaseException:
+        await shadow_client.drop()
+        raise
+    return report
+
+
+async def backfill_branches(swift_repo: SwiftRepository):
+    if not swift_repo.embed_branches:
+        return
+    started = time.perf_counter()
+    await swift_repo.backfill_branches()
+    logger.info(
+        f"Backfilled embedded branches in {time.perf_counter() - started:.2f} s"
+    )
+
+
+async def delta_import(
+    chunks: Iterable[pd.DataFrame], swift_repo: SwiftRepository
+) -> DeltaReport:
+    """
+    Compares incoming rows against the content hashes already stored and writes only
+    the difference: new and changed codes are upserted, codes missing from the file
+    are deleted, all in a single bulk_write. Codes of rows that fail validation
+    still count as listed, so they are neither written nor deleted; when an invalid
+    row has no readable swiftCode at all, nothing is deleted.
+    """
+    report = DeltaReport()
+    stored_hashes = await swift_repo.get_content_hashes()
+    seen_codes: set[str] = set()
+    listed_codes: set[str] = set()
+    unidentified = 0
+    upserts = []
+
+    for chunk in chunks:
+        frame = prepare_frame(chunk)
+        for raw_code in frame["swiftCode"]:
+            if isinstance(raw_code, str) and raw_code.strip():
+                listed_codes.add(raw_code.strip().upper())
+            else:
+                unidentified += 1
+        swift_codes, invalid = validate_chunk(frame)
+        report.invalid += invalid
+        for swift in swift_codes:
+            if swift.swiftCode in seen_codes:
+                continue
+            seen_codes.add(swift.swiftCode)
+            if swift.swiftCode not in stored_hashes:
+                report.added += 1
+            elif stored_hashes[swift.swiftCode] != swift_repo.content_hash(swift):
+                report.changed += 1
+            else:
+                report.unchanged += 1
+                continue
+            upserts.append(swift)
+
+    if unidentified:
+        logger.warning(
+            f"{unidentified} row(s) without a SWIFT code, not deleting codes "
+            f"missing from the file"
+        )
+        deletes = []
+    else:
+        deletes = [code for code in stored_hashes if code not in listed_codes]
+    report.removed = len(deletes)
+    await swift_repo.sync_swifts(upserts, deletes)
+    return report
+
+
+async def bump_global_version(mongodb):
+    """Invalidates every ETag handed out by the API, since an import may touch any code."""
+    if not settings.SWIFT_HTTP_CACHING_ENABLED:
+        return
+    versions = VersionRepository(
+        MongoMotorClient(mongodb, settings.SWIFT_VERSIONS_COLLECTION_NAME)
+    )
+    await versions.bump([GLOBAL_VERSION_KEY])
+
+
+async def rebuild_country_snapshots(mongodb):
+    if not settings.SWIFT_COUNTRY_SNAPSHOTS_ENABLED:
+        return
+    started = time.perf_counter()
+    snapshots = CountrySnapshotRepository(
+        MongoMotorClient(mongodb, settings.SWIFT_SNAPSHOTS_COLLECTION_NAME)
+    )
+    await snapshots.rebuild(MongoMotorClient(mongodb, settings.MONGODB_COLLECTION_NAME))
+    logger.info(f"Rebuilt country snapshots in {time.perf_counter() - started:.2f} s")
+
+
+async def import_data(
+    file_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    file_format: str | None = None,
+    workers: int = DEFAULT_WORKERS,
+    replace: bool = False,
+    delta: bool = False,
+):
+    try:
+        mongodb_client = AsyncIOMotorClient(
+            settings.MONGODB_URL, **mongo_client_options()
         )
+        mongodb = mongodb_client[settings.MONGODB_DB_NAME]
+        collection = settings.MONGODB_COLLECTION_NAME
+        chunks = iter_chunks(file_path, batch_size, file_format)
 
-        inserted_count = 0
-        for _, row in df.iterrows():
-            swift_code = SwiftCodeDetailed(**row.to_dict())
-            result = await swift_repo.create_swift(swift_code)
-            if result:
-                inserted_count += 1
+        if delta:
+            swift_repo = SwiftRepository(
+                MongoMotorClient(mongodb, collection),
+                embed_branches=settings.SWIFT_EMBED_BRANCHES,
+            )
+            await swift_repo.bootstrap_indexes(settings.SWIFT_INDEX_BOOTSTRAP)
+            delta_report = await delta_import(chunks, swift_repo)
+            await backfill_branches(swift_repo)
+            await rebuild_country_snapshots(mongodb)
+            await bump_global_version(mongodb)
+            logger.info(
+                f"Delta import into '{settings.MONGODB_DB_NAME}.{collection}': "
+                f"{delta_report.added} added, {delta_report.changed} changed, "
+                f"{delta_report.removed} removed, {delta_report.unchanged} unchanged, "
+                f"{delta_report.invalid} invalid"
+            )
+            return
+
+        if replace:
+            shadow_name = f"{collection}_import_{int(time.time())}"
+            report = await replace_swift_codes(
+                MongoMotorClient(mongodb, shadow_name), chunks, collection, workers
+            )
+            # Already built on the shadow collection; re-checked after the swap
+            await SwiftRepository(
+                MongoMotorClient(mongodb, collection)
+            ).bootstrap_indexes(settings.SWIFT_INDEX_BOOTSTRAP)
+        else:
+            swift_repo = SwiftRepository(
+                MongoMotorClient(mongodb, collection),
+                embed_branches=settings.SWIFT_EMBED_BRANCHES,
+            )
+            # Duplicates are detected by the unique swiftCode index
+            await swift_repo.bootstrap_indexes(settings.SWIFT_INDEX_BOOTSTRAP)
+            report = await import_chunks(chunks, swift_repo, workers)
+            await backfill_branches(swift_repo)
+        await rebuild_country_snapshots(mongodb)
+        await bump_global_version(mongodb)
 
         logger.info(
-            f"Inserted {inserted_count} swift codes into 'swift_codes_db.swift_codes'"
+            f"Inserted {report.inserted} swift codes into "
+            f"'{settings.MONGODB_DB_NAME}.{collection}' "
+            f"({report.duplicates} duplicates, {report.invalid} invalid)"
         )
 
     except Exception as e:
@@ -54,14 +334,54 @@ async def import_data(file_path: str):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Import SWIFT code data from an Excel file."
+        description="Import SWIFT code data from an Excel, CSV, Parquet or NDJSON file."
     )
     parser.add_argument(
         "--file-path",
         type=str,
-        help="Path to the Excel file containing SWIFT codes.",
+        help="Path to the file containing SWIFT codes.",
         default="swiftatlas/data/Interns_2025_SWIFT_CODES.xlsx",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of rows validated and written per insert_many batch.",
+        default=DEFAULT_BATCH_SIZE,
+    )
+    parser.add_argument(
+        "--format",
+        choices=FILE_FORMATS,
+        help="Input file format. Detected from the file extension if omitted.",
+        default=None,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of batch writers running concurrently against MongoDB.",
+        default=DEFAULT_WORKERS,
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--replace",
+        action="store_true",
+        help="Load into a shadow collection and atomically swap it in for the live one.",
+    )
+    mode.add_argument(
+        "--delta",
+        action="store_true",
+        help="Write only codes that were added, changed or removed since the last import.",
+    )
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
-    asyncio.run(import_data(args.file_path))
+    asyncio.run(
+        import_data(
+            args.file_path,
+            args.batch_size,
+            args.format,
+            args.workers,
+            args.replace,
+            args.delta,
+        )
+    )
@@ -0,0 +1,322 @@
+import asyncio
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+from swiftatlas import settings
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.import_data import (
+    delta_import,
+    import_chunks,
+    prepare_frame,
+    replace_swift_codes,
+    validate_chunk,
+)
+from swiftatlas.repositories.swift_repository import (
+    SUPERSEDED_INDEX_NAMES,
+    SWIFT_CODE_INDEXES,
+    SwiftRepository,
+)
+
+
+@pytest.fixture
+def raw_frame():
+    """Rows shaped like the source spreadsheet."""
+    return pd.DataFrame(
+        [
+            {
+                "COUNTRY ISO2 CODE": "pl",
+                "SWIFT CODE": "BANKPLPWXXX",
+                "CODE TYPE": "BIC11",
+                "NAME": " Bank HQ ",
+                "ADDRESS": "1 Main St",
+                "TOWN NAME": "WARSAW",
+                "COUNTRY NAME": "poland",
+                "TIME ZONE": "Europe/Warsaw",
+            },
+            {
+                "COUNTRY ISO2 CODE": "PL",
+                "SWIFT CODE": "BANKPLPWABC",
+                "CODE TYPE": "BIC11",
+                "NAME": "Bank Branch",
+                "ADDRESS": "2 Side St",
+                "TOWN NAME": "WARSAW",
+                "COUNTRY NAME": "POLAND",
+                "TIME ZONE": "Europe/Warsaw",
+            },
+            {
+                "COUNTRY ISO2 CODE": "POL",
+                "SWIFT CODE": "BADPLPWABC",
+                "CODE TYPE": "BIC11",
+                "NAME": "Broken Bank",
+                "ADDRESS": "3 Nowhere",
+                "TOWN NAME": "WARSAW",
+                "COUNTRY NAME": "POLAND",
+                "TIME ZONE": "Europe/Warsaw",
+            },
+        ]
+    )
+
+
+@pytest.fixture
+def mock_swift_repository():
+    repo = MagicMock(spec=SwiftRepository)
+    repo.create_swifts = AsyncMock(
+        side_effect=lambda swifts, **kwargs: [True] * len(swifts)
+    )
+    return repo
+
+
+@pytest.fixture
+def mock_shadow_client():
+    client = MagicMock(spec=MongoMotorClient)
+    client.collection = "swift_codes_import_1"
+    client.put_items = AsyncMock()
+    client.create_indexes = AsyncMock()
+    client.drop_indexes = AsyncMock()
+    client.rename = AsyncMock()
+    client.drop = AsyncMock()
+    return client
+
+
+def test_prepare_frame(raw_frame):
+    df = prepare_frame(raw_frame)
+    assert set(df.columns) == {
+        "address",
+        "bankName",
+        "countryISO2",
+        "countryName",
+        "swiftCode",
+        "isHeadquarter",
+    }
+    assert df["isHeadquarter"].tolist() == [True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_batches(raw_frame, mock_swift_repository):
+    chunks = [raw_frame.iloc[:2], raw_frame.iloc[2:]]
+    report = await import_chunks(iter(chunks), mock_swift_repository)
+
+    assert mock_swift_repository.create_swifts.await_count == 2
+    first_batch = mock_swift_repository.create_swifts.await_args_list[0].args[0]
+    second_batch = mock_swift_repository.create_swifts.await_args_list[1].args[0]
+    assert [s.swiftCode for s in first_batch] == ["BANKPLPWXXX", "BANKPLPWABC"]
+    assert first_batch[0].countryISO2 == "PL"
+    assert first_batch[0].bankName == "Bank HQ"
+    assert second_batch == []
+    assert all(
+        call.kwargs == {"maintain_embedded": False}
+        for call in mock_swift_repository.create_swifts.await_args_list
+    )
+    assert report.inserted == 2
+    assert report.duplicates == 0
+    assert report.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_counts_duplicates(raw_frame, mock_swift_repository):
+    mock_swift_repository.create_swifts.side_effect = lambda swifts, **kwargs: [
+        False for _ in swifts
+    ]
+
+    report = await import_chunks([raw_frame], mock_swift_repository)
+
+    mock_swift_repository.create_swifts.assert_awaited_once()
+    assert report.inserted == 0
+    assert report.duplicates == 2
+    assert report.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_concurrent_workers(raw_frame, mock_swift_repository):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_create(swifts, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        return [True] * len(swifts)
+
+    mock_swift_repository.create_swifts.side_effect = slow_create
+    chunks = [raw_frame.iloc[:2]] * 6
+
+    report = await import_chunks(chunks, mock_swift_repository, workers=3)
+
+    assert mock_swift_repository.create_swifts.await_count == 6
+    assert max_in_flight == 3
+    assert report.inserted == 12
+    assert report.invalid == 0
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_applies_backpressure(raw_frame, mock_swift_repository):
+    release = asyncio.Event()
+    parsed = 0
+
+    def chunks():
+        nonlocal parsed
+        for _ in range(20):
+            parsed += 1
+            yield raw_frame.iloc[:2]
+
+    async def blocked_create(swifts, **kwargs):
+        await release.wait()
+        return [True] * len(swifts)
+
+    mock_swift_repository.create_swifts.side_effect = blocked_create
+    task = asyncio.create_task(
+        import_chunks(chunks(), mock_swift_repository, workers=2)
+    )
+    await asyncio.sleep(0.2)
+
+    # 2 batches in flight, 2 queued, 1 parsed and waiting for a queue slot
+    assert parsed <= 5
+    release.set()
+    report = await task
+    assert parsed == 20
+    assert report.inserted == 40
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_propagates_write_errors(raw_frame, mock_swift_repository):
+    mock_swift_repository.create_swifts.side_effect = RuntimeError("write failed")
+
+    with pytest.raises(ExceptionGroup):
+        await import_chunks([raw_frame] * 5, mock_swift_repository, workers=2)
+
+
+@pytest.mark.asyncio
+async def test_import_chunks_deduplicate(raw_frame, mock_swift_repository):
+    report = await import_chunks(
+        [raw_frame, raw_frame], mock_swift_repository, deduplicate=True
+    )
+
+    second_batch = mock_swift_repository.create_swifts.await_args_list[1].args[0]
+    assert second_batch == []
+    assert report.inserted == 2
+    assert report.duplicates == 2
+    assert report.invalid == 2
+
+
+@pytest.mark.asyncio
+async def test_replace_swift_codes(raw_frame, mock_shadow_client):
+    report = await replace_swift_codes(
+        mock_shadow_client, [raw_frame, raw_frame], "swift_codes"
+    )
+
+    assert mock_shadow_client.put_items.await_count == 1
+    assert mock_shadow_client.mock_calls[-3:] == [
+        call.create_indexes(SWIFT_CODE_INDEXES),
+        call.drop_indexes(SUPERSEDED_INDEX_NAMES),
+        call.rename("swift_codes", drop_target=True),
+    ]
+    mock_shadow_client.drop.assert_not_awaited()
+    assert report.inserted == 2
+    assert report.duplicates == 2
+
+
+@pytest.mark.asyncio
+async def test_replace_swift_codes_backfills_branches(raw_frame, mock_shadow_client):
+    mock_shadow_client.aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    with patch.object(settings, "SWIFT_EMBED_BRANCHES", True):
+        await replace_swift_codes(mock_shadow_client, [raw_frame], "swift_codes")
+
+    # No per-batch lookups on the shadow collection before its indexes exist
+    mock_shadow_client.find.assert_not_called()
+    mock_shadow_client.bulk_write.assert_not_called()
+    batch = mock_shadow_client.put_items.call_args.args[0]
+    assert all("branches" not in doc for doc in batch)
+
+    assert [c[0] for c in mock_shadow_client.mock_calls[-5:]] == [
+        "create_indexes",
+        "drop_indexes",
+        "aggregate",
+        "aggregate().to_list",
+        "rename",
+    ]
+    pipeline = mock_shadow_client.aggregate.call_args.args[0]
+    assert pipeline[-1]["$merge"]["into"] == "swift_codes_import_1"
+
+
+@pytest.mark.asyncio
+async def test_replace_swift_codes_drops_shadow_on_failure(
+    raw_frame, mock_shadow_client
+):
+    mock_shadow_client.put_items.side_effect = RuntimeError("write failed")
+
+    with pytest.raises(ExceptionGroup):
+        await replace_swift_codes(mock_shadow_client, [raw_frame], "swift_codes")
+
+    mock_shadow_client.rename.assert_not_awaited()
+    mock_shadow_client.drop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delta_import(raw_frame, mock_swift_repository):
+    hq, branch = validate_chunk(prepare_frame(raw_frame))[0]
+    mock_swift_repository.content_hash = SwiftRepository.content_hash
+    mock_swift_repository.get_content_hashes = AsyncMock(
+        return_value={
+            hq.swiftCode: SwiftRepository.content_hash(hq),
+            branch.swiftCode: "stale-hash",
+            "GONEPLPWXXX": "whatever",
+        }
+    )
+    mock_swift_repository.sync_swifts = AsyncMock()
+    added = raw_frame.iloc[[1]].assign(**{"SWIFT CODE": "BANKPLPWNEW"})
+
+    report = await delta_import([raw_frame, added], mock_swift_repository)
+
+    upserts, deletes = mock_swift_repository.sync_swifts.await_args.args
+    assert [s.swiftCode for s in upserts] == ["BANKPLPWABC", "BANKPLPWNEW"]
+    assert deletes == ["GONEPLPWXXX"]
+    mock_swift_repository.create_swifts.assert_not_awaited()
+    assert report.added == 1
+    assert report.changed == 1
+    assert report.removed == 1
+    assert report.unchanged == 1
+    assert report.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_delta_import_keeps_codes_of_invalid_rows(
+    raw_frame, mock_swift_repository
+):
+    invalid_rows = raw_frame.iloc[[0]].assign(
+        **{"SWIFT CODE": "bankplpwold", "COUNTRY ISO2 CODE": "P1"}
+    )
+    mock_swift_repository.content_hash = SwiftRepository.content_hash
+    mock_swift_repository.get_content_hashes = AsyncMock(
+        return_value={"BANKPLPWOLD": "whatever", "GONEPLPWXXX": "whatever"}
+    )
+    mock_swift_repository.sync_swifts = AsyncMock()
+
+    report = await delta_import([invalid_rows], mock_swift_repository)
+
+    upserts, deletes = mock_swift_repository.sync_swifts.await_args.args
+    assert upserts == []
+    assert deletes == ["GONEPLPWXXX"]
+    assert report.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_delta_import_skips_deletes_for_rows_without_code(
+    raw_frame, mock_swift_repository
+):
+    mock_swift_repository.content_hash = SwiftRepository.content_hash
+    mock_swift_repository.get_content_hashes = AsyncMock(
+        return_value={"GONEPLPWXXX": "whatever"}
+    )
+    mock_swift_repository.sync_swifts = AsyncMock()
+
+    report = await delta_import(
+        [raw_frame.assign(**{"SWIFT CODE": None})], mock_swift_repository
+    )
+
+    upserts, deletes = mock_swift_repository.sync_swifts.await_args.args
+    assert deletes == []
+    assert report.removed == 0
@@ -1,9 +1,22 @@
+import asyncio
 import logging
 import logging.config
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi.middleware.cors import CORSMiddleware
+from swiftatlas.caching.change_watcher import ChangeWatcher
+from swiftatlas.caching.swift_index import SwiftIndex
+from swiftatlas.caching.ttl_cache import TTLCache
+from swiftatlas.clients.mongo_client import (
+    MongoMotorClient,
+    mongo_client_options,
+    read_preference,
+)
+from swiftatlas.middleware.compression import CompressionMiddleware
+from swiftatlas.repositories.snapshot_repository import CountrySnapshotRepository
+from swiftatlas.repositories.swift_repository import SwiftRepository
+from swiftatlas.repositories.version_repository import VersionRepository
 from swiftatlas.routers.swift_codes import router as swift_router
 
 from swiftatlas import settings
@@ -16,13 +29,73 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL)
-    app.mongodb = app.mongodb_client[settings.MONGODB_DB_NAME]
-    logger.info(f"Connected to MongoDB: {app.mongodb}")
+    state = app.state
+    state.mongodb_client = AsyncIOMotorClient(
+        settings.MONGODB_URL, **mongo_client_options()
+    )
+    state.mongodb = state.mongodb_client[settings.MONGODB_DB_NAME]
+    logger.info(f"Connected to MongoDB: {state.mongodb}")
+    state.swift_cache = (
+        TTLCache(settings.SWIFT_CACHE_MAX_SIZE, settings.SWIFT_CACHE_TTL_SECONDS)
+        if settings.SWIFT_CACHE_MAX_SIZE > 0
+        else None
+    )
+
+    reads = read_preference()
+    state.swift_versions = (
+        VersionRepository(
+            MongoMotorClient(
+                state.mongodb, settings.SWIFT_VERSIONS_COLLECTION_NAME, reads
+            )
+        )
+        if settings.SWIFT_HTTP_CACHING_ENABLED
+        else None
+    )
+    state.swift_snapshots = (
+        CountrySnapshotRepository(
+            MongoMotorClient(
+                state.mongodb, settings.SWIFT_SNAPSHOTS_COLLECTION_NAME, reads
+            )
+        )
+        if settings.SWIFT_COUNTRY_SNAPSHOTS_ENABLED
+        else None
+    )
+
+    client = MongoMotorClient(state.mongodb, settings.MONGODB_COLLECTION_NAME, reads)
+    state.swift_index = SwiftIndex() if settings.SWIFT_INDEX_ENABLED else None
+    # Built once and shared by every request
+    state.swift_repository = SwiftRepository(
+        client,
+        cache=state.swift_cache,
+        index=state.swift_index,
+        embed_branches=settings.SWIFT_EMBED_BRANCHES,
+        versions=state.swift_versions,
+        snapshots=state.swift_snapshots,
+    )
+    await state.swift_repository.bootstrap_indexes(settings.SWIFT_INDEX_BOOTSTRAP)
+
+    background_tasks = []
+    if state.swift_index is not None:
+        await state.swift_index.refresh(client)
+        background_tasks.append(
+            asyncio.create_task(
+                state.swift_index.refresh_periodically(
+                    client, settings.SWIFT_INDEX_REFRESH_SECONDS
+                )
+            )
+        )
+
+    if settings.SWIFT_CHANGE_WATCH_ENABLED:
+        watcher = ChangeWatcher(
+            state.swift_repository, settings.SWIFT_CHANGE_POLL_SECONDS
+        )
+        background_tasks.append(asyncio.create_task(watcher.run()))
 
     yield
 
-    app.mongodb_client.close()
+    for task in background_tasks:
+        task.cancel()
+    state.mongodb_client.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -35,4 +108,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.SWIFT_COMPRESSION_ENCODINGS:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.SWIFT_COMPRESSION_ENCODINGS,
+        minimum_size=settings.SWIFT_COMPRESSION_MIN_SIZE,
+        cache_max_size=settings.SWIFT_COMPRESSION_CACHE_MAX_SIZE,
+        cache_ttl=settings.SWIFT_CACHE_TTL_SECONDS,
+    )
+
 app.include_router(swift_router)
@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import logging
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from swiftatlas.caching.ttl_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, install it to serve "br"
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSION_ENCODINGS = ("br", "gzip")
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk, flushing after each chunk."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, last: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._compressor.process(chunk)
+            return data + (
+                self._compressor.finish() if last else self._compressor.flush()
+            )
+        data = self._compressor.compress(chunk)
+        return data + self._compressor.flush(
+            zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+        )
+
+
+def weaken_etag(headers: MutableHeaders):
+    """
+    Compressed bytes differ from the identity body, so a strong validator would be
+    wrong for them. Clients that may get either see a weak one, varying by encoding.
+    """
+    etag = headers.get("etag")
+    if etag is None:
+        return
+    if not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+    vary_on_encoding(headers)
+
+
+def vary_on_encoding(headers: MutableHeaders):
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def available_encodings(encodings: list[str]) -> list[str]:
+    for encoding in encodings:
+        if encoding not in COMPRESSION_ENCODINGS:
+            raise ValueError(
+                f"Compression encodings must be among "
+                f"{', '.join(COMPRESSION_ENCODINGS)}, got '{encoding}'"
+            )
+    if "br" in encodings and brotli is None:
+        logger.warning("brotli is not installed, not serving br compression")
+        encodings = [encoding for encoding in encodings if encoding != "br"]
+    return encodings
+
+
+def negotiate(accept_encoding: str, encodings: list[str]) -> str | None:
+    """Picks the first of encodings, in server preference, the client accepts."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least minimum_size bytes with gzip or brotli. Complete
+    GET bodies, such as country listings, are compressed once and kept in a TTLCache
+    keyed by a digest of the body, so hot countries are served from the cache until
+    their content changes. Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: list[str],
+        minimum_size: int = 1024,
+        cache_max_size: int = 0,
+        cache_ttl: float = 300,
+    ):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.cache = TTLCache(cache_max_size, cache_ttl) if cache_max_size > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope["method"] == "GET"
+        start_message: Message | None = None
+        passthrough = False
+        streamer: StreamCompressor | None = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough, streamer
+            if message["type"] == "http.response.start":
+                start_message = message
+                # Weakened whether or not this body ends up compressed, so that a 304,
+                # which has no body, repeats the validator of the 200 it confirms
+                weaken_etag(MutableHeaders(raw=message["headers"]))
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if streamer is not None:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": streamer.compress(body, last=not more_body),
+                        "more_body": more_body,
+                    }
+                )
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            if "content-encoding" in headers or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            vary_on_encoding(headers)
+
+            if more_body:
+                del headers["Content-Length"]
+                streamer = StreamCompressor(encoding)
+                await send(start_message)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": streamer.compress(body, last=False),
+                        "more_body": True,
+                    }
+                )
+                return
+
+            compressed = self._compress_body(encoding, body, cacheable)
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress_body(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        if self.cache is None or not cacheable:
+            return compress(encoding, body)
+        key = (encoding, hashlib.sha1(body).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(encoding, body)
+            self.cache.set(key, compressed)
+        return compressed
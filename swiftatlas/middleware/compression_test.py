@@ -0,0 +1,142 @@
+import gzip
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from swiftatlas.middleware import compression
+from swiftatlas.middleware.compression import (
+    CompressionMiddleware,
+    available_encodings,
+    negotiate,
+)
+
+LISTING = b'{"countryISO2":"PL","bankName":"BANK"}' * 100
+
+
+def make_client(**options) -> tuple[TestClient, CompressionMiddleware]:
+    app = FastAPI()
+
+    @app.get("/listing")
+    async def listing():
+        return Response(
+            LISTING, media_type="application/json", headers={"ETag": '"v1"'}
+        )
+
+    @app.get("/small")
+    async def small():
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for _ in range(3):
+                yield LISTING + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, encodings=["gzip"], **options)
+    client = TestClient(app)
+    # The stack is built on the first request
+    client.get("/small", headers={"Accept-Encoding": "identity"})
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    return client, middleware
+
+
+def test_compresses_large_body():
+    client, _ = make_client()
+
+    response = client.get("/listing", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(LISTING)
+    assert response.content == LISTING
+
+
+def test_skips_small_body_and_unsupported_clients():
+    client, _ = make_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/listing", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"v1"'
+    assert identity.content == LISTING
+
+
+def test_not_modified_repeats_weak_etag():
+    client, _ = make_client()
+
+    compressed = client.get("/listing", headers={"Accept-Encoding": "gzip"})
+    not_modified = client.get(
+        "/not-modified",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": 'W/"v1"'},
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == compressed.headers["etag"] == 'W/"v1"'
+    assert not_modified.headers["vary"] == "Accept-Encoding"
+
+
+def test_caches_compressed_bodies():
+    client, middleware = make_client(cache_max_size=8)
+
+    with patch.object(
+        compression, "compress", wraps=compression.compress
+    ) as compress_body:
+        for _ in range(3):
+            response = client.get("/listing", headers={"Accept-Encoding": "gzip"})
+            assert response.content == LISTING
+
+    compress_body.assert_called_once()
+    assert len(middleware.cache) == 1
+
+
+def test_compresses_streamed_body():
+    client, middleware = make_client(cache_max_size=8)
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == (LISTING + b"\n") * 3
+    assert len(middleware.cache) == 0
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+        ("deflate", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["br", "gzip"]) == expected
+
+
+def test_available_encodings():
+    with patch.object(compression, "brotli", None):
+        assert available_encodings(["br", "gzip"]) == ["gzip"]
+    with pytest.raises(ValueError):
+        available_encodings(["zstd"])
+
+
+def test_gzip_output_is_deterministic():
+    assert compression.compress("gzip", LISTING) == compression.compress(
+        "gzip", LISTING
+    )
+    assert gzip.decompress(compression.compress("gzip", LISTING)) == LISTING
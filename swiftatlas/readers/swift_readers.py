@@ -0,0 +1,107 @@
+import os
+from typing import Iterator
+
+import openpyxl
+import pandas as pd
+import pyarrow.parquet as pq
+
+FILE_FORMATS = ("xlsx", "csv", "parquet", "ndjson")
+
+EXTENSION_FORMATS = {
+    ".xlsx": "xlsx",
+    ".xlsm": "xlsx",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def iter_excel_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams the first worksheet in read-only mode, yielding DataFrames of at most
+    chunk_size rows. Only one chunk is held in memory at a time.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Read-only sheets report formatted but empty trailing columns as None
+        columns = [i for i, name in enumerate(header) if name is not None]
+        names = [header[i] for i in columns]
+
+        chunk = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in columns]
+            if all(v is None for v in values):
+                continue
+            chunk.append(values)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=names)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=names)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV file in chunks of at most chunk_size rows. Only empty cells are
+    missing: pandas' default NA strings include Namibia's ISO2 code "NA" and values
+    such as "N/A" or "NULL", which the other readers keep as text.
+    """
+    with pd.read_csv(
+        file_path,
+        dtype=str,
+        keep_default_na=False,
+        na_values=[""],
+        chunksize=chunk_size,
+    ) as reader:
+        yield from reader
+
+
+def iter_parquet_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Streams a Parquet file as columnar record batches of at most chunk_size rows."""
+    parquet_file = pq.ParquetFile(file_path)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    finally:
+        parquet_file.close()
+
+
+def iter_ndjson_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Streams a newline-delimited JSON file in chunks of at most chunk_size rows."""
+    with pd.read_json(
+        file_path, lines=True, dtype=False, chunksize=chunk_size
+    ) as reader:
+        yield from reader
+
+
+READERS = {
+    "xlsx": iter_excel_chunks,
+    "csv": iter_csv_chunks,
+    "parquet": iter_parquet_chunks,
+    "ndjson": iter_ndjson_chunks,
+}
+
+
+def detect_format(file_path: str) -> str:
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in EXTENSION_FORMATS:
+        raise ValueError(f"Unsupported file extension '{extension}' for {file_path}")
+    return EXTENSION_FORMATS[extension]
+
+
+def iter_chunks(
+    file_path: str, chunk_size: int, file_format: str | None = None
+) -> Iterator[pd.DataFrame]:
+    """Picks a streaming reader from file_format, or from the file extension if not given."""
+    file_format = file_format or detect_format(file_path)
+    if file_format not in READERS:
+        raise ValueError(f"Unsupported file format '{file_format}'")
+    return READERS[file_format](file_path, chunk_size)
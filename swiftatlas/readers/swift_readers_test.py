@@ -0,0 +1,144 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+from swiftatlas.readers.swift_readers import (
+    detect_format,
+    iter_chunks,
+    iter_csv_chunks,
+    iter_excel_chunks,
+    iter_ndjson_chunks,
+    iter_parquet_chunks,
+)
+
+HEADER = ["COUNTRY ISO2 CODE", "SWIFT CODE", "NAME"]
+ROWS = [
+    ["PL", "BANKPLPWXXX", "Bank One"],
+    ["PL", "BANKPLPWABC", "Bank One Branch"],
+    ["DE", "BANKDEFFXXX", "Bank Two"],
+]
+
+
+@pytest.fixture
+def xlsx_path(tmp_path):
+    path = tmp_path / "codes.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in ROWS:
+        sheet.append(row)
+    sheet.append([None, None, None])  # trailing blank row
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "codes.csv"
+    pd.DataFrame(ROWS, columns=HEADER).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    path = tmp_path / "codes.parquet"
+    pd.DataFrame(ROWS, columns=HEADER).to_parquet(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def ndjson_path(tmp_path):
+    path = tmp_path / "codes.ndjson"
+    pd.DataFrame(ROWS, columns=HEADER).to_json(path, orient="records", lines=True)
+    return str(path)
+
+
+def test_iter_excel_chunks(xlsx_path):
+    chunks = list(iter_excel_chunks(xlsx_path, 2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == HEADER
+    assert chunks[0].values.tolist() == ROWS[:2]
+    assert chunks[1].values.tolist() == ROWS[2:]
+
+
+def test_iter_excel_chunks_is_lazy(xlsx_path):
+    chunks = iter_excel_chunks(xlsx_path, 1)
+    first = next(chunks)
+    assert first.values.tolist() == ROWS[:1]
+    chunks.close()
+
+
+def test_iter_excel_chunks_matches_read_excel():
+    file_path = "swiftatlas/data/Interns_2025_SWIFT_CODES.xlsx"
+    streamed = pd.concat(iter_excel_chunks(file_path, 250), ignore_index=True)
+    expected = pd.read_excel(file_path)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_iter_csv_chunks(csv_path):
+    chunks = list(iter_csv_chunks(csv_path, 2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0].values.tolist() == ROWS[:2]
+
+
+def test_iter_csv_chunks_keeps_na_strings(tmp_path):
+    path = tmp_path / "namibia.csv"
+    path.write_text(
+        "COUNTRY ISO2 CODE,SWIFT CODE,NAME\n" "NA,BANKNANXXXX,N/A\n" "NA,BANKNANXABC,\n"
+    )
+
+    chunk = next(iter_csv_chunks(str(path), 10))
+
+    assert chunk["COUNTRY ISO2 CODE"].tolist() == ["NA", "NA"]
+    assert chunk["NAME"].iloc[0] == "N/A"
+    assert pd.isna(chunk["NAME"].iloc[1])
+
+
+def test_iter_parquet_chunks(parquet_path):
+    chunks = list(iter_parquet_chunks(parquet_path, 2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == HEADER
+    assert chunks[1].values.tolist() == ROWS[2:]
+
+
+def test_iter_ndjson_chunks(ndjson_path):
+    chunks = list(iter_ndjson_chunks(ndjson_path, 2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == HEADER
+    assert chunks[0].values.tolist() == ROWS[:2]
+
+
+@pytest.mark.parametrize(
+    "file_path, expected",
+    [
+        ("codes.xlsx", "xlsx"),
+        ("codes.CSV", "csv"),
+        ("codes.parquet", "parquet"),
+        ("codes.jsonl", "ndjson"),
+    ],
+)
+def test_detect_format(file_path, expected):
+    assert detect_format(file_path) == expected
+
+
+def test_iter_chunks_picks_reader(xlsx_path, csv_path, parquet_path, ndjson_path):
+    for path in (xlsx_path, csv_path, parquet_path, ndjson_path):
+        chunks = list(iter_chunks(path, 10))
+        assert chunks[0].values.tolist() == ROWS
+
+
+def test_iter_chunks_explicit_format(tmp_path, csv_path):
+    renamed = tmp_path / "codes.txt"
+    renamed.write_bytes(open(csv_path, "rb").read())
+    chunks = list(iter_chunks(str(renamed), 10, "csv"))
+    assert chunks[0].values.tolist() == ROWS
+
+
+def test_iter_chunks_unsupported_extension():
+    with pytest.raises(ValueError):
+        iter_chunks("codes.txt", 10)
+
+
+def test_iter_chunks_unsupported_format(csv_path):
+    with pytest.raises(ValueError):
+        iter_chunks(csv_path, 10, "xml")
@@ -0,0 +1,111 @@
+import logging
+from typing import Iterable
+
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.schemas.swift_schemas import (
+    SwiftCodeCountryGroup,
+    construct_country_group,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CODE_FIELDS = (
+    "address",
+    "bankName",
+    "countryISO2",
+    "isHeadquarter",
+    "swiftCode",
+)
+# Set by each incremental rebuild before it reads; only the latest one may write
+SNAPSHOT_CLAIM_FIELD = "rebuildClaim"
+
+
+def snapshot_pipeline(match: dict) -> list[dict]:
+    """Groups the matched SWIFT codes into one snapshot document per country."""
+    return [
+        {"$match": match},
+        {"$sort": {"countryISO2": 1, "swiftCode": 1}},
+        {
+            "$group": {
+                "_id": "$countryISO2",
+                "countryName": {"$first": "$countryName"},
+                "swiftCodes": {
+                    "$push": {field: f"${field}" for field in SNAPSHOT_CODE_FIELDS}
+                },
+            }
+        },
+    ]
+
+
+class CountrySnapshotRepository:
+    """
+    Ready-to-serve country listings, one {_id: countryISO2, countryName, swiftCodes}
+    document per country, so a full listing is a single _id lookup instead of a
+    countryISO2 index scan. Snapshots are rebuilt from the swift_codes collection by
+    SwiftRepository writes for the countries they touch, and fully after imports.
+    """
+
+    def __init__(self, db: MongoMotorClient):
+        self.client = db
+
+    async def get(self, country_iso2_code: str) -> SwiftCodeCountryGroup | None:
+        doc = await self.client.get_item({"_id": country_iso2_code})
+        # Claimed by a rebuild of a country that had no snapshot yet
+        if doc is None or "swiftCodes" not in doc:
+            return None
+        return construct_country_group(
+            doc["_id"], doc["countryName"], doc["swiftCodes"]
+        )
+
+    async def rebuild(
+        self, source: MongoMotorClient, countries: Iterable[str] | None = None
+    ):
+        """
+        Rebuilds the snapshots of countries from source, dropping those with no codes
+        left. Without countries, atomically replaces the whole collection with $out.
+        Concurrent rebuilds of a country each claim it before reading the source, and
+        only the latest claim is written: it read after every earlier claimer's write.
+        """
+        if countries is None:
+            cursor = source.aggregate(
+                [*snapshot_pipeline({}), {"$out": self.client.collection}],
+                primary=True,
+            )
+            await cursor.to_list(length=None)
+            logger.info(f"Rebuilt all country snapshots in '{self.client.collection}'")
+            return
+
+        countries = sorted(set(countries))
+        if not countries:
+            return
+        claim = ObjectId()
+        await self.client.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": country},
+                    {"$set": {SNAPSHOT_CLAIM_FIELD: claim}},
+                    upsert=True,
+                )
+                for country in countries
+            ]
+        )
+        # Rebuilt right after a write, which a secondary may not have applied yet
+        cursor = source.aggregate(
+            snapshot_pipeline({"countryISO2": {"$in": countries}}), primary=True
+        )
+        docs = await cursor.to_list(length=None)
+        rebuilt = {doc["_id"] for doc in docs}
+        # Claimed by a later rebuild otherwise, whose result is at least as recent
+        requests = [
+            ReplaceOne({"_id": doc["_id"], SNAPSHOT_CLAIM_FIELD: claim}, doc)
+            for doc in docs
+        ]
+        requests += [
+            DeleteOne({"_id": country, SNAPSHOT_CLAIM_FIELD: claim})
+            for country in countries
+            if country not in rebuilt
+        ]
+        await self.client.bulk_write(requests)
@@ -0,0 +1,170 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.snapshot_repository import (
+    SNAPSHOT_CLAIM_FIELD,
+    CountrySnapshotRepository,
+    snapshot_pipeline,
+)
+from swiftatlas.schemas.swift_schemas import SwiftCodeCountryGroup
+
+SNAPSHOT = {
+    "_id": "PL",
+    "countryName": "POLAND",
+    "swiftCodes": [
+        {
+            "address": "Address",
+            "bankName": "Bank",
+            "countryISO2": "PL",
+            "isHeadquarter": True,
+            "swiftCode": "BANKPLPWXXX",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def mock_snapshot_client():
+    client = MagicMock(spec=MongoMotorClient)
+    client.collection = "country_snapshots"
+    client.get_item = AsyncMock()
+    client.bulk_write = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def mock_source_client():
+    client = MagicMock(spec=MongoMotorClient)
+    client.aggregate = MagicMock()
+    client.aggregate.return_value.to_list = AsyncMock(return_value=[SNAPSHOT])
+    return client
+
+
+@pytest.fixture
+def snapshot_repository(mock_snapshot_client):
+    return CountrySnapshotRepository(mock_snapshot_client)
+
+
+@pytest.mark.asyncio
+async def test_get(mock_snapshot_client, snapshot_repository):
+    mock_snapshot_client.get_item.return_value = SNAPSHOT
+
+    result = await snapshot_repository.get("PL")
+
+    mock_snapshot_client.get_item.assert_awaited_once_with({"_id": "PL"})
+    assert isinstance(result, SwiftCodeCountryGroup)
+    assert result.countryISO2 == "PL"
+    assert result.countryName == "POLAND"
+    assert [s.swiftCode for s in result.swiftCodes] == ["BANKPLPWXXX"]
+
+
+@pytest.mark.asyncio
+async def test_get_missing(mock_snapshot_client, snapshot_repository):
+    mock_snapshot_client.get_item.return_value = None
+    assert await snapshot_repository.get("XX") is None
+
+
+@pytest.mark.asyncio
+async def test_get_claimed_before_first_build(
+    mock_snapshot_client, snapshot_repository
+):
+    mock_snapshot_client.get_item.return_value = {
+        "_id": "XX",
+        SNAPSHOT_CLAIM_FIELD: "claim",
+    }
+    assert await snapshot_repository.get("XX") is None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_countries(
+    mock_snapshot_client, mock_source_client, snapshot_repository
+):
+    await snapshot_repository.rebuild(mock_source_client, ["PL", "DE", "PL"])
+
+    mock_source_client.aggregate.assert_called_once_with(
+        snapshot_pipeline({"countryISO2": {"$in": ["DE", "PL"]}}), primary=True
+    )
+    claims, writes = [
+        c.args[0] for c in mock_snapshot_client.bulk_write.await_args_list
+    ]
+    claim = claims[0]._doc["$set"][SNAPSHOT_CLAIM_FIELD]
+    assert claims == [
+        UpdateOne({"_id": "DE"}, {"$set": {SNAPSHOT_CLAIM_FIELD: claim}}, upsert=True),
+        UpdateOne({"_id": "PL"}, {"$set": {SNAPSHOT_CLAIM_FIELD: claim}}, upsert=True),
+    ]
+    assert writes == [
+        ReplaceOne({"_id": "PL", SNAPSHOT_CLAIM_FIELD: claim}, SNAPSHOT),
+        # No codes left in DE
+        DeleteOne({"_id": "DE", SNAPSHOT_CLAIM_FIELD: claim}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rebuilds_write_only_the_latest_claim(mock_source_client):
+    """A rebuild that read before a later write cannot overwrite its snapshot."""
+    stored = {}
+
+    async def bulk_write(requests):
+        for request in requests:
+            query, doc = request._filter, request._doc
+            current = stored.get(query["_id"])
+            if isinstance(request, UpdateOne):
+                stored[query["_id"]] = {**(current or {}), **doc["$set"]}
+            elif current is not None and all(
+                current.get(k) == v for k, v in query.items() if k != "_id"
+            ):
+                stored[query["_id"]] = doc
+
+    snapshot_client = MagicMock(spec=MongoMotorClient)
+    snapshot_client.bulk_write = AsyncMock(side_effect=bulk_write)
+    repository = CountrySnapshotRepository(snapshot_client)
+
+    stale = {**SNAPSHOT, "swiftCodes": []}
+    fresh = SNAPSHOT
+    first_read = asyncio.Event()
+    second_done = asyncio.Event()
+
+    async def to_list(length=None):
+        if not first_read.is_set():
+            first_read.set()
+            # Reads the source, then stalls until a later rebuild has written
+            await second_done.wait()
+            return [stale]
+        return [fresh]
+
+    mock_source_client.aggregate.return_value.to_list = to_list
+
+    slow = asyncio.create_task(repository.rebuild(mock_source_client, ["PL"]))
+    await first_read.wait()
+    await repository.rebuild(mock_source_client, ["PL"])
+    second_done.set()
+    await slow
+
+    assert stored["PL"] == fresh
+
+
+@pytest.mark.asyncio
+async def test_rebuild_nothing(
+    mock_snapshot_client, mock_source_client, snapshot_repository
+):
+    await snapshot_repository.rebuild(mock_source_client, [])
+
+    mock_source_client.aggregate.assert_not_called()
+    mock_snapshot_client.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_all(
+    mock_snapshot_client, mock_source_client, snapshot_repository
+):
+    await snapshot_repository.rebuild(mock_source_client)
+
+    pipeline = mock_source_client.aggregate.call_args.args[0]
+    assert mock_source_client.aggregate.call_args.kwargs == {"primary": True}
+    assert pipeline[:-1] == snapshot_pipeline({})
+    assert pipeline[-1] == {"$out": "country_snapshots"}
+    mock_source_client.aggregate.return_value.to_list.assert_awaited_once()
+    mock_snapshot_client.bulk_write.assert_not_awaited()
@@ -1,83 +1,766 @@
+import json
+import hashlib
 import logging
+from datetime import datetime, timezone
+
+from pymongo import (
+    ASCENDING,
+    DESCENDING,
+    DeleteMany,
+    IndexModel,
+    ReplaceOne,
+    UpdateOne,
+)
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 from swiftatlas.schemas.swift_schemas import (
+    HEADQUARTER_SUFFIX,
     SwiftCodeBase,
     SwiftCodeDetailed,
     SwiftCodeHeadquarterGroup,
     SwiftCodeCountryGroup,
+    construct_country_group,
+    construct_headquarter_group,
 )
+from swiftatlas.caching.swift_index import SwiftIndex
+from swiftatlas.caching.ttl_cache import TTLCache
 from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.snapshot_repository import CountrySnapshotRepository
+from swiftatlas.repositories.version_repository import (
+    GLOBAL_VERSION_KEY,
+    VersionRepository,
+    version_keys,
+)
 
 logger = logging.getLogger(__name__)
 
+DUPLICATE_KEY_ERROR_CODE = 11000
+CONTENT_HASH_FIELD = "contentHash"
+UPDATED_AT_FIELD = "updatedAt"
+BRANCHES_FIELD = "branches"
+
+# Fields needed to build SwiftCodeBase; the HQ document also needs countryName
+SWIFT_BASE_PROJECTION = {
+    "_id": 0,
+    "address": 1,
+    "bankName": 1,
+    "countryISO2": 1,
+    "isHeadquarter": 1,
+    "swiftCode": 1,
+}
+SWIFT_DETAILED_PROJECTION = {**SWIFT_BASE_PROJECTION, "countryName": 1}
+SWIFT_EMBEDDED_PROJECTION = {**SWIFT_DETAILED_PROJECTION, BRANCHES_FIELD: 1}
+# What writes need to know about deleted codes: which caches and versions they touch
+DELETED_PROJECTION = {"_id": 0, "swiftCode": 1, "countryISO2": 1}
+
+# Keep in sync with init-indexes.js. The branch and country indexes hold every
+# field of SWIFT_DETAILED_PROJECTION, so branch lookups, HQ aggregations and
+# country listings are covered queries that never fetch the documents
+SWIFT_CODE_INDEXES = [
+    IndexModel([("swiftCode", ASCENDING)], unique=True),
+    IndexModel(
+        [
+            ("swiftCodePrefix8", ASCENDING),
+            ("isHeadquarter", ASCENDING),
+            ("swiftCode", ASCENDING),
+            ("address", ASCENDING),
+            ("bankName", ASCENDING),
+            ("countryISO2", ASCENDING),
+            ("countryName", ASCENDING),
+        ]
+    ),
+    IndexModel(
+        [
+            ("countryISO2", ASCENDING),
+            ("swiftCode", ASCENDING),
+            ("address", ASCENDING),
+            ("bankName", ASCENDING),
+            ("isHeadquarter", ASCENDING),
+            ("countryName", ASCENDING),
+        ]
+    ),
+    IndexModel([(UPDATED_AT_FIELD, DESCENDING)]),
+]
+# Prefixes of the covering indexes above, dropped so the planner cannot pick them.
+# The first two come from the original init-indexes.js.
+SUPERSEDED_INDEX_NAMES = [
+    "swiftCodePrefix8_1_isHeadquarter_1",
+    "countryISO2_1",
+    "countryISO2_1_swiftCode_1",
+]
+# Queries behind the GET endpoints, with placeholder values, checked with explain()
+HOT_QUERIES = {
+    "lookup by swiftCode": (
+        {"swiftCode": "AAAAAAAAXXX"},
+        SWIFT_DETAILED_PROJECTION,
+        None,
+    ),
+    "branches of a headquarter": (
+        {"swiftCodePrefix8": "AAAAAAAA", "isHeadquarter": False},
+        SWIFT_BASE_PROJECTION,
+        None,
+    ),
+    "country listing": (
+        {"countryISO2": "AA"},
+        SWIFT_DETAILED_PROJECTION,
+        None,
+    ),
+    "country page or stream": (
+        {"countryISO2": "AA"},
+        SWIFT_DETAILED_PROJECTION,
+        [("swiftCode", ASCENDING)],
+    ),
+}
+INDEX_BOOTSTRAP_MODES = ("off", "warn", "fail")
+
+
+def plan_stages(plan) -> set[str]:
+    """Every stage name in an explain() plan tree."""
+    stages = set()
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            stages |= plan_stages(value)
+    return stages
+
 
 class SwiftRepository:
 
-    def __init__(self, db: MongoMotorClient):
+    def __init__(
+        self,
+        db: MongoMotorClient,
+        cache: TTLCache | None = None,
+        index: SwiftIndex | None = None,
+        embed_branches: bool = False,
+        versions: VersionRepository | None = None,
+        snapshots: CountrySnapshotRepository | None = None,
+    ):
         self.client = db
+        self.cache = cache
+        self.index = index
+        self.embed_branches = embed_branches
+        self.versions = versions
+        self.snapshots = snapshots
+
+    def invalidate(self, swift_codes):
+        """Drops cached lookups for the given codes and for their parent headquarters."""
+        if self.cache is None:
+            return
+        for swift_code in swift_codes:
+            self.cache.delete(swift_code)
+            self.cache.delete(swift_code[:8] + HEADQUARTER_SUFFIX)
+
+    async def bump_versions(self, docs: list[dict] | None = None):
+        """
+        Bumps the response versions covering docs, or the global one if None. Called
+        last by writes, so a new ETag is never served with content it does not cover.
+        """
+        if self.versions is None:
+            return
+        keys = {GLOBAL_VERSION_KEY} if docs is None else version_keys(docs)
+        await self.versions.bump(keys)
+
+    async def refresh_snapshots(self, docs: list[dict] | None = None):
+        """Rebuilds the country snapshots covering docs, or all of them if None."""
+        if self.snapshots is None:
+            return
+        countries = None if docs is None else {doc["countryISO2"] for doc in docs}
+        await self.snapshots.rebuild(self.client, countries)
 
     async def create_swift(self, swift: SwiftCodeDetailed):
-        if await self.get_swift({"swiftCode": swift.swiftCode}):
+        """
+        Inserts a SWIFT code in a single write. Returns False when the unique
+        swiftCode index rejects it as a duplicate, also under concurrent creates.
+        """
+        swift_dict = self.to_document(swift)
+        if self.embed_branches and swift.isHeadquarter:
+            swift_dict[BRANCHES_FIELD] = []
+        try:
+            result = await self.client.put_item(swift_dict)
+        except DuplicateKeyError:
             return False
+        if self.embed_branches:
+            await self._embed_created(swift)
+        self.invalidate([swift.swiftCode])
+        await self.refresh_snapshots([swift_dict])
+        await self.bump_versions([swift_dict])
+        if self.index is not None:
+            self.index.upsert(swift_dict)
+        return result
+
+    async def _embed_created(self, swift: SwiftCodeDetailed):
+        prefix8 = swift.swiftCode[:8]
+        if not swift.isHeadquarter:
+            # HQs without the array (bulk imports) get the full list from the
+            # backfill; pushing here would leave them with this branch only
+            await self.client.update_item(
+                {
+                    "swiftCode": prefix8 + HEADQUARTER_SUFFIX,
+                    BRANCHES_FIELD: {"$exists": True},
+                },
+                {"$push": {BRANCHES_FIELD: self.to_branch(swift)}},
+            )
+            return
+        # Branches created before their HQ; looked up after the insert so that a
+        # branch created concurrently is either found here or pushes itself
+        branches = await self.client.find(
+            {"swiftCodePrefix8": prefix8, "isHeadquarter": False},
+            SWIFT_BASE_PROJECTION,
+            primary=True,
+        ).to_list(length=None)
+        branches = [self.branch_entry(branch) for branch in branches]
+        if branches:
+            await self.client.update_item(
+                {"swiftCode": swift.swiftCode, BRANCHES_FIELD: {"$exists": True}},
+                {"$addToSet": {BRANCHES_FIELD: {"$each": branches}}},
+            )
+
+    async def create_swifts(
+        self, swifts: list[SwiftCodeDetailed], maintain_embedded: bool = True
+    ) -> list[bool]:
+        """
+        Inserts SWIFT codes in a single unordered batch. Duplicates are rejected by
+        the unique swiftCode index. Returns, per input item, whether it was inserted.
+        Bulk imports pass maintain_embedded=False and run backfill_branches once
+        loaded: their HQs are stored without a branches array until then.
+        """
+        if not swifts:
+            return []
+        inserted = [True] * len(swifts)
+        swift_dicts = [self.to_document(s) for s in swifts]
+        maintain_embedded = self.embed_branches and maintain_embedded
+        if maintain_embedded:
+            for swift_dict in swift_dicts:
+                if swift_dict["isHeadquarter"]:
+                    swift_dict[BRANCHES_FIELD] = []
+        try:
+            await self.client.put_items(swift_dicts)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error["code"] != DUPLICATE_KEY_ERROR_CODE:
+                    raise
+                inserted[error["index"]] = False
+        finally:
+            self.invalidate([s.swiftCode for s in swifts])
+            await self.refresh_snapshots(swift_dicts)
+            await self.bump_versions(swift_dicts)
+        if maintain_embedded:
+            await self._embed_created_many(
+                [s for s, was_inserted in zip(swifts, inserted) if was_inserted]
+            )
+        if self.index is not None:
+            for swift_dict, was_inserted in zip(swift_dicts, inserted):
+                if was_inserted:
+                    self.index.upsert(swift_dict)
+        return inserted
+
+    async def _embed_created_many(self, swifts: list[SwiftCodeDetailed]):
+        """
+        Batch version of _embed_created. Branches inserted together with their HQ
+        are left to the HQ lookup, which finds them; $addToSet still guards against
+        concurrent creates of the same branches.
+        """
+        branches_by_hq: dict[str, list[dict]] = {}
+        hq_prefixes = {s.swiftCode[:8] for s in swifts if s.isHeadquarter}
+        for swift in swifts:
+            if not swift.isHeadquarter and swift.swiftCode[:8] not in hq_prefixes:
+                hq_code = swift.swiftCode[:8] + HEADQUARTER_SUFFIX
+                branches_by_hq.setdefault(hq_code, []).append(self.to_branch(swift))
+        requests = [
+            UpdateOne(
+                {"swiftCode": hq_code, BRANCHES_FIELD: {"$exists": True}},
+                {"$addToSet": {BRANCHES_FIELD: {"$each": branches}}},
+            )
+            for hq_code, branches in branches_by_hq.items()
+        ]
+        if hq_prefixes:
+            existing: dict[str, list[dict]] = {}
+            cursor = self.client.find(
+                {
+                    "swiftCodePrefix8": {"$in": sorted(hq_prefixes)},
+                    "isHeadquarter": False,
+                },
+                SWIFT_BASE_PROJECTION,
+                primary=True,
+            )
+            async for branch in cursor:
+                existing.setdefault(branch["swiftCode"][:8], []).append(
+                    self.branch_entry(branch)
+                )
+            requests += [
+                UpdateOne(
+                    {
+                        "swiftCode": prefix8 + HEADQUARTER_SUFFIX,
+                        BRANCHES_FIELD: {"$exists": True},
+                    },
+                    {"$addToSet": {BRANCHES_FIELD: {"$each": branches}}},
+                )
+                for prefix8, branches in existing.items()
+            ]
+        if requests:
+            await self.client.bulk_write(requests)
+
+    async def get_content_hashes(self) -> dict[str, str | None]:
+        """Maps every stored swiftCode to its content hash, fetching only those two fields."""
+        cursor = self.client.find(
+            {}, {"_id": 0, "swiftCode": 1, CONTENT_HASH_FIELD: 1}, primary=True
+        )
+        return {doc["swiftCode"]: doc.get(CONTENT_HASH_FIELD) async for doc in cursor}
+
+    async def sync_swifts(self, upserts: list[SwiftCodeDetailed], deletes: list[str]):
+        """Applies upserts and deletes as a single unordered bulk_write."""
+        swift_dicts = [self.to_document(s) for s in upserts]
+        requests = [
+            ReplaceOne({"swiftCode": d["swiftCode"]}, d, upsert=True)
+            for d in swift_dicts
+        ]
+        if deletes:
+            requests.append(DeleteMany({"swiftCode": {"$in": deletes}}))
+        if not requests:
+            return None
+        try:
+            result = await self.client.bulk_write(requests)
+        finally:
+            self.invalidate([s.swiftCode for s in upserts] + deletes)
+            # Deletes are known by swiftCode only, without their countries
+            await self.refresh_snapshots()
+            await self.bump_versions()
+        if self.index is not None:
+            for swift_dict in swift_dicts:
+                self.index.upsert(swift_dict)
+            for swift_code in deletes:
+                self.index.remove(swift_code)
+        return result
+
+    async def get_watermark(self) -> tuple[datetime | None, int]:
+        """
+        Returns the newest updatedAt together with the document count. Any insert,
+        replace or delete through SwiftRepository changes at least one of the two.
+        """
+        cursor = (
+            self.client.find({}, {"_id": 0, UPDATED_AT_FIELD: 1})
+            .sort(UPDATED_AT_FIELD, DESCENDING)
+            .limit(1)
+        )
+        latest = await cursor.to_list(length=1)
+        count = await self.client.count()
+        return (latest[0].get(UPDATED_AT_FIELD) if latest else None), count
+
+    async def backfill_branches(self):
+        """
+        Rebuilds the embedded branches array of every HQ document in a single
+        server-side aggregation. sync_swifts replaces whole documents and does not
+        maintain the array, so this runs after each import.
+        """
+        cursor = self.client.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": "$swiftCodePrefix8",
+                        "codes": {
+                            "$push": {
+                                field: f"${field}"
+                                for field in SWIFT_BASE_PROJECTION
+                                if field != "_id"
+                            }
+                        },
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "swiftCode": {"$concat": ["$_id", HEADQUARTER_SUFFIX]},
+                        BRANCHES_FIELD: {
+                            "$filter": {
+                                "input": "$codes",
+                                "cond": {"$not": ["$$this.isHeadquarter"]},
+                            }
+                        },
+                    }
+                },
+                {
+                    "$merge": {
+                        "into": self.client.collection,
+                        "on": "swiftCode",
+                        "whenMatched": "merge",
+                        "whenNotMatched": "discard",
+                    }
+                },
+            ],
+            primary=True,
+        )
+        await cursor.to_list(length=None)
+
+    async def ensure_indexes(self):
+        names = await self.client.create_indexes(SWIFT_CODE_INDEXES)
+        await self.client.drop_indexes(SUPERSEDED_INDEX_NAMES)
+        return names
+
+    async def find_collection_scans(self) -> list[str]:
+        """Names of the HOT_QUERIES whose winning plan scans the whole collection."""
+        scans = []
+        for name, (query, projection, sort) in HOT_QUERIES.items():
+            explained = await self.client.explain(query, projection, sort)
+            if "COLLSCAN" in plan_stages(explained["queryPlanner"]["winningPlan"]):
+                scans.append(name)
+        return scans
+
+    async def bootstrap_indexes(self, mode: str):
+        """
+        Idempotently creates the indexes and checks that the hot queries use them.
+        In "warn" mode problems are logged, in "fail" mode they are raised.
+        """
+        if mode not in INDEX_BOOTSTRAP_MODES:
+            raise ValueError(
+                f"Index bootstrap mode must be one of "
+                f"{', '.join(INDEX_BOOTSTRAP_MODES)}, got '{mode}'"
+            )
+        if mode == "off":
+            return
+        collection = self.client.collection
+        try:
+            await self.ensure_indexes()
+            scans = await self.find_collection_scans()
+        except PyMongoError as e:
+            if mode == "fail":
+                raise
+            logger.warning(f"Could not ensure indexes on '{collection}': {e}")
+            return
+        if not scans:
+            logger.info(f"Indexes on '{collection}' serve all hot queries")
+            return
+        message = f"Collection scans on '{collection}' for: {', '.join(scans)}"
+        if mode == "fail":
+            raise RuntimeError(message)
+        logger.warning(message)
+
+    @staticmethod
+    def content_hash(swift: SwiftCodeDetailed) -> str:
+        payload = json.dumps(swift.model_dump(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @staticmethod
+    def to_document(swift: SwiftCodeDetailed) -> dict:
         swift_dict = swift.model_dump()
         swift_dict["swiftCodePrefix8"] = swift.swiftCode[:8]
-        return await self.client.put_item(swift_dict)
+        swift_dict[CONTENT_HASH_FIELD] = SwiftRepository.content_hash(swift)
+        swift_dict[UPDATED_AT_FIELD] = datetime.now(timezone.utc)
+        return swift_dict
+
+    @staticmethod
+    def to_branch(swift: SwiftCodeDetailed) -> dict:
+        return swift.model_dump(include=set(SwiftCodeBase.model_fields))
+
+    @staticmethod
+    def branch_entry(doc: dict) -> dict:
+        """
+        A stored branch in to_branch key order. Covered queries return fields in
+        index key order, and $addToSet compares embedded documents field by field
+        in order, so unordered entries would be added twice.
+        """
+        return {field: doc[field] for field in SwiftCodeBase.model_fields}
 
     async def get_swift(self, query):
-        res = await self.client.get_item(query)
+        res = await self.client.get_item(query, SWIFT_DETAILED_PROJECTION)
         return res
 
     async def get_swift_with_branches(
-        self, swift_code: str
+        self, swift_code: str, version: str | None = None
     ) -> SwiftCodeHeadquarterGroup:
-        swift_dict = await self.get_swift({"swiftCode": swift_code})
-        if not swift_dict:
-            return None
+        """
+        version is the ETag the response is served with. Local state may lag behind
+        writes made through other replicas, so a versioned read skips the in-memory
+        index and only reuses cache entries loaded under the same version.
+        """
+        if version is None and self.index is not None and self.index.ready:
+            return self.index.get_swift_with_branches(swift_code)
 
-        if swift_dict.get("isHeadquarter"):
-            cursor = self.client.find(
-                {
-                    "swiftCodePrefix8": swift_dict["swiftCode"][:8],
-                    "isHeadquarter": False,
-                }
+        cache_key = swift_code if version is None else (swift_code, version)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        swift = await self._load_swift_with_branches(swift_code)
+        if self.cache is not None and swift is not None:
+            self.cache.set(cache_key, swift)
+        return swift
+
+    async def get_swifts_with_branches(
+        self, swift_codes: list[str]
+    ) -> dict[str, SwiftCodeHeadquarterGroup | SwiftCodeDetailed]:
+        """
+        Batch version of get_swift_with_branches. Codes missing from the cache are
+        resolved with one $in query plus one branch query for all HQ prefixes.
+        Returns only the codes that were found.
+        """
+        if self.index is not None and self.index.ready:
+            found = {
+                code: self.index.get_swift_with_branches(code) for code in swift_codes
+            }
+            return {code: swift for code, swift in found.items() if swift is not None}
+
+        found = {}
+        missing = []
+        for swift_code in dict.fromkeys(swift_codes):
+            cached = self.cache.get(swift_code) if self.cache is not None else None
+            if cached is not None:
+                found[swift_code] = cached
+            else:
+                missing.append(swift_code)
+        if not missing:
+            return found
+
+        projection = (
+            SWIFT_EMBEDDED_PROJECTION
+            if self.embed_branches
+            else SWIFT_DETAILED_PROJECTION
+        )
+        docs = await self.client.find(
+            {"swiftCode": {"$in": missing}}, projection
+        ).to_list(length=None)
+        prefixes = [
+            doc["swiftCode"][:8]
+            for doc in docs
+            if doc["isHeadquarter"] and BRANCHES_FIELD not in doc
+        ]
+        branches_by_prefix: dict[str, list[dict]] = {}
+        if prefixes:
+            branch_cursor = self.client.find(
+                {"swiftCodePrefix8": {"$in": prefixes}, "isHeadquarter": False},
+                SWIFT_BASE_PROJECTION,
+            )
+            async for branch in branch_cursor:
+                branches_by_prefix.setdefault(branch["swiftCode"][:8], []).append(
+                    branch
+                )
+
+        for doc in docs:
+            if not doc["isHeadquarter"]:
+                swift = SwiftCodeDetailed.model_construct(**doc)
+            else:
+                branches = doc.get(BRANCHES_FIELD)
+                if branches is None:
+                    branches = branches_by_prefix.get(doc["swiftCode"][:8], [])
+                swift = construct_headquarter_group(doc, branches)
+            found[doc["swiftCode"]] = swift
+            if self.cache is not None:
+                self.cache.set(doc["swiftCode"], swift)
+        return found
+
+    async def _load_swift_with_branches(
+        self, swift_code: str
+    ) -> SwiftCodeHeadquarterGroup | SwiftCodeDetailed | None:
+        if not swift_code.endswith(HEADQUARTER_SUFFIX):
+            swift_dict = await self.get_swift({"swiftCode": swift_code})
+            if swift_dict is None:
+                return None
+            return SwiftCodeDetailed.model_construct(**swift_dict)
+
+        if self.embed_branches:
+            swift_dict = await self.client.get_item(
+                {"swiftCode": swift_code}, SWIFT_EMBEDDED_PROJECTION
             )
-            branches = []
-            async for b in cursor:
-                branches.append(SwiftCodeBase.model_validate(b))
-            return SwiftCodeHeadquarterGroup(**swift_dict, branches=branches)
+            if swift_dict is None:
+                return None
+            # Documents written by a bulk import carry no array until the backfill
+            if BRANCHES_FIELD in swift_dict:
+                return construct_headquarter_group(
+                    swift_dict, swift_dict[BRANCHES_FIELD]
+                )
+
+        # The HQ and its branches share the 8-character prefix, so a single
+        # aggregation fetches both and splits them server-side
+        cursor = self.client.aggregate(
+            [
+                {"$match": {"swiftCodePrefix8": swift_code[:8]}},
+                {"$project": SWIFT_DETAILED_PROJECTION},
+                {
+                    "$facet": {
+                        "headquarter": [{"$match": {"swiftCode": swift_code}}],
+                        "branches": [
+                            {"$match": {"isHeadquarter": False}},
+                            {"$project": {"countryName": 0}},
+                        ],
+                    }
+                },
+            ]
+        )
+        result = await cursor.to_list(length=1)
+        if not result or not result[0]["headquarter"]:
+            return None
 
-        return SwiftCodeDetailed(**swift_dict)
+        return construct_headquarter_group(
+            result[0]["headquarter"][0], result[0]["branches"]
+        )
 
     async def get_swifts_by_country(
-        self, country_iso2_code: str
+        self,
+        country_iso2_code: str,
+        limit: int | None = None,
+        after: str | None = None,
+        version: str | None = None,
     ) -> SwiftCodeCountryGroup | None:
-        cursor = self.client.find({"countryISO2": country_iso2_code})
-        swift_codes = []
+        """
+        Without limit and after, returns every code of the country, from its snapshot
+        when one exists. Otherwise returns one page in swiftCode order, starting after
+        the given code. Versioned reads skip the in-memory index, as in
+        get_swift_with_branches.
+        """
+        if version is None and self.index is not None and self.index.ready:
+            return self.index.get_swifts_by_country(country_iso2_code, limit, after)
 
-        # Process the first item separately to get country name
-        try:
-            first_swift_doc = await anext(cursor)
-            first_swift_base = SwiftCodeBase.model_validate(first_swift_doc)
-            swift_codes.append(first_swift_base)
-            country_name = first_swift_doc.get("countryName")
+        if limit is not None or after is not None:
+            return await self._get_swifts_by_country_page(
+                country_iso2_code, limit, after
+            )
+
+        if self.snapshots is not None:
+            snapshot = await self.snapshots.get(country_iso2_code)
+            # No snapshot either means no codes or no import since enabling them
+            if snapshot is not None:
+                return snapshot
 
-        except StopAsyncIteration:
+        cursor = self.client.find(
+            {"countryISO2": country_iso2_code}, SWIFT_DETAILED_PROJECTION
+        )
+        docs = [doc async for doc in cursor]
+        if not docs:
             logger.info(f"No SWIFT codes found for country: {country_iso2_code}")
             return None
+        return construct_country_group(
+            country_iso2_code, docs[0].get("countryName"), docs
+        )
 
-        # Process remaining items
-        async for s in cursor:
-            swift_base = SwiftCodeBase.model_validate(s)
-            swift_codes.append(swift_base)
+    async def _get_swifts_by_country_page(
+        self, country_iso2_code: str, limit: int | None, after: str | None
+    ) -> SwiftCodeCountryGroup | None:
+        # One extra document tells whether another page follows
+        cursor = self.iter_swifts_by_country(
+            country_iso2_code, after, limit + 1 if limit is not None else None
+        )
+        docs = [doc async for doc in cursor]
+        if not docs:
+            logger.info(f"No SWIFT codes found for country: {country_iso2_code}")
+            return None
 
-        return SwiftCodeCountryGroup(
-            countryISO2=country_iso2_code,
-            countryName=country_name,
-            swiftCodes=swift_codes,
+        next_after = None
+        if limit is not None and len(docs) > limit:
+            docs = docs[:limit]
+            next_after = docs[-1]["swiftCode"]
+        return construct_country_group(
+            country_iso2_code, docs[0]["countryName"], docs, next_after
         )
 
+    def iter_swifts_by_country(
+        self, country_iso2_code: str, after: str | None = None, limit: int | None = None
+    ):
+        """
+        Returns a cursor over the country's codes in swiftCode order, served by the
+        {countryISO2, swiftCode} index without an in-memory sort.
+        """
+        query = {"countryISO2": country_iso2_code}
+        if after is not None:
+            query["swiftCode"] = {"$gt": after}
+        cursor = self.client.find(query, SWIFT_DETAILED_PROJECTION).sort(
+            "swiftCode", ASCENDING
+        )
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return cursor
+
     async def update_swift(self, query: dict, update):
-        return await self.client.update_item(query, update)
+        """
+        Updates one SWIFT code. The document is read around the update, so cached
+        lookups and index entries of both its previous and its new code are dropped
+        or refreshed, also when the update changes the swiftCode.
+        """
+        before = await self.client.get_item(
+            query, {"_id": 1, "swiftCode": 1}, primary=True
+        )
+        result = await self.client.update_item(query, update)
+        if before is None or not result.modified_count:
+            return result
+        after = await self.client.get_item(
+            {"_id": before["_id"]},
+            {**SWIFT_DETAILED_PROJECTION, "_id": 1},
+            primary=True,
+        )
+        updated = [before] if after is None else [before, after]
+        self.invalidate([doc["swiftCode"] for doc in updated])
+        # The update may have moved the code to another country
+        await self.refresh_snapshots()
+        await self.bump_versions()
+        if self.index is not None:
+            self.index.remove(before["swiftCode"])
+            if after is not None:
+                self.index.upsert(after)
+        return result
+
+    async def delete_swifts(self, swift_codes: list[str]) -> list[bool]:
+        """
+        Deletes SWIFT codes with a single unordered bulk_write. Returns, per input
+        item, whether it was deleted.
+        """
+        if not swift_codes:
+            return []
+        cursor = self.client.find(
+            {"swiftCode": {"$in": swift_codes}}, DELETED_PROJECTION, primary=True
+        )
+        existing_docs = [doc async for doc in cursor]
+        existing = {doc["swiftCode"] for doc in existing_docs}
+        if not existing:
+            return [False] * len(swift_codes)
+
+        requests = [DeleteMany({"swiftCode": {"$in": list(existing)}})]
+        if self.embed_branches:
+            pulls: dict[str, list[str]] = {}
+            for swift_code in existing:
+                if not swift_code.endswith(HEADQUARTER_SUFFIX):
+                    hq_code = swift_code[:8] + HEADQUARTER_SUFFIX
+                    pulls.setdefault(hq_code, []).append(swift_code)
+            requests += [
+                UpdateOne(
+                    {"swiftCode": hq_code},
+                    {"$pull": {BRANCHES_FIELD: {"swiftCode": {"$in": codes}}}},
+                )
+                for hq_code, codes in pulls.items()
+            ]
+        try:
+            await self.client.bulk_write(requests)
+        finally:
+            self.invalidate(existing)
+            await self.refresh_snapshots(existing_docs)
+            await self.bump_versions(existing_docs)
+        if self.index is not None:
+            for swift_code in existing:
+                self.index.remove(swift_code)
+        # Repeated codes count as deleted only once
+        pending = set(existing)
+        deleted = []
+        for swift_code in swift_codes:
+            deleted.append(swift_code in pending)
+            pending.discard(swift_code)
+        return deleted
 
-    async def delete_swift(self, query):
-        return await self.client.delete_item(query)
+    async def delete_swift(self, query) -> dict | None:
+        """Deletes one SWIFT code and returns its swiftCode and countryISO2, or None."""
+        deleted = await self.client.find_one_and_delete(query, DELETED_PROJECTION)
+        if deleted is None:
+            return None
+        swift_code = deleted["swiftCode"]
+        if self.embed_branches and not swift_code.endswith(HEADQUARTER_SUFFIX):
+            await self.client.update_item(
+                {"swiftCode": swift_code[:8] + HEADQUARTER_SUFFIX},
+                {"$pull": {BRANCHES_FIELD: {"swiftCode": swift_code}}},
+            )
+        self.invalidate([swift_code])
+        await self.refresh_snapshots([deleted])
+        await self.bump_versions([deleted])
+        if self.index is not None:
+            self.index.remove(swift_code)
+        return deleted
@@ -1,7 +1,27 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from swiftatlas.repositories.swift_repository import SwiftRepository
+from datetime import datetime, timezone
+from unittest.mock import ANY, AsyncMock, MagicMock
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import (
+    BulkWriteError,
+    DuplicateKeyError,
+    ServerSelectionTimeoutError,
+)
+from swiftatlas.caching.swift_index import SwiftIndex
+from swiftatlas.caching.ttl_cache import TTLCache
+from swiftatlas.repositories.swift_repository import (
+    DELETED_PROJECTION,
+    DUPLICATE_KEY_ERROR_CODE,
+    HOT_QUERIES,
+    SUPERSEDED_INDEX_NAMES,
+    SWIFT_BASE_PROJECTION,
+    SWIFT_DETAILED_PROJECTION,
+    SWIFT_CODE_INDEXES,
+    SWIFT_EMBEDDED_PROJECTION,
+    SwiftRepository,
+)
 from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.snapshot_repository import CountrySnapshotRepository
 from swiftatlas.schemas.swift_schemas import (
     SwiftCodeDetailed,
     SwiftCodeBase,
@@ -15,10 +35,15 @@ def mock_mongo_client():
     client = MagicMock(spec=MongoMotorClient)
     client.get_item = AsyncMock()
     client.put_item = AsyncMock()
+    client.put_items = AsyncMock()
+    client.bulk_write = AsyncMock()
     client.find = MagicMock()
+    client.aggregate = MagicMock()
     client.update_item = AsyncMock()
     client.delete_item = AsyncMock()
+    client.find_one_and_delete = AsyncMock()
     client.scan = AsyncMock()
+    client.count = AsyncMock()
     return client
 
 
@@ -27,6 +52,46 @@ def swift_repository(mock_mongo_client):
     return SwiftRepository(db=mock_mongo_client)
 
 
+@pytest.fixture
+def swift_cache():
+    return TTLCache(max_size=10, ttl=60)
+
+
+@pytest.fixture
+def cached_swift_repository(mock_mongo_client, swift_cache):
+    return SwiftRepository(db=mock_mongo_client, cache=swift_cache)
+
+
+@pytest.fixture
+def swift_index():
+    index = SwiftIndex()
+    index.built_at = 0.0
+    return index
+
+
+@pytest.fixture
+def indexed_swift_repository(mock_mongo_client, swift_index):
+    return SwiftRepository(db=mock_mongo_client, index=swift_index)
+
+
+@pytest.fixture
+def mock_snapshots():
+    snapshots = MagicMock(spec=CountrySnapshotRepository)
+    snapshots.get = AsyncMock(return_value=None)
+    snapshots.rebuild = AsyncMock()
+    return snapshots
+
+
+@pytest.fixture
+def snapshot_swift_repository(mock_mongo_client, mock_snapshots):
+    return SwiftRepository(db=mock_mongo_client, snapshots=mock_snapshots)
+
+
+@pytest.fixture
+def embedded_swift_repository(mock_mongo_client):
+    return SwiftRepository(db=mock_mongo_client, embed_branches=True)
+
+
 @pytest.fixture
 def sample_swift_detailed_obj():
     return SwiftCodeDetailed(
@@ -56,10 +121,19 @@ def sample_swift_branch_obj():
     )
 
 
+def covered_branch(swift: SwiftCodeDetailed) -> dict:
+    """A branch as returned by the covered prefix query, in index key order."""
+    branch = SwiftRepository.to_branch(swift)
+    keys = ["isHeadquarter", "swiftCode", "address", "bankName", "countryISO2"]
+    return {key: branch[key] for key in keys}
+
+
 @pytest.fixture
 def sample_swift_branch_dict(sample_swift_branch_obj):
     swift_code = sample_swift_branch_obj.model_dump()
     swift_code["swiftCodePrefix8"] = swift_code["swiftCode"][:8]
+    swift_code["contentHash"] = SwiftRepository.content_hash(sample_swift_branch_obj)
+    swift_code["updatedAt"] = ANY
     return swift_code
 
 
@@ -67,14 +141,18 @@ def sample_swift_branch_dict(sample_swift_branch_obj):
 async def test_create_swift_new(
     mock_mongo_client, swift_repository, sample_swift_detailed_obj
 ):
-    mock_mongo_client.get_item.return_value = None
     mock_mongo_client.put_item.return_value = MagicMock(inserted_id="some_id")
 
     result = await swift_repository.create_swift(sample_swift_detailed_obj)
 
-    mock_mongo_client.get_item.assert_awaited_once_with({"swiftCode": "BANKUS33XXX"})
+    # A single write, without reading first
+    mock_mongo_client.get_item.assert_not_awaited()
     expected_dict = sample_swift_detailed_obj.model_dump()
     expected_dict["swiftCodePrefix8"] = "BANKUS33"
+    expected_dict["contentHash"] = SwiftRepository.content_hash(
+        sample_swift_detailed_obj
+    )
+    expected_dict["updatedAt"] = ANY
     mock_mongo_client.put_item.assert_awaited_once_with(expected_dict)
     assert result is not False
     assert result.inserted_id == "some_id"
@@ -84,12 +162,164 @@ async def test_create_swift_new(
 async def test_create_swift_existing(
     mock_mongo_client, swift_repository, sample_swift_detailed_obj
 ):
-    mock_mongo_client.get_item.return_value = {"swiftCode": "BANKUS33XXX"}
+    mock_mongo_client.put_item.side_effect = DuplicateKeyError(
+        "E11000 duplicate key error", DUPLICATE_KEY_ERROR_CODE
+    )
+    swift_repository.index = SwiftIndex()
+
     result = await swift_repository.create_swift(sample_swift_detailed_obj)
 
-    mock_mongo_client.get_item.assert_awaited_once_with({"swiftCode": "BANKUS33XXX"})
-    mock_mongo_client.put_item.assert_not_awaited()
+    mock_mongo_client.put_item.assert_awaited_once()
     assert result is False
+    assert len(swift_repository.index) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_swifts_all_inserted(
+    mock_mongo_client,
+    swift_repository,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+    sample_swift_branch_dict,
+):
+    result = await swift_repository.create_swifts(
+        [sample_swift_detailed_obj, sample_swift_branch_obj]
+    )
+
+    expected_hq = sample_swift_detailed_obj.model_dump()
+    expected_hq["swiftCodePrefix8"] = "BANKUS33"
+    expected_hq["contentHash"] = SwiftRepository.content_hash(sample_swift_detailed_obj)
+    expected_hq["updatedAt"] = ANY
+    mock_mongo_client.put_items.assert_awaited_once_with(
+        [expected_hq, sample_swift_branch_dict]
+    )
+    mock_mongo_client.get_item.assert_not_awaited()
+    assert result == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_create_swifts_duplicates(
+    mock_mongo_client,
+    swift_repository,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+):
+    mock_mongo_client.put_items.side_effect = BulkWriteError(
+        {"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate"}]}
+    )
+
+    result = await swift_repository.create_swifts(
+        [sample_swift_detailed_obj, sample_swift_branch_obj]
+    )
+
+    assert result == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_create_swifts_other_write_error(
+    mock_mongo_client, swift_repository, sample_swift_detailed_obj
+):
+    mock_mongo_client.put_items.side_effect = BulkWriteError(
+        {"writeErrors": [{"index": 0, "code": 121, "errmsg": "validation failed"}]}
+    )
+
+    with pytest.raises(BulkWriteError):
+        await swift_repository.create_swifts([sample_swift_detailed_obj])
+
+
+@pytest.mark.asyncio
+async def test_create_swifts_empty(mock_mongo_client, swift_repository):
+    assert await swift_repository.create_swifts([]) == []
+    mock_mongo_client.put_items.assert_not_awaited()
+
+
+def test_content_hash_tracks_content(sample_swift_detailed_obj):
+    same = sample_swift_detailed_obj.model_copy()
+    changed = sample_swift_detailed_obj.model_copy(update={"address": "New Address"})
+
+    assert SwiftRepository.content_hash(sample_swift_detailed_obj) == (
+        SwiftRepository.content_hash(same)
+    )
+    assert SwiftRepository.content_hash(sample_swift_detailed_obj) != (
+        SwiftRepository.content_hash(changed)
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_content_hashes(mock_mongo_client, swift_repository):
+    async def async_gen():
+        yield {"swiftCode": "BANKUS33XXX", "contentHash": "abc"}
+        yield {"swiftCode": "BANKUS33BRC"}
+
+    mock_mongo_client.find.return_value = async_gen()
+
+    result = await swift_repository.get_content_hashes()
+
+    mock_mongo_client.find.assert_called_once_with(
+        {}, {"_id": 0, "swiftCode": 1, "contentHash": 1}, primary=True
+    )
+    assert result == {"BANKUS33XXX": "abc", "BANKUS33BRC": None}
+
+
+@pytest.mark.asyncio
+async def test_sync_swifts(
+    mock_mongo_client,
+    swift_repository,
+    sample_swift_branch_obj,
+    sample_swift_branch_dict,
+):
+    await swift_repository.sync_swifts([sample_swift_branch_obj], ["OLDCODE1XXX"])
+
+    mock_mongo_client.bulk_write.assert_awaited_once_with(
+        [
+            ReplaceOne(
+                {"swiftCode": "BANKUS33BRC"}, sample_swift_branch_dict, upsert=True
+            ),
+            DeleteMany({"swiftCode": {"$in": ["OLDCODE1XXX"]}}),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_swifts_nothing_to_do(mock_mongo_client, swift_repository):
+    assert await swift_repository.sync_swifts([], []) is None
+    mock_mongo_client.bulk_write.assert_not_awaited()
+
+
+def test_to_document(sample_swift_detailed_obj):
+    swift_dict = SwiftRepository.to_document(sample_swift_detailed_obj)
+    assert swift_dict["swiftCodePrefix8"] == "BANKUS33"
+    assert swift_dict["contentHash"] == SwiftRepository.content_hash(
+        sample_swift_detailed_obj
+    )
+    assert swift_dict["updatedAt"].tzinfo == timezone.utc
+
+
+@pytest.mark.asyncio
+async def test_get_watermark(mock_mongo_client, swift_repository):
+    latest = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    cursor = MagicMock()
+    cursor.sort.return_value.limit.return_value.to_list = AsyncMock(
+        return_value=[{"updatedAt": latest}]
+    )
+    mock_mongo_client.find.return_value = cursor
+    mock_mongo_client.count.return_value = 42
+
+    result = await swift_repository.get_watermark()
+
+    mock_mongo_client.find.assert_called_once_with({}, {"_id": 0, "updatedAt": 1})
+    cursor.sort.assert_called_once_with("updatedAt", -1)
+    assert result == (latest, 42)
+
+
+@pytest.mark.asyncio
+async def test_get_watermark_empty(mock_mongo_client, swift_repository):
+    cursor = MagicMock()
+    cursor.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+    mock_mongo_client.find.return_value = cursor
+    mock_mongo_client.count.return_value = 0
+
+    assert await swift_repository.get_watermark() == (None, 0)
 
 
 @pytest.mark.asyncio
@@ -99,7 +329,9 @@ async def test_get_swift(
     mock_mongo_client.get_item.return_value = sample_swift_detailed_dict
     query = {"swiftCode": "TESTCODE"}
     result = await swift_repository.get_swift(query)
-    mock_mongo_client.get_item.assert_awaited_once_with(query)
+    mock_mongo_client.get_item.assert_awaited_once_with(
+        query, SWIFT_DETAILED_PROJECTION
+    )
     assert result["swiftCode"] == "BANKUS33XXX"
     assert result["isHeadquarter"] is True
 
@@ -111,24 +343,24 @@ async def test_get_swift_with_branches_headquarter(
     sample_swift_detailed_dict,
     sample_swift_branch_dict,
 ):
-    hq_dict = sample_swift_detailed_dict
-    branch_dict = sample_swift_branch_dict
-    mock_mongo_client.get_item.return_value = hq_dict
-
-    items = [branch_dict]
-
-    async def async_gen():
-        for item in items:
-            yield item
-
-    mock_mongo_client.find.return_value = async_gen()
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "headquarter": [sample_swift_detailed_dict],
+                "branches": [sample_swift_branch_dict],
+            }
+        ]
+    )
+    mock_mongo_client.aggregate.return_value = cursor
 
     result = await swift_repository.get_swift_with_branches("BANKUS33XXX")
 
-    mock_mongo_client.get_item.assert_awaited_once_with({"swiftCode": "BANKUS33XXX"})
-    mock_mongo_client.find.assert_called_once_with(
-        {"swiftCodePrefix8": "BANKUS33", "isHeadquarter": False}
-    )
+    mock_mongo_client.get_item.assert_not_awaited()
+    mock_mongo_client.find.assert_not_called()
+    mock_mongo_client.aggregate.assert_called_once()
+    pipeline = mock_mongo_client.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"swiftCodePrefix8": "BANKUS33"}}
 
     assert result is not None
     assert isinstance(result, SwiftCodeHeadquarterGroup)
@@ -148,7 +380,9 @@ async def test_get_swift_with_branches_branch(
 
     result = await swift_repository.get_swift_with_branches("BANKUS33BRC")
 
-    mock_mongo_client.get_item.assert_awaited_once_with({"swiftCode": "BANKUS33BRC"})
+    mock_mongo_client.get_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33BRC"}, SWIFT_DETAILED_PROJECTION
+    )
     mock_mongo_client.find.assert_not_called()
     assert isinstance(result, SwiftCodeDetailed)
     assert result.swiftCode == "BANKUS33BRC"
@@ -161,7 +395,23 @@ async def test_get_swift_with_branches_not_found(mock_mongo_client, swift_reposi
 
     result = await swift_repository.get_swift_with_branches("NOTFOUND")
 
-    mock_mongo_client.get_item.assert_awaited_once_with({"swiftCode": "NOTFOUND"})
+    mock_mongo_client.get_item.assert_awaited_once_with(
+        {"swiftCode": "NOTFOUND"}, SWIFT_DETAILED_PROJECTION
+    )
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_swift_with_branches_headquarter_not_found(
+    mock_mongo_client, swift_repository
+):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"headquarter": [], "branches": []}])
+    mock_mongo_client.aggregate.return_value = cursor
+
+    result = await swift_repository.get_swift_with_branches("NOTFOUNDXXX")
+
+    mock_mongo_client.aggregate.assert_called_once()
     assert result is None
 
 
@@ -185,7 +435,9 @@ async def test_get_swifts_by_country(
 
     result = await swift_repository.get_swifts_by_country("US")
 
-    mock_mongo_client.find.assert_called_once_with({"countryISO2": "US"})
+    mock_mongo_client.find.assert_called_once_with(
+        {"countryISO2": "US"}, SWIFT_DETAILED_PROJECTION
+    )
     assert result is not None
     assert isinstance(result, SwiftCodeCountryGroup)
     assert result.countryISO2 == "US"
@@ -208,7 +460,9 @@ async def test_get_swifts_by_country_not_found(mock_mongo_client, swift_reposito
 
     result = await swift_repository.get_swifts_by_country("XX")
 
-    mock_mongo_client.find.assert_called_once_with({"countryISO2": "XX"})
+    mock_mongo_client.find.assert_called_once_with(
+        {"countryISO2": "XX"}, SWIFT_DETAILED_PROJECTION
+    )
     assert result is None
 
 
@@ -225,13 +479,734 @@ async def test_update_swift(mock_mongo_client, swift_repository):
     assert result.modified_count == 1
 
 
+@pytest.mark.asyncio
+async def test_update_swift_refreshes_cache_and_index(
+    mock_mongo_client, sample_swift_branch_dict
+):
+    cache = TTLCache(max_size=10, ttl=60)
+    index = SwiftIndex()
+    index.upsert({**sample_swift_branch_dict, "bankName": "Old Bank"})
+    index.built_at = 1700000000.0
+    repo = SwiftRepository(mock_mongo_client, cache=cache, index=index)
+    cache.set("BANKUS33BRC", "cached branch")
+    cache.set("BANKUS33XXX", "cached hq")
+    renamed = {
+        **sample_swift_branch_dict,
+        "_id": "id-1",
+        "swiftCode": "BANKUS33NEW",
+        "bankName": "Updated Bank",
+    }
+    mock_mongo_client.get_item.side_effect = [
+        {"_id": "id-1", "swiftCode": "BANKUS33BRC"},
+        renamed,
+    ]
+    mock_mongo_client.update_item.return_value = MagicMock(modified_count=1)
+
+    await repo.update_swift(
+        {"swiftCode": "BANKUS33BRC"},
+        {"$set": {"swiftCode": "BANKUS33NEW", "bankName": "Updated Bank"}},
+    )
+
+    assert len(cache) == 0
+    assert index.get_swift_with_branches("BANKUS33BRC") is None
+    assert index.get_swift_with_branches("BANKUS33NEW").bankName == "Updated Bank"
+    mock_mongo_client.get_item.assert_awaited_with(
+        {"_id": "id-1"}, {**SWIFT_DETAILED_PROJECTION, "_id": 1}, primary=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_swift_without_match(mock_mongo_client, swift_repository):
+    mock_mongo_client.get_item.return_value = None
+    mock_mongo_client.update_item.return_value = MagicMock(modified_count=0)
+
+    await swift_repository.update_swift({"swiftCode": "MISSING0XXX"}, {"$set": {}})
+
+    mock_mongo_client.get_item.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_delete_swift(mock_mongo_client, swift_repository):
     query = {"swiftCode": "TESTCODE"}
-    mock_result = MagicMock(deleted_count=1)
-    mock_mongo_client.delete_item.return_value = mock_result
+    deleted = {"swiftCode": "TESTCODE", "countryISO2": "US"}
+    mock_mongo_client.find_one_and_delete.return_value = deleted
 
     result = await swift_repository.delete_swift(query)
 
-    mock_mongo_client.delete_item.assert_awaited_once_with(query)
-    assert result.deleted_count == 1
+    mock_mongo_client.find_one_and_delete.assert_awaited_once_with(
+        query, DELETED_PROJECTION
+    )
+    assert result == deleted
+
+
+@pytest.mark.asyncio
+async def test_delete_swift_not_found(mock_mongo_client, swift_repository):
+    mock_mongo_client.find_one_and_delete.return_value = None
+
+    assert await swift_repository.delete_swift({"swiftCode": "TESTCODE"}) is None
+
+
+@pytest.mark.asyncio
+async def test_get_swift_with_branches_cached(
+    mock_mongo_client, cached_swift_repository, sample_swift_branch_dict
+):
+    mock_mongo_client.get_item.return_value = sample_swift_branch_dict
+
+    first = await cached_swift_repository.get_swift_with_branches("BANKUS33BRC")
+    second = await cached_swift_repository.get_swift_with_branches("BANKUS33BRC")
+
+    mock_mongo_client.get_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33BRC"}, SWIFT_DETAILED_PROJECTION
+    )
+    assert second is first
+
+
+@pytest.mark.asyncio
+async def test_get_swift_with_branches_not_found_is_not_cached(
+    mock_mongo_client, cached_swift_repository, swift_cache
+):
+    mock_mongo_client.get_item.return_value = None
+
+    assert await cached_swift_repository.get_swift_with_branches("NOTFOUND") is None
+    assert len(swift_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_swift_invalidates_parent_headquarter(
+    mock_mongo_client, cached_swift_repository, swift_cache, sample_swift_branch_obj
+):
+    swift_cache.set("BANKUS33XXX", "cached hq")
+    swift_cache.set("OTHERUS1XXX", "unrelated")
+    mock_mongo_client.get_item.return_value = None
+
+    await cached_swift_repository.create_swift(sample_swift_branch_obj)
+
+    assert swift_cache.get("BANKUS33XXX") is None
+    assert swift_cache.get("OTHERUS1XXX") == "unrelated"
+
+
+@pytest.mark.asyncio
+async def test_create_swifts_invalidates(
+    cached_swift_repository, swift_cache, sample_swift_branch_obj
+):
+    swift_cache.set("BANKUS33XXX", "cached hq")
+
+    await cached_swift_repository.create_swifts([sample_swift_branch_obj])
+
+    assert swift_cache.get("BANKUS33XXX") is None
+
+
+@pytest.mark.asyncio
+async def test_delete_swift_invalidates(
+    mock_mongo_client, cached_swift_repository, swift_cache
+):
+    swift_cache.set("BANKUS33BRC", "cached branch")
+    swift_cache.set("BANKUS33XXX", "cached hq")
+    mock_mongo_client.find_one_and_delete.return_value = {
+        "swiftCode": "BANKUS33BRC",
+        "countryISO2": "US",
+    }
+
+    await cached_swift_repository.delete_swift({"swiftCode": "BANKUS33BRC"})
+
+    assert len(swift_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_served_from_index(
+    mock_mongo_client,
+    indexed_swift_repository,
+    swift_index,
+    sample_swift_detailed_dict,
+    sample_swift_branch_dict,
+):
+    swift_index.upsert(sample_swift_detailed_dict)
+    swift_index.upsert(sample_swift_branch_dict)
+
+    hq = await indexed_swift_repository.get_swift_with_branches("BANKUS33XXX")
+    country = await indexed_swift_repository.get_swifts_by_country("US")
+    missing = await indexed_swift_repository.get_swift_with_branches("MISSUS33XXX")
+
+    assert isinstance(hq, SwiftCodeHeadquarterGroup)
+    assert [b.swiftCode for b in hq.branches] == ["BANKUS33BRC"]
+    assert len(country.swiftCodes) == 2
+    assert missing is None
+    mock_mongo_client.get_item.assert_not_awaited()
+    mock_mongo_client.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_database_until_index_is_built(
+    mock_mongo_client, swift_repository, sample_swift_branch_dict
+):
+    swift_repository.index = SwiftIndex()
+    mock_mongo_client.get_item.return_value = sample_swift_branch_dict
+
+    result = await swift_repository.get_swift_with_branches("BANKUS33BRC")
+
+    assert result.swiftCode == "BANKUS33BRC"
+    mock_mongo_client.get_item.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_writes_update_index(
+    mock_mongo_client,
+    indexed_swift_repository,
+    swift_index,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+):
+    mock_mongo_client.get_item.return_value = None
+    await indexed_swift_repository.create_swift(sample_swift_detailed_obj)
+    await indexed_swift_repository.create_swifts([sample_swift_branch_obj])
+    assert len(swift_index) == 2
+
+    mock_mongo_client.find_one_and_delete.return_value = {
+        "swiftCode": "BANKUS33BRC",
+        "countryISO2": "US",
+    }
+    await indexed_swift_repository.delete_swift({"swiftCode": "BANKUS33BRC"})
+    hq = swift_index.get_swift_with_branches("BANKUS33XXX")
+    assert hq.branches == []
+
+    await indexed_swift_repository.sync_swifts([], ["BANKUS33XXX"])
+    assert len(swift_index) == 0
+
+
+@pytest.mark.asyncio
+async def test_embedded_create_branch_pushes_to_headquarter(
+    mock_mongo_client, embedded_swift_repository, sample_swift_branch_obj
+):
+    mock_mongo_client.get_item.return_value = None
+
+    await embedded_swift_repository.create_swift(sample_swift_branch_obj)
+
+    mock_mongo_client.update_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33XXX", "branches": {"$exists": True}},
+        {"$push": {"branches": SwiftRepository.to_branch(sample_swift_branch_obj)}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_embedded_create_headquarter_adopts_existing_branches(
+    mock_mongo_client,
+    embedded_swift_repository,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+):
+    mock_mongo_client.get_item.return_value = None
+    branch = SwiftRepository.to_branch(sample_swift_branch_obj)
+    mock_mongo_client.find.return_value.to_list = AsyncMock(
+        return_value=[covered_branch(sample_swift_branch_obj)]
+    )
+
+    await embedded_swift_repository.create_swift(sample_swift_detailed_obj)
+
+    assert mock_mongo_client.put_item.call_args.args[0]["branches"] == []
+    mock_mongo_client.find.assert_called_once_with(
+        {"swiftCodePrefix8": "BANKUS33", "isHeadquarter": False},
+        SWIFT_BASE_PROJECTION,
+        primary=True,
+    )
+    mock_mongo_client.update_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33XXX", "branches": {"$exists": True}},
+        {"$addToSet": {"branches": {"$each": [branch]}}},
+    )
+    adopted = mock_mongo_client.update_item.call_args.args[1]["$addToSet"]
+    assert list(adopted["branches"]["$each"][0]) == list(branch)
+
+
+@pytest.mark.asyncio
+async def test_embedded_create_branch_leaves_headquarter_without_array(
+    mock_mongo_client,
+    embedded_swift_repository,
+    sample_swift_detailed_dict,
+    sample_swift_branch_obj,
+    sample_swift_branch_dict,
+):
+    # The HQ came from a bulk import and has no branches array yet
+    mock_mongo_client.update_item.return_value = MagicMock(matched_count=0)
+
+    await embedded_swift_repository.create_swift(sample_swift_branch_obj)
+
+    update_filter = mock_mongo_client.update_item.call_args.args[0]
+    assert update_filter["branches"] == {"$exists": True}
+
+    older = {**sample_swift_branch_dict, "swiftCode": "BANKUS33OLD"}
+    mock_mongo_client.get_item.return_value = sample_swift_detailed_dict
+    mock_mongo_client.aggregate.return_value.to_list = AsyncMock(
+        return_value=[
+            {
+                "headquarter": [sample_swift_detailed_dict],
+                "branches": [older, sample_swift_branch_dict],
+            }
+        ]
+    )
+
+    result = await embedded_swift_repository.get_swift_with_branches("BANKUS33XXX")
+
+    mock_mongo_client.aggregate.assert_called_once()
+    assert [b.swiftCode for b in result.branches] == [
+        "BANKUS33OLD",
+        sample_swift_branch_dict["swiftCode"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_embedded_delete_branch_pulls_from_headquarter(
+    mock_mongo_client, embedded_swift_repository
+):
+    mock_mongo_client.find_one_and_delete.return_value = {
+        "swiftCode": "BANKUS33BRC",
+        "countryISO2": "US",
+    }
+
+    await embedded_swift_repository.delete_swift({"swiftCode": "BANKUS33BRC"})
+
+    mock_mongo_client.update_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33XXX"},
+        {"$pull": {"branches": {"swiftCode": "BANKUS33BRC"}}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_embedded_delete_missing_branch_leaves_headquarter(
+    mock_mongo_client, embedded_swift_repository
+):
+    mock_mongo_client.find_one_and_delete.return_value = None
+
+    await embedded_swift_repository.delete_swift({"swiftCode": "BANKUS33BRC"})
+
+    mock_mongo_client.update_item.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_embedded_get_headquarter_is_single_point_read(
+    mock_mongo_client,
+    embedded_swift_repository,
+    sample_swift_detailed_dict,
+    sample_swift_branch_obj,
+):
+    mock_mongo_client.get_item.return_value = {
+        **sample_swift_detailed_dict,
+        "branches": [SwiftRepository.to_branch(sample_swift_branch_obj)],
+    }
+
+    result = await embedded_swift_repository.get_swift_with_branches("BANKUS33XXX")
+
+    mock_mongo_client.get_item.assert_awaited_once_with(
+        {"swiftCode": "BANKUS33XXX"}, SWIFT_EMBEDDED_PROJECTION
+    )
+    mock_mongo_client.aggregate.assert_not_called()
+    assert isinstance(result, SwiftCodeHeadquarterGroup)
+    assert [b.swiftCode for b in result.branches] == ["BANKUS33BRC"]
+
+
+@pytest.mark.asyncio
+async def test_embedded_get_headquarter_without_array_falls_back(
+    mock_mongo_client, embedded_swift_repository, sample_swift_detailed_dict
+):
+    mock_mongo_client.get_item.return_value = sample_swift_detailed_dict
+    mock_mongo_client.aggregate.return_value.to_list = AsyncMock(
+        return_value=[{"headquarter": [sample_swift_detailed_dict], "branches": []}]
+    )
+
+    result = await embedded_swift_repository.get_swift_with_branches("BANKUS33XXX")
+
+    mock_mongo_client.aggregate.assert_called_once()
+    assert result.branches == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_branches(mock_mongo_client, embedded_swift_repository):
+    mock_mongo_client.collection = "swift_codes"
+    mock_mongo_client.aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    await embedded_swift_repository.backfill_branches()
+
+    pipeline = mock_mongo_client.aggregate.call_args.args[0]
+    assert pipeline[0]["$group"]["_id"] == "$swiftCodePrefix8"
+    assert pipeline[-1]["$merge"] == {
+        "into": "swift_codes",
+        "on": "swiftCode",
+        "whenMatched": "merge",
+        "whenNotMatched": "discard",
+    }
+    mock_mongo_client.aggregate.return_value.to_list.assert_awaited_once()
+
+
+def make_cursor(docs):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=docs)
+
+    async def async_iter():
+        for doc in docs:
+            yield doc
+
+    cursor.__aiter__ = lambda self: async_iter()
+    return cursor
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_with_branches(
+    mock_mongo_client,
+    swift_repository,
+    sample_swift_detailed_dict,
+    sample_swift_branch_dict,
+):
+    mock_mongo_client.find.side_effect = [
+        make_cursor([sample_swift_detailed_dict, sample_swift_branch_dict]),
+        make_cursor([sample_swift_branch_dict]),
+    ]
+
+    result = await swift_repository.get_swifts_with_branches(
+        ["BANKUS33XXX", "BANKUS33BRC", "MISSUS33XXX", "BANKUS33XXX"]
+    )
+
+    assert mock_mongo_client.find.call_args_list[0].args == (
+        {"swiftCode": {"$in": ["BANKUS33XXX", "BANKUS33BRC", "MISSUS33XXX"]}},
+        SWIFT_DETAILED_PROJECTION,
+    )
+    assert mock_mongo_client.find.call_args_list[1].args == (
+        {"swiftCodePrefix8": {"$in": ["BANKUS33"]}, "isHeadquarter": False},
+        SWIFT_BASE_PROJECTION,
+    )
+    assert set(result) == {"BANKUS33XXX", "BANKUS33BRC"}
+    assert isinstance(result["BANKUS33XXX"], SwiftCodeHeadquarterGroup)
+    assert [b.swiftCode for b in result["BANKUS33XXX"].branches] == ["BANKUS33BRC"]
+    assert not isinstance(result["BANKUS33BRC"], SwiftCodeHeadquarterGroup)
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_with_branches_skips_branch_query_without_headquarters(
+    mock_mongo_client, swift_repository, sample_swift_branch_dict
+):
+    mock_mongo_client.find.return_value = make_cursor([sample_swift_branch_dict])
+
+    result = await swift_repository.get_swifts_with_branches(["BANKUS33BRC"])
+
+    mock_mongo_client.find.assert_called_once()
+    assert set(result) == {"BANKUS33BRC"}
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_with_branches_uses_cache(
+    mock_mongo_client, cached_swift_repository, swift_cache, sample_swift_branch_dict
+):
+    swift_cache.set("BANKUS33XXX", "cached hq")
+    mock_mongo_client.find.return_value = make_cursor([sample_swift_branch_dict])
+
+    result = await cached_swift_repository.get_swifts_with_branches(
+        ["BANKUS33XXX", "BANKUS33BRC"]
+    )
+
+    mock_mongo_client.find.assert_called_once_with(
+        {"swiftCode": {"$in": ["BANKUS33BRC"]}}, SWIFT_DETAILED_PROJECTION
+    )
+    assert result["BANKUS33XXX"] == "cached hq"
+    assert swift_cache.get("BANKUS33BRC") is result["BANKUS33BRC"]
+
+
+@pytest.mark.asyncio
+async def test_delete_swifts(
+    mock_mongo_client, indexed_swift_repository, swift_index, sample_swift_branch_dict
+):
+    swift_index.upsert(sample_swift_branch_dict)
+    mock_mongo_client.find.return_value = make_cursor([{"swiftCode": "BANKUS33BRC"}])
+
+    result = await indexed_swift_repository.delete_swifts(
+        ["BANKUS33BRC", "MISSUS33XXX", "BANKUS33BRC"]
+    )
+
+    assert result == [True, False, False]
+    mock_mongo_client.bulk_write.assert_awaited_once_with(
+        [DeleteMany({"swiftCode": {"$in": ["BANKUS33BRC"]}})]
+    )
+    assert len(swift_index) == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_swifts_nothing_found(mock_mongo_client, swift_repository):
+    mock_mongo_client.find.return_value = make_cursor([])
+
+    assert await swift_repository.delete_swifts(["MISSUS33XXX"]) == [False]
+    mock_mongo_client.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_embedded_delete_swifts_pulls_branches(
+    mock_mongo_client, embedded_swift_repository
+):
+    mock_mongo_client.find.return_value = make_cursor([{"swiftCode": "BANKUS33BRC"}])
+
+    await embedded_swift_repository.delete_swifts(["BANKUS33BRC"])
+
+    requests = mock_mongo_client.bulk_write.call_args.args[0]
+    assert requests[1] == UpdateOne(
+        {"swiftCode": "BANKUS33XXX"},
+        {"$pull": {"branches": {"swiftCode": {"$in": ["BANKUS33BRC"]}}}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_embedded_create_swifts_maintains_branches(
+    mock_mongo_client,
+    embedded_swift_repository,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+):
+    older = sample_swift_branch_obj.model_copy(update={"swiftCode": "BANKUS33OLD"})
+    other = sample_swift_branch_obj.model_copy(update={"swiftCode": "OTHRUS33BRC"})
+    # The branch inserted with its HQ is found by the lookup, not pushed
+    mock_mongo_client.find.return_value = make_cursor(
+        [covered_branch(older), covered_branch(sample_swift_branch_obj)]
+    )
+
+    await embedded_swift_repository.create_swifts(
+        [sample_swift_detailed_obj, sample_swift_branch_obj, other]
+    )
+
+    assert mock_mongo_client.put_items.call_args.args[0][0]["branches"] == []
+    requests = mock_mongo_client.bulk_write.call_args.args[0]
+    assert requests == [
+        UpdateOne(
+            {"swiftCode": "OTHRUS33XXX", "branches": {"$exists": True}},
+            {"$addToSet": {"branches": {"$each": [SwiftRepository.to_branch(other)]}}},
+        ),
+        UpdateOne(
+            {"swiftCode": "BANKUS33XXX", "branches": {"$exists": True}},
+            {
+                "$addToSet": {
+                    "branches": {
+                        "$each": [
+                            SwiftRepository.to_branch(older),
+                            SwiftRepository.to_branch(sample_swift_branch_obj),
+                        ]
+                    }
+                }
+            },
+        ),
+    ]
+    # Same key order as to_branch, so $addToSet sees equal documents as equal
+    found = requests[1]._doc["$addToSet"]["branches"]["$each"]
+    assert [list(b) for b in found] == [
+        list(SwiftRepository.to_branch(older)),
+        list(SwiftRepository.to_branch(sample_swift_branch_obj)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_embedded_create_swifts_can_leave_branches_to_backfill(
+    mock_mongo_client,
+    embedded_swift_repository,
+    sample_swift_detailed_obj,
+    sample_swift_branch_obj,
+):
+    await embedded_swift_repository.create_swifts(
+        [sample_swift_detailed_obj, sample_swift_branch_obj], maintain_embedded=False
+    )
+
+    assert "branches" not in mock_mongo_client.put_items.call_args.args[0][0]
+    mock_mongo_client.find.assert_not_called()
+    mock_mongo_client.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_by_country_page(
+    mock_mongo_client,
+    swift_repository,
+    sample_swift_detailed_dict,
+    sample_swift_branch_dict,
+):
+    cursor = make_cursor([sample_swift_branch_dict, sample_swift_detailed_dict])
+    mock_mongo_client.find.return_value.sort.return_value.limit.return_value = cursor
+
+    result = await swift_repository.get_swifts_by_country("US", limit=1, after="BANK")
+
+    mock_mongo_client.find.assert_called_once_with(
+        {"countryISO2": "US", "swiftCode": {"$gt": "BANK"}}, SWIFT_DETAILED_PROJECTION
+    )
+    mock_mongo_client.find.return_value.sort.assert_called_once_with("swiftCode", 1)
+    mock_mongo_client.find.return_value.sort.return_value.limit.assert_called_once_with(
+        2
+    )
+    assert [s.swiftCode for s in result.swiftCodes] == ["BANKUS33BRC"]
+    assert result.nextAfter == "BANKUS33BRC"
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_by_country_last_page(
+    mock_mongo_client, swift_repository, sample_swift_detailed_dict
+):
+    cursor = make_cursor([sample_swift_detailed_dict])
+    mock_mongo_client.find.return_value.sort.return_value.limit.return_value = cursor
+
+    result = await swift_repository.get_swifts_by_country("US", limit=1)
+
+    assert len(result.swiftCodes) == 1
+    assert result.nextAfter is None
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_by_country_from_snapshot(
+    mock_mongo_client, mock_snapshots, snapshot_swift_repository
+):
+    snapshot = SwiftCodeCountryGroup.model_construct(
+        countryISO2="US", countryName="UNITED STATES", swiftCodes=[]
+    )
+    mock_snapshots.get.return_value = snapshot
+
+    result = await snapshot_swift_repository.get_swifts_by_country("US")
+
+    assert result is snapshot
+    mock_snapshots.get.assert_awaited_once_with("US")
+    mock_mongo_client.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_swifts_by_country_without_snapshot_queries(
+    mock_mongo_client,
+    snapshot_swift_repository,
+    sample_swift_detailed_dict,
+):
+    mock_mongo_client.find.return_value = make_cursor([sample_swift_detailed_dict])
+
+    result = await snapshot_swift_repository.get_swifts_by_country("US")
+
+    mock_mongo_client.find.assert_called_once_with(
+        {"countryISO2": "US"}, SWIFT_DETAILED_PROJECTION
+    )
+    assert [s.swiftCode for s in result.swiftCodes] == ["BANKUS33XXX"]
+
+
+@pytest.mark.asyncio
+async def test_writes_rebuild_country_snapshots(
+    mock_mongo_client,
+    mock_snapshots,
+    snapshot_swift_repository,
+    sample_swift_detailed_obj,
+):
+    mock_mongo_client.get_item.return_value = None
+    await snapshot_swift_repository.create_swift(sample_swift_detailed_obj)
+    mock_snapshots.rebuild.assert_awaited_once_with(mock_mongo_client, {"US"})
+
+    mock_snapshots.rebuild.reset_mock()
+    mock_mongo_client.find_one_and_delete.return_value = {
+        "swiftCode": "BANKDEFFXXX",
+        "countryISO2": "DE",
+    }
+    await snapshot_swift_repository.delete_swift({"swiftCode": "BANKDEFFXXX"})
+    mock_snapshots.rebuild.assert_awaited_once_with(mock_mongo_client, {"DE"})
+
+    mock_snapshots.rebuild.reset_mock()
+    await snapshot_swift_repository.sync_swifts([], ["BANKDEFFAAA"])
+    mock_snapshots.rebuild.assert_awaited_once_with(mock_mongo_client, None)
+
+
+def test_covering_indexes_hold_detailed_projection():
+    detailed_fields = {f for f in SWIFT_DETAILED_PROJECTION if f != "_id"}
+    covering = [
+        index.document["key"]
+        for index in SWIFT_CODE_INDEXES
+        if set(index.document["key"]) >= detailed_fields
+    ]
+    assert [next(iter(key)) for key in covering] == ["swiftCodePrefix8", "countryISO2"]
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_drops_superseded(mock_mongo_client, swift_repository):
+    mock_mongo_client.create_indexes = AsyncMock(return_value=["swiftCode_1"])
+    mock_mongo_client.drop_indexes = AsyncMock()
+
+    result = await swift_repository.ensure_indexes()
+
+    mock_mongo_client.create_indexes.assert_awaited_once_with(SWIFT_CODE_INDEXES)
+    mock_mongo_client.drop_indexes.assert_awaited_once_with(SUPERSEDED_INDEX_NAMES)
+    assert result == ["swiftCode_1"]
+    # Left behind by the original init-indexes.js
+    assert "countryISO2_1" in SUPERSEDED_INDEX_NAMES
+
+
+def explained(stage: str) -> dict:
+    # Shape of a slot-based-engine plan, with the classic plan under queryPlan
+    return {
+        "queryPlanner": {
+            "winningPlan": {
+                "queryPlan": {
+                    "stage": "PROJECTION_COVERED",
+                    "inputStage": {"stage": stage},
+                },
+                "slotBasedPlan": {"stages": "..."},
+            }
+        }
+    }
+
+
+@pytest.fixture
+def bootstrap_client(mock_mongo_client):
+    mock_mongo_client.collection = "swift_codes"
+    mock_mongo_client.create_indexes = AsyncMock()
+    mock_mongo_client.drop_indexes = AsyncMock()
+    mock_mongo_client.explain = AsyncMock(return_value=explained("IXSCAN"))
+    return mock_mongo_client
+
+
+@pytest.mark.asyncio
+async def test_find_collection_scans(bootstrap_client, swift_repository):
+    bootstrap_client.explain.side_effect = [
+        explained("IXSCAN"),
+        explained("IXSCAN"),
+        explained("COLLSCAN"),
+        explained("IXSCAN"),
+    ]
+
+    scans = await swift_repository.find_collection_scans()
+
+    assert scans == ["country listing"]
+    assert bootstrap_client.explain.await_count == len(HOT_QUERIES)
+    # The full listing runs unsorted, pages and streams in swiftCode order
+    bootstrap_client.explain.assert_any_await(
+        {"countryISO2": "AA"}, SWIFT_DETAILED_PROJECTION, None
+    )
+    bootstrap_client.explain.assert_any_await(
+        {"countryISO2": "AA"}, SWIFT_DETAILED_PROJECTION, [("swiftCode", 1)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_indexes(bootstrap_client, swift_repository):
+    await swift_repository.bootstrap_indexes("fail")
+
+    bootstrap_client.create_indexes.assert_awaited_once_with(SWIFT_CODE_INDEXES)
+    assert bootstrap_client.explain.await_count == len(HOT_QUERIES)
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_indexes_collection_scan(
+    bootstrap_client, swift_repository, caplog
+):
+    bootstrap_client.explain.return_value = explained("COLLSCAN")
+
+    await swift_repository.bootstrap_indexes("warn")
+    assert "Collection scans on 'swift_codes'" in caplog.text
+
+    with pytest.raises(RuntimeError):
+        await swift_repository.bootstrap_indexes("fail")
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_indexes_database_error(bootstrap_client, swift_repository):
+    bootstrap_client.create_indexes.side_effect = ServerSelectionTimeoutError("down")
+
+    await swift_repository.bootstrap_indexes("warn")
+    with pytest.raises(ServerSelectionTimeoutError):
+        await swift_repository.bootstrap_indexes("fail")
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_indexes_off(bootstrap_client, swift_repository):
+    await swift_repository.bootstrap_indexes("off")
+    bootstrap_client.create_indexes.assert_not_awaited()
+
+    with pytest.raises(ValueError):
+        await swift_repository.bootstrap_indexes("strict")
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable
+
+from pymongo import UpdateOne
+
+from swiftatlas.clients.mongo_client import MongoMotorClient
+
+# Bumped by bulk imports, which may touch any code in the collection
+GLOBAL_VERSION_KEY = "global"
+
+
+def prefix_version_key(swift_code: str) -> str:
+    """Covers a code and, for headquarters, the branches returned with it."""
+    return f"prefix:{swift_code[:8]}"
+
+
+def country_version_key(country_iso2_code: str) -> str:
+    return f"country:{country_iso2_code}"
+
+
+def version_keys(docs: Iterable[dict]) -> set[str]:
+    """Keys whose responses change when the given SWIFT code documents change."""
+    keys = set()
+    for doc in docs:
+        keys.add(prefix_version_key(doc["swiftCode"]))
+        keys.add(country_version_key(doc["countryISO2"]))
+    return keys
+
+
+class VersionRepository:
+    """
+    Version counters for cacheable GET responses, stored in their own collection as
+    {_id: key, version, updatedAt}. Every write through SwiftRepository bumps the
+    prefix and country it touched, so ETags are computed from a couple of _id
+    lookups without loading or serializing the response body.
+    """
+
+    def __init__(self, db: MongoMotorClient):
+        self.client = db
+
+    async def bump(self, keys: Iterable[str]):
+        keys = sorted(set(keys))
+        if not keys:
+            return
+        now = datetime.now(timezone.utc)
+        await self.client.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": key},
+                    {"$inc": {"version": 1}, "$set": {"updatedAt": now}},
+                    upsert=True,
+                )
+                for key in keys
+            ]
+        )
+
+    async def get_validators(
+        self, keys: list[str], variant: str = ""
+    ) -> tuple[str, datetime | None]:
+        """
+        Returns a strong ETag over the versions of keys (and the global version) and
+        the newest updatedAt among them, for use as Last-Modified. variant separates
+        representations of the same resource, e.g. different pages.
+        """
+        keys = [GLOBAL_VERSION_KEY, *keys]
+        docs = await self.client.find({"_id": {"$in": keys}}).to_list(length=None)
+        by_key = {doc["_id"]: doc for doc in docs}
+        payload = "|".join(
+            f"{key}={by_key[key]['version'] if key in by_key else 0}" for key in keys
+        )
+        etag = hashlib.sha1(f"{payload}|{variant}".encode()).hexdigest()
+        last_modified = max((doc["updatedAt"] for doc in docs), default=None)
+        if last_modified is not None and last_modified.tzinfo is None:
+            # Motor returns naive UTC datetimes unless tz_aware is set
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return f'"{etag}"', last_modified
@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from pymongo import UpdateOne
+
+from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas.repositories.version_repository import (
+    GLOBAL_VERSION_KEY,
+    VersionRepository,
+    country_version_key,
+    prefix_version_key,
+    version_keys,
+)
+
+
+@pytest.fixture
+def mock_mongo_client():
+    client = MagicMock(spec=MongoMotorClient)
+    client.bulk_write = AsyncMock()
+    client.find = MagicMock()
+    return client
+
+
+@pytest.fixture
+def version_repository(mock_mongo_client):
+    return VersionRepository(mock_mongo_client)
+
+
+def stored_versions(mock_mongo_client, docs):
+    mock_mongo_client.find.return_value.to_list = AsyncMock(return_value=docs)
+
+
+def test_version_keys():
+    docs = [
+        {"swiftCode": "BANKPLPWXXX", "countryISO2": "PL"},
+        {"swiftCode": "BANKPLPWAAA", "countryISO2": "PL"},
+    ]
+    assert version_keys(docs) == {"prefix:BANKPLPW", "country:PL"}
+
+
+@pytest.mark.asyncio
+async def test_bump(mock_mongo_client, version_repository):
+    await version_repository.bump(["country:PL", "prefix:BANKPLPW", "country:PL"])
+
+    requests = mock_mongo_client.bulk_write.call_args.args[0]
+    assert [r._filter for r in requests] == [
+        {"_id": "country:PL"},
+        {"_id": "prefix:BANKPLPW"},
+    ]
+    assert requests[0]._doc["$inc"] == {"version": 1}
+    assert all(isinstance(r, UpdateOne) and r._upsert for r in requests)
+
+
+@pytest.mark.asyncio
+async def test_bump_nothing(mock_mongo_client, version_repository):
+    await version_repository.bump([])
+    mock_mongo_client.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_validators(mock_mongo_client, version_repository):
+    older = datetime(2025, 1, 1, 12, 0)
+    newer = datetime(2025, 1, 2, 12, 0)
+    key = prefix_version_key("BANKPLPWXXX")
+    stored_versions(
+        mock_mongo_client,
+        [
+            {"_id": GLOBAL_VERSION_KEY, "version": 1, "updatedAt": older},
+            {"_id": key, "version": 3, "updatedAt": newer},
+        ],
+    )
+
+    etag, last_modified = await version_repository.get_validators([key], "a")
+
+    mock_mongo_client.find.assert_called_once_with(
+        {"_id": {"$in": [GLOBAL_VERSION_KEY, key]}}
+    )
+    assert etag.startswith('"') and etag.endswith('"')
+    assert last_modified == newer.replace(tzinfo=timezone.utc)
+
+    same_etag, _ = await version_repository.get_validators([key], "a")
+    other_variant, _ = await version_repository.get_validators([key], "b")
+    assert same_etag == etag
+    assert other_variant != etag
+
+
+@pytest.mark.asyncio
+async def test_get_validators_changes_with_version(
+    mock_mongo_client, version_repository
+):
+    key = country_version_key("PL")
+    stored_versions(mock_mongo_client, [])
+    unwritten, last_modified = await version_repository.get_validators([key])
+    assert last_modified is None
+
+    stored_versions(
+        mock_mongo_client,
+        [{"_id": key, "version": 1, "updatedAt": datetime.now(timezone.utc)}],
+    )
+    written, _ = await version_repository.get_validators([key])
+    assert written != unwritten
@@ -0,0 +1,127 @@
+import json
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+from swiftatlas import settings
+from swiftatlas.repositories.version_repository import VersionRepository
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_SERIALIZERS = ("json", "orjson", "pydantic")
+# Streamed NDJSON lines are sent in chunks of about this many bytes. The
+# compression middleware flushes after every chunk, and flushing after every
+# short line would leave deflate nothing to compress across.
+NDJSON_CHUNK_SIZE = 16 * 1024
+
+
+def get_serializer() -> str:
+    serializer = settings.SWIFT_JSON_SERIALIZER
+    if serializer not in JSON_SERIALIZERS:
+        raise ValueError(
+            f"SWIFT_JSON_SERIALIZER must be one of {', '.join(JSON_SERIALIZERS)}, "
+            f"got '{serializer}'"
+        )
+    if serializer == "orjson" and orjson is None:
+        logger.warning("orjson is not installed, serializing with model_dump_json")
+        return "pydantic"
+    return serializer
+
+
+def default_response_class() -> type[Response]:
+    """Response class for endpoints that return plain dicts."""
+    return ORJSONResponse if get_serializer() == "orjson" else JSONResponse
+
+
+def model_response(
+    model: BaseModel, serializer: str | None = None, **dump_options
+) -> Response:
+    """
+    Serializes a model built by the repository straight to JSON with the configured
+    serializer. Returning a Response skips FastAPI's response_model validation,
+    which would re-check data that was already validated on write; response_model
+    is kept for the OpenAPI schema.
+    """
+    serializer = serializer or get_serializer()
+    if serializer == "orjson":
+        return ORJSONResponse(model.model_dump(**dump_options))
+    if serializer == "json":
+        return JSONResponse(model.model_dump(mode="json", **dump_options))
+    return Response(
+        model.model_dump_json(**dump_options), media_type="application/json"
+    )
+
+
+def ndjson_line(doc: dict) -> bytes:
+    if get_serializer() == "orjson":
+        return orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(doc, separators=(",", ":")) + "\n").encode()
+
+
+async def ndjson_chunks(
+    docs: AsyncIterable[dict], chunk_size: int = NDJSON_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Serializes docs as NDJSON, yielding whole lines in chunks of chunk_size bytes."""
+    buffer = bytearray()
+    async for doc in docs:
+        buffer += ndjson_line(doc)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def check_not_modified(
+    request: Request,
+    versions: VersionRepository | None,
+    keys: list[str],
+    variant: str = "",
+) -> tuple[dict[str, str], Response | None]:
+    """
+    Computes the ETag and Last-Modified of a GET response from version counters, so
+    no body is built to answer a conditional request. Returns the caching headers
+    for the full response, and a 304 response when the client copy is current.
+    """
+    if versions is None:
+        return {}, None
+    etag, last_modified = await versions.get_validators(
+        keys, f"{get_serializer()}|{variant}"
+    )
+    headers = {"ETag": etag, "Cache-Control": settings.SWIFT_HTTP_CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if is_not_modified(request, etag, last_modified):
+        return headers, Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    return headers, None
+
+
+def is_not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison, and takes precedence
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
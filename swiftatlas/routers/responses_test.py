@@ -0,0 +1,153 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from fastapi import Request
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from swiftatlas.middleware.compression import StreamCompressor
+from swiftatlas.routers.responses import (
+    JSON_SERIALIZERS,
+    default_response_class,
+    get_serializer,
+    is_not_modified,
+    model_response,
+    ndjson_chunks,
+    ndjson_line,
+)
+from swiftatlas.schemas.swift_schemas import SwiftCodeBase, SwiftCodeCountryGroup
+
+
+@pytest.fixture
+def country_group():
+    return SwiftCodeCountryGroup(
+        countryISO2="PL",
+        countryName="POLAND",
+        swiftCodes=[
+            SwiftCodeBase(
+                address="Address",
+                bankName="Bank",
+                countryISO2="PL",
+                isHeadquarter=True,
+                swiftCode="BANKPLPWXXX",
+            )
+        ],
+    )
+
+
+@pytest.mark.parametrize("serializer", JSON_SERIALIZERS)
+def test_model_response_serializers_agree(serializer, country_group):
+    response = model_response(country_group, serializer, exclude_none=True)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == country_group.model_dump(exclude_none=True)
+
+
+@pytest.mark.parametrize("serializer", JSON_SERIALIZERS)
+def test_ndjson_line(serializer):
+    with patch("swiftatlas.settings.SWIFT_JSON_SERIALIZER", serializer):
+        line = ndjson_line({"swiftCode": "BANKPLPWXXX", "isHeadquarter": True})
+
+    assert line.endswith(b"\n")
+    assert json.loads(line) == {"swiftCode": "BANKPLPWXXX", "isHeadquarter": True}
+
+
+def make_branch_docs(count):
+    return [
+        {
+            "address": f"{i} MAIN STREET, WARSZAWA",
+            "bankName": "TEST BANK POLSKA S.A.",
+            "countryISO2": "PL",
+            "isHeadquarter": False,
+            "swiftCode": f"BANKPLPW{i:03d}",
+        }
+        for i in range(count)
+    ]
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+async def iterate(docs):
+    for doc in docs:
+        yield doc
+
+
+@pytest.mark.asyncio
+async def test_ndjson_chunks_batches_whole_lines():
+    docs = make_branch_docs(500)
+
+    chunks = await collect(ndjson_chunks(iterate(docs), chunk_size=4096))
+
+    assert len(chunks) < len(docs) // 10
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == docs
+
+
+@pytest.mark.asyncio
+async def test_ndjson_chunks_compress_better_than_lines():
+    docs = make_branch_docs(1000)
+
+    def streamed_size(chunks):
+        compressor = StreamCompressor("gzip")
+        return sum(
+            len(compressor.compress(chunk, last=False)) for chunk in chunks
+        ) + len(compressor.compress(b"", last=True))
+
+    per_line = streamed_size([ndjson_line(doc) for doc in docs])
+    chunked = streamed_size(await collect(ndjson_chunks(iterate(docs))))
+
+    assert chunked * 2 < per_line
+
+
+def test_default_response_class():
+    with patch("swiftatlas.settings.SWIFT_JSON_SERIALIZER", "orjson"):
+        assert default_response_class() is ORJSONResponse
+    with patch("swiftatlas.settings.SWIFT_JSON_SERIALIZER", "pydantic"):
+        assert default_response_class() is JSONResponse
+
+
+def test_unknown_serializer_is_rejected():
+    with patch("swiftatlas.settings.SWIFT_JSON_SERIALIZER", "ujson"):
+        with pytest.raises(ValueError):
+            get_serializer()
+
+
+def make_request(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+LAST_MODIFIED = datetime(2025, 1, 2, 12, 0, 0, 500, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, False),
+        ({"If-None-Match": '"abc"'}, True),
+        ({"If-None-Match": 'W/"abc"'}, True),
+        ({"If-None-Match": '"old", "abc"'}, True),
+        ({"If-None-Match": "*"}, True),
+        ({"If-None-Match": '"old"'}, False),
+        ({"If-Modified-Since": "Thu, 02 Jan 2025 12:00:00 GMT"}, True),
+        ({"If-Modified-Since": "Thu, 02 Jan 2025 11:59:59 GMT"}, False),
+        ({"If-Modified-Since": "not a date"}, False),
+        # If-None-Match takes precedence over If-Modified-Since
+        (
+            {
+                "If-None-Match": '"old"',
+                "If-Modified-Since": "Thu, 02 Jan 2025 12:00:00 GMT",
+            },
+            False,
+        ),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(make_request(headers), '"abc"', LAST_MODIFIED) is expected
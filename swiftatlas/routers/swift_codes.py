@@ -1,18 +1,42 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 from typing import Union
 
-from swiftatlas.clients.mongo_client import MongoMotorClient
+from swiftatlas import settings
+from swiftatlas.caching.swift_index import SwiftIndex
 from swiftatlas.repositories.swift_repository import SwiftRepository
+from swiftatlas.repositories.version_repository import (
+    VersionRepository,
+    country_version_key,
+    prefix_version_key,
+)
+from swiftatlas.routers.responses import (
+    check_not_modified,
+    default_response_class,
+    model_response,
+    ndjson_chunks,
+)
 from swiftatlas.schemas.swift_schemas import (
     SwiftCodeBase,
+    SwiftCodeBatchRequest,
+    SwiftCodeBatchResponse,
+    SwiftCodeBatchResult,
+    SwiftCodeBulkCreateRequest,
+    SwiftCodeBulkResponse,
+    SwiftCodeBulkResult,
     SwiftCodeDetailed,
     SwiftCodeHeadquarterGroup,
     SwiftCodeCountryGroup,
 )
 
-router = APIRouter(prefix="/v1/swift-codes", tags=["swift-codes"])
+router = APIRouter(
+    prefix="/v1/swift-codes",
+    tags=["swift-codes"],
+    default_response_class=default_response_class(),
+)
 logger = logging.getLogger(__name__)
 
 
@@ -40,41 +64,267 @@ async def validate_path_country_iso2_code(country_iso2_code: str) -> str:
         )
 
 
-async def get_swift_repository() -> SwiftRepository:
-    from swiftatlas.main import app
+async def get_swift_repository(request: Request) -> SwiftRepository:
+    return request.app.state.swift_repository
+
+
+async def get_version_repository(request: Request) -> VersionRepository | None:
+    return request.app.state.swift_versions
+
+
+async def get_swift_index(request: Request) -> SwiftIndex | None:
+    return request.app.state.swift_index
+
+
+@router.get("/index/stats")
+async def get_swift_index_stats(
+    index: SwiftIndex | None = Depends(get_swift_index),
+):
+    """
+    Returns the size and build time of the in-memory SWIFT index.
+    """
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="In-memory SWIFT index is disabled.",
+        )
+    return index.stats()
+
+
+@router.post("/batch-get", response_model=SwiftCodeBatchResponse)
+async def batch_get_swift_codes(
+    request: SwiftCodeBatchRequest,
+    repo: SwiftRepository = Depends(get_swift_repository),
+):
+    """
+    Looks up many SWIFT codes at once. Results are returned in request order, each
+    with a found, not_found or invalid status.
+    """
+    if len(request.swiftCodes) > settings.SWIFT_BATCH_MAX_CODES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.SWIFT_BATCH_MAX_CODES} SWIFT codes can be "
+            f"looked up per request.",
+        )
+
+    validated: list[tuple[str, str | None, str | None]] = []
+    for swift_code in request.swiftCodes:
+        try:
+            validated.append(
+                (swift_code, SwiftCodeBase.validate_swift_code(swift_code), None)
+            )
+        except ValueError as e:
+            validated.append((swift_code, None, f"Invalid SWIFT code format: {e}"))
+
+    found = await repo.get_swifts_with_branches(
+        [code for _, code, _ in validated if code is not None]
+    )
+
+    results = []
+    for swift_code, code, error in validated:
+        if code is None:
+            results.append(
+                SwiftCodeBatchResult(
+                    swiftCode=swift_code, status="invalid", detail=error
+                )
+            )
+        elif code in found:
+            results.append(
+                SwiftCodeBatchResult(swiftCode=code, status="found", data=found[code])
+            )
+        else:
+            results.append(
+                SwiftCodeBatchResult(
+                    swiftCode=code, status="not_found", detail="SWIFT code not found"
+                )
+            )
+    logger.info(f"Batch lookup of {len(results)} SWIFT codes, {len(found)} found")
+    return model_response(SwiftCodeBatchResponse(results=results))
+
 
-    return SwiftRepository(MongoMotorClient(app.mongodb, "swift_codes"))
+def check_bulk_size(items: list):
+    if len(items) > settings.SWIFT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.SWIFT_BULK_MAX_ITEMS} items can be "
+            f"written per request.",
+        )
+
+
+@router.post("/bulk", response_model=SwiftCodeBulkResponse)
+async def add_swift_codes(
+    request: SwiftCodeBulkCreateRequest,
+    repo: SwiftRepository = Depends(get_swift_repository),
+):
+    """
+    Adds many SWIFT code entries in a single unordered write. Duplicates are
+    reported per item, as detected by the unique swiftCode index.
+    """
+    check_bulk_size(request.swiftCodes)
+
+    results: list[SwiftCodeBulkResult] = []
+    valid: list[tuple[int, SwiftCodeDetailed]] = []
+    for item in request.swiftCodes:
+        try:
+            swift = SwiftCodeDetailed.model_validate(item)
+        except ValidationError as e:
+            detail = "; ".join(error["msg"] for error in e.errors())
+            code = item.get("swiftCode")
+            results.append(
+                SwiftCodeBulkResult(
+                    swiftCode=code if isinstance(code, str) else None,
+                    status="invalid",
+                    detail=detail,
+                )
+            )
+            continue
+        valid.append((len(results), swift))
+        results.append(SwiftCodeBulkResult(swiftCode=swift.swiftCode, status="created"))
+
+    inserted = await repo.create_swifts([swift for _, swift in valid])
+    for (position, _), was_inserted in zip(valid, inserted):
+        if not was_inserted:
+            results[position].status = "duplicate"
+
+    logger.info(
+        f"Bulk create of {len(results)} SWIFT codes: {sum(inserted)} created, "
+        f"{len(inserted) - sum(inserted)} duplicate, "
+        f"{len(results) - len(inserted)} invalid"
+    )
+    return model_response(SwiftCodeBulkResponse(results=results))
+
+
+@router.delete("/bulk", response_model=SwiftCodeBulkResponse)
+async def delete_swift_codes(
+    request: SwiftCodeBatchRequest,
+    repo: SwiftRepository = Depends(get_swift_repository),
+):
+    """
+    Deletes many SWIFT code entries in a single unordered write.
+    """
+    check_bulk_size(request.swiftCodes)
+
+    results: list[SwiftCodeBulkResult] = []
+    valid: list[tuple[int, str]] = []
+    for swift_code in request.swiftCodes:
+        try:
+            code = SwiftCodeBase.validate_swift_code(swift_code)
+        except ValueError as e:
+            results.append(
+                SwiftCodeBulkResult(
+                    swiftCode=swift_code,
+                    status="invalid",
+                    detail=f"Invalid SWIFT code format: {e}",
+                )
+            )
+            continue
+        valid.append((len(results), code))
+        results.append(SwiftCodeBulkResult(swiftCode=code, status="deleted"))
+
+    deleted = await repo.delete_swifts([code for _, code in valid])
+    for (position, _), was_deleted in zip(valid, deleted):
+        if not was_deleted:
+            results[position].status = "not_found"
+
+    logger.info(
+        f"Bulk delete of {len(results)} SWIFT codes: {sum(deleted)} deleted, "
+        f"{len(deleted) - sum(deleted)} not found, "
+        f"{len(results) - len(deleted)} invalid"
+    )
+    return model_response(SwiftCodeBulkResponse(results=results))
 
 
 @router.get(
     "/{swift_code}", response_model=Union[SwiftCodeDetailed, SwiftCodeHeadquarterGroup]
 )
 async def get_swift_code_details(
+    request: Request,
     swift_code: str = Depends(validate_path_swift_code),
     repo: SwiftRepository = Depends(get_swift_repository),
+    versions: VersionRepository | None = Depends(get_version_repository),
 ):
-    swift = await repo.get_swift_with_branches(swift_code)
+    headers, not_modified = await check_not_modified(
+        request, versions, [prefix_version_key(swift_code)], swift_code
+    )
+    if not_modified is not None:
+        return not_modified
+
+    swift = await repo.get_swift_with_branches(swift_code, version=headers.get("ETag"))
     if not swift:
         raise HTTPException(status_code=404, detail="SWIFT code not found")
 
-    return swift
+    response = model_response(swift)
+    response.headers.update(headers)
+    return response
 
 
-@router.get("/country/{country_iso2_code}", response_model=SwiftCodeCountryGroup)
+@router.get(
+    "/country/{country_iso2_code}",
+    response_model=SwiftCodeCountryGroup,
+    response_model_exclude_none=True,
+)
 async def get_swift_codes_by_country(
+    request: Request,
     country_iso2_code: str = Depends(validate_path_country_iso2_code),
+    limit: int | None = Query(None, ge=1),
+    after: str | None = None,
+    stream: bool = False,
     repo: SwiftRepository = Depends(get_swift_repository),
+    versions: VersionRepository | None = Depends(get_version_repository),
 ):
     """
     Retrieve all SWIFT codes (headquarters and branches) for a specific country.
+    Pass limit (and then the returned nextAfter as after) to page through them in
+    swiftCode order, or stream=true to receive them as NDJSON, one code per line.
     """
-    result = await repo.get_swifts_by_country(country_iso2_code)
+    if limit is not None and limit > settings.SWIFT_COUNTRY_MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"limit must not exceed {settings.SWIFT_COUNTRY_MAX_PAGE_SIZE}.",
+        )
+
+    if stream:
+        return await stream_swift_codes_by_country(
+            repo.iter_swifts_by_country(country_iso2_code, after, limit)
+        )
+
+    headers, not_modified = await check_not_modified(
+        request,
+        versions,
+        [country_version_key(country_iso2_code)],
+        f"{country_iso2_code}|{limit}|{after}",
+    )
+    if not_modified is not None:
+        return not_modified
+
+    result = await repo.get_swifts_by_country(
+        country_iso2_code, limit, after, version=headers.get("ETag")
+    )
     if not result:
         raise HTTPException(
             status_code=404, detail="No SWIFT codes found for this country"
         )
     logger.info(f"Retrieved SWIFT codes for country {country_iso2_code}")
-    return result
+    response = model_response(result, exclude_none=True)
+    response.headers.update(headers)
+    return response
+
+
+async def stream_swift_codes_by_country(cursor) -> StreamingResponse:
+    # Read the first document up front so an unknown country still gets a 404
+    try:
+        first = await anext(cursor)
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=404, detail="No SWIFT codes found for this country"
+        )
+
+    async def docs():
+        yield first
+        async for doc in cursor:
+            yield doc
+
+    return StreamingResponse(ndjson_chunks(docs()), media_type="application/x-ndjson")
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -110,8 +360,8 @@ async def delete_swift_code(
     """
     Deletes a SWIFT code entry from the database.
     """
-    result = await repo.delete_swift({"swiftCode": swift_code})
-    if result.deleted_count == 0:
+    deleted = await repo.delete_swift({"swiftCode": swift_code})
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"SWIFT code {swift_code} not found.",
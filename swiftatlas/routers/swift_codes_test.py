@@ -1,10 +1,24 @@
+import asyncio
+import json
+import httpx
 import pytest
+from datetime import datetime, timezone
 from fastapi import status
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+from swiftatlas import settings
+from swiftatlas.caching.swift_index import SwiftIndex
+from swiftatlas.caching.ttl_cache import TTLCache
 from swiftatlas.main import app
-from swiftatlas.repositories.swift_repository import SwiftRepository
+from swiftatlas.repositories.version_repository import VersionRepository
+from swiftatlas.routers.swift_codes import get_swift_index, get_version_repository
+from swiftatlas.repositories.swift_repository import (
+    DELETED_PROJECTION,
+    DUPLICATE_KEY_ERROR_CODE,
+    SWIFT_DETAILED_PROJECTION,
+    SwiftRepository,
+)
 from swiftatlas.schemas.swift_schemas import (
     SwiftCodeDetailed,
     SwiftCodeHeadquarterGroup,
@@ -12,7 +26,8 @@ from swiftatlas.schemas.swift_schemas import (
     SwiftCodeBase,
 )
 from swiftatlas.clients.mongo_client import MongoMotorClient
-from pymongo.results import InsertOneResult, DeleteResult
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import InsertOneResult
 
 TEST_SWIFT_CODE_HQ = "AAAABBCCXXX"
 TEST_SWIFT_CODE_BRANCH = "AAAABBCCDDD"
@@ -28,7 +43,9 @@ def mock_mongo_client():
     client.get_item = AsyncMock()
     client.put_item = AsyncMock()
     client.find = MagicMock()  # find returns a cursor-like object
+    client.aggregate = MagicMock()
     client.delete_item = AsyncMock()
+    client.find_one_and_delete = AsyncMock()
     return client
 
 
@@ -48,8 +65,10 @@ def client(mock_swift_repository):
     app.dependency_overrides[get_swift_repository] = (
         override_get_swift_repository  # get_swift_repository needs to be imported
     )
-    with TestClient(app) as c:
-        yield c
+    # No database to build and explain indexes against
+    with patch("swiftatlas.settings.SWIFT_INDEX_BOOTSTRAP", "off"):
+        with TestClient(app) as c:
+            yield c
     # Clean up overrides after tests
     app.dependency_overrides = {}
 
@@ -86,6 +105,8 @@ def branch_swift_detailed():
 def hq_swift_dict(hq_swift_detailed):
     d = hq_swift_detailed.model_dump()
     d["swiftCodePrefix8"] = d["swiftCode"][:8]
+    d["contentHash"] = SwiftRepository.content_hash(hq_swift_detailed)
+    d["updatedAt"] = ANY
     return d
 
 
@@ -93,6 +114,8 @@ def hq_swift_dict(hq_swift_detailed):
 def branch_swift_dict(branch_swift_detailed):
     d = branch_swift_detailed.model_dump()
     d["swiftCodePrefix8"] = d["swiftCode"][:8]
+    d["contentHash"] = SwiftRepository.content_hash(branch_swift_detailed)
+    d["updatedAt"] = ANY
     return d
 
 
@@ -100,7 +123,6 @@ def test_add_swift_code_hq_success(
     client, mock_swift_repository, hq_swift_detailed, hq_swift_dict
 ):
     """Test adding a new headquarter SWIFT code successfully."""
-    mock_swift_repository.client.get_item.return_value = None  # Simulate not found
     mock_swift_repository.client.put_item.return_value = InsertOneResult(
         inserted_id="some_id", acknowledged=True
     )
@@ -113,9 +135,7 @@ def test_add_swift_code_hq_success(
         response.json()["message"]
         == f"SWIFT code {TEST_SWIFT_CODE_HQ} added successfully."
     )
-    mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_HQ}
-    )
+    mock_swift_repository.client.get_item.assert_not_awaited()
     mock_swift_repository.client.put_item.assert_awaited_once_with(hq_swift_dict)
 
 
@@ -123,7 +143,6 @@ def test_add_swift_code_branch_success(
     client, mock_swift_repository, branch_swift_detailed, branch_swift_dict
 ):
     """Test adding a new branch SWIFT code successfully."""
-    mock_swift_repository.client.get_item.return_value = None  # Simulate not found
     mock_swift_repository.client.put_item.return_value = InsertOneResult(
         inserted_id="some_other_id", acknowledged=True
     )
@@ -136,9 +155,7 @@ def test_add_swift_code_branch_success(
         response.json()["message"]
         == f"SWIFT code {TEST_SWIFT_CODE_BRANCH} added successfully."
     )
-    mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_BRANCH}
-    )
+    mock_swift_repository.client.get_item.assert_not_awaited()
     mock_swift_repository.client.put_item.assert_awaited_once_with(branch_swift_dict)
 
 
@@ -146,8 +163,9 @@ def test_add_swift_code_conflict(
     client, mock_swift_repository, hq_swift_detailed, hq_swift_dict
 ):
     """Test adding a SWIFT code that already exists."""
-    mock_swift_repository.client.get_item.return_value = (
-        hq_swift_dict  # Simulate already exists
+    # Simulate the unique swiftCode index rejecting the insert
+    mock_swift_repository.client.put_item.side_effect = DuplicateKeyError(
+        "E11000 duplicate key error", DUPLICATE_KEY_ERROR_CODE
     )
 
     payload = hq_swift_detailed.model_dump()
@@ -157,22 +175,19 @@ def test_add_swift_code_conflict(
     assert response.json() == {
         "detail": f"Attempted to add duplicate SWIFT code {TEST_SWIFT_CODE_HQ}."
     }
-    mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_HQ}
-    )
-    mock_swift_repository.client.put_item.assert_not_awaited()
+    mock_swift_repository.client.get_item.assert_not_awaited()
+    mock_swift_repository.client.put_item.assert_awaited_once_with(hq_swift_dict)
 
 
 def test_get_swift_code_details_hq(
     client, mock_swift_repository, hq_swift_dict, branch_swift_dict
 ):
     """Test retrieving details for the headquarter SWIFT code."""
-    mock_swift_repository.client.get_item.return_value = hq_swift_dict
-
-    async def mock_cursor_iter():
-        yield branch_swift_dict
-
-    mock_swift_repository.client.find.return_value = mock_cursor_iter()
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(
+        return_value=[{"headquarter": [hq_swift_dict], "branches": [branch_swift_dict]}]
+    )
+    mock_swift_repository.client.aggregate.return_value = cursor
 
     response = client.get(f"/v1/swift-codes/{TEST_SWIFT_CODE_HQ}")
 
@@ -185,12 +200,10 @@ def test_get_swift_code_details_hq(
     assert len(data["branches"]) == 1
     assert data["branches"][0]["swiftCode"] == TEST_SWIFT_CODE_BRANCH
 
-    mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_HQ}
-    )
-    mock_swift_repository.client.find.assert_called_once_with(
-        {"swiftCodePrefix8": TEST_SWIFT_CODE_HQ[:8], "isHeadquarter": False}
-    )
+    # Headquarter and branches come back in a single round trip
+    mock_swift_repository.client.aggregate.assert_called_once()
+    mock_swift_repository.client.get_item.assert_not_awaited()
+    mock_swift_repository.client.find.assert_not_called()
 
 
 def test_get_swift_code_details_branch(
@@ -209,7 +222,7 @@ def test_get_swift_code_details_branch(
     assert "branches" not in data  # Branches don't have branches list
 
     mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_BRANCH}
+        {"swiftCode": TEST_SWIFT_CODE_BRANCH}, SWIFT_DETAILED_PROJECTION
     )
     mock_swift_repository.client.find.assert_not_called()
 
@@ -237,21 +250,21 @@ def test_get_swift_codes_by_country(
     assert TEST_SWIFT_CODE_BRANCH in codes_found
 
     mock_swift_repository.client.find.assert_called_once_with(
-        {"countryISO2": TEST_COUNTRY_ISO}
+        {"countryISO2": TEST_COUNTRY_ISO}, SWIFT_DETAILED_PROJECTION
     )
 
 
 def test_get_swift_code_details_not_found(client, mock_swift_repository):
     """Test retrieving a SWIFT code that does not exist."""
-    mock_swift_repository.client.get_item.return_value = None
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"headquarter": [], "branches": []}])
+    mock_swift_repository.client.aggregate.return_value = cursor
 
     response = client.get("/v1/swift-codes/ZZZZZZZZXXX")
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json() == {"detail": "SWIFT code not found"}
-    mock_swift_repository.client.get_item.assert_awaited_once_with(
-        {"swiftCode": "ZZZZZZZZXXX"}
-    )
+    mock_swift_repository.client.aggregate.assert_called_once()
 
 
 @pytest.mark.parametrize(
@@ -280,7 +293,7 @@ def test_get_swift_codes_by_country_not_found(client, mock_swift_repository):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json() == {"detail": "No SWIFT codes found for this country"}
     mock_swift_repository.client.find.assert_called_once_with(
-        {"countryISO2": TEST_NONEXISTENT_COUNTRY}
+        {"countryISO2": TEST_NONEXISTENT_COUNTRY}, SWIFT_DETAILED_PROJECTION
     )
 
 
@@ -323,9 +336,10 @@ def test_add_swift_code_validation_error(client, mock_swift_repository):
 
 def test_delete_swift_code_success(client, mock_swift_repository):
     """Test successfully deleting a SWIFT code."""
-    mock_swift_repository.client.delete_item.return_value = DeleteResult(
-        {"n": 1}, acknowledged=True
-    )
+    mock_swift_repository.client.find_one_and_delete.return_value = {
+        "swiftCode": TEST_SWIFT_CODE_HQ,
+        "countryISO2": TEST_COUNTRY_ISO,
+    }
 
     response = client.delete(f"/v1/swift-codes/{TEST_SWIFT_CODE_HQ}")
 
@@ -333,16 +347,14 @@ def test_delete_swift_code_success(client, mock_swift_repository):
     assert response.json() == {
         "message": f"SWIFT code {TEST_SWIFT_CODE_HQ} deleted successfully."
     }
-    mock_swift_repository.client.delete_item.assert_awaited_once_with(
-        {"swiftCode": TEST_SWIFT_CODE_HQ}
+    mock_swift_repository.client.find_one_and_delete.assert_awaited_once_with(
+        {"swiftCode": TEST_SWIFT_CODE_HQ}, DELETED_PROJECTION
     )
 
 
 def test_delete_swift_code_not_found(client, mock_swift_repository):
     """Test deleting a SWIFT code that does not exist."""
-    mock_swift_repository.client.delete_item.return_value = DeleteResult(
-        {"n": 0}, acknowledged=True
-    )
+    mock_swift_repository.client.find_one_and_delete.return_value = None
 
     response = client.delete(f"/v1/swift-codes/{TEST_NONEXISTENT_CODE}")
 
@@ -350,8 +362,8 @@ def test_delete_swift_code_not_found(client, mock_swift_repository):
     assert response.json() == {
         "detail": f"SWIFT code {TEST_NONEXISTENT_CODE} not found."
     }
-    mock_swift_repository.client.delete_item.assert_awaited_once_with(
-        {"swiftCode": TEST_NONEXISTENT_CODE}
+    mock_swift_repository.client.find_one_and_delete.assert_awaited_once_with(
+        {"swiftCode": TEST_NONEXISTENT_CODE}, DELETED_PROJECTION
     )
 
 
@@ -366,4 +378,418 @@ def test_delete_swift_code_invalid_format(
     response = client.delete(f"/v1/swift-codes/{invalid_swift_code}")
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     assert "Invalid SWIFT code format" in response.json()["detail"]
+    mock_swift_repository.client.find_one_and_delete.assert_not_awaited()
+
+
+def test_get_swift_index_stats(client, hq_swift_dict):
+    """Test reading the in-memory index statistics."""
+    index = SwiftIndex()
+    index.upsert(hq_swift_dict)
+    index.built_at = 1700000000.0
+    index.build_seconds = 0.5
+
+    async def override_get_swift_index():
+        return index
+
+    app.dependency_overrides[get_swift_index] = override_get_swift_index
+    response = client.get("/v1/swift-codes/index/stats")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "size": 1,
+        "countries": 1,
+        "builtAt": 1700000000.0,
+        "buildSeconds": 0.5,
+    }
+
+
+def test_get_swift_index_stats_disabled(client):
+    """Test reading index statistics when the in-memory index is disabled."""
+
+    async def override_get_swift_index():
+        return None
+
+    app.dependency_overrides[get_swift_index] = override_get_swift_index
+    response = client.get("/v1/swift-codes/index/stats")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_batch_get_swift_codes(
+    client, mock_swift_repository, hq_swift_dict, branch_swift_dict
+):
+    """Test looking up several SWIFT codes in one request."""
+    codes_cursor = MagicMock()
+    codes_cursor.to_list = AsyncMock(return_value=[hq_swift_dict, branch_swift_dict])
+
+    async def branches_iter():
+        yield branch_swift_dict
+
+    mock_swift_repository.client.find.side_effect = [codes_cursor, branches_iter()]
+
+    payload = {
+        "swiftCodes": [
+            TEST_SWIFT_CODE_HQ,
+            TEST_SWIFT_CODE_BRANCH.lower(),
+            TEST_NONEXISTENT_CODE,
+            "INVALID",
+        ]
+    }
+    response = client.post("/v1/swift-codes/batch-get", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["swiftCode"], r["status"]) for r in results] == [
+        (TEST_SWIFT_CODE_HQ, "found"),
+        (TEST_SWIFT_CODE_BRANCH, "found"),
+        (TEST_NONEXISTENT_CODE, "not_found"),
+        ("INVALID", "invalid"),
+    ]
+    assert [b["swiftCode"] for b in results[0]["data"]["branches"]] == [
+        TEST_SWIFT_CODE_BRANCH
+    ]
+    assert "branches" not in results[1]["data"]
+    assert results[2]["data"] is None
+    assert results[3]["detail"].startswith("Invalid SWIFT code format")
+    # One query for the codes, one for the branches of every headquarter
+    assert mock_swift_repository.client.find.call_count == 2
+
+
+def test_batch_get_swift_codes_too_many(client, mock_swift_repository):
+    """Test that oversized batches are rejected before touching the database."""
+    with patch("swiftatlas.settings.SWIFT_BATCH_MAX_CODES", 2):
+        response = client.post(
+            "/v1/swift-codes/batch-get",
+            json={"swiftCodes": [TEST_SWIFT_CODE_HQ] * 3},
+        )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_swift_repository.client.find.assert_not_called()
+
+
+def test_bulk_add_swift_codes(
+    client, mock_swift_repository, hq_swift_detailed, branch_swift_detailed
+):
+    """Test bulk creation with created, duplicate and invalid items."""
+    mock_swift_repository.client.put_items = AsyncMock(
+        side_effect=BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000"}]}
+        )
+    )
+
+    payload = {
+        "swiftCodes": [
+            hq_swift_detailed.model_dump(),
+            {"swiftCode": "BROKEN"},
+            branch_swift_detailed.model_dump(),
+        ]
+    }
+    response = client.post("/v1/swift-codes/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["swiftCode"], r["status"]) for r in results] == [
+        (TEST_SWIFT_CODE_HQ, "created"),
+        ("BROKEN", "invalid"),
+        (TEST_SWIFT_CODE_BRANCH, "duplicate"),
+    ]
+    assert results[1]["detail"]
+    # A single write, no read-before-write
+    mock_swift_repository.client.put_items.assert_awaited_once()
+    assert len(mock_swift_repository.client.put_items.call_args.args[0]) == 2
+    mock_swift_repository.client.get_item.assert_not_awaited()
+
+
+def test_bulk_delete_swift_codes(client, mock_swift_repository):
+    """Test bulk deletion with deleted, not found and invalid items."""
+
+    async def existing_iter():
+        yield {"swiftCode": TEST_SWIFT_CODE_BRANCH}
+
+    mock_swift_repository.client.find.return_value = existing_iter()
+    mock_swift_repository.client.bulk_write = AsyncMock()
+
+    payload = {"swiftCodes": [TEST_SWIFT_CODE_BRANCH, TEST_NONEXISTENT_CODE, "INVALID"]}
+    response = client.request("DELETE", "/v1/swift-codes/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["swiftCode"], r["status"]) for r in results] == [
+        (TEST_SWIFT_CODE_BRANCH, "deleted"),
+        (TEST_NONEXISTENT_CODE, "not_found"),
+        ("INVALID", "invalid"),
+    ]
+    mock_swift_repository.client.bulk_write.assert_awaited_once()
     mock_swift_repository.client.delete_item.assert_not_awaited()
+
+
+def test_bulk_add_swift_codes_too_many(client, mock_swift_repository):
+    """Test that oversized bulk writes are rejected."""
+    with patch("swiftatlas.settings.SWIFT_BULK_MAX_ITEMS", 1):
+        response = client.post("/v1/swift-codes/bulk", json={"swiftCodes": [{}, {}]})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_swift_codes_by_country_paginated(
+    client, mock_swift_repository, hq_swift_dict, branch_swift_dict
+):
+    """Test fetching one page of a country's SWIFT codes."""
+
+    async def page_iter():
+        yield branch_swift_dict
+        yield hq_swift_dict
+
+    find = mock_swift_repository.client.find
+    find.return_value.sort.return_value.limit.return_value = page_iter()
+
+    response = client.get(f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}?limit=1")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [s["swiftCode"] for s in data["swiftCodes"]] == [TEST_SWIFT_CODE_BRANCH]
+    assert data["nextAfter"] == TEST_SWIFT_CODE_BRANCH
+
+
+def test_get_swift_codes_by_country_unpaginated_has_no_cursor(
+    client, mock_swift_repository, hq_swift_dict
+):
+    """Test that the full listing keeps its original shape."""
+
+    async def all_iter():
+        yield hq_swift_dict
+
+    mock_swift_repository.client.find.return_value = all_iter()
+
+    response = client.get(f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "nextAfter" not in response.json()
+
+
+def test_get_swift_codes_by_country_limit_too_large(client, mock_swift_repository):
+    """Test that page sizes above the configured maximum are rejected."""
+    with patch("swiftatlas.settings.SWIFT_COUNTRY_MAX_PAGE_SIZE", 10):
+        response = client.get(f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}?limit=11")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_swift_repository.client.find.assert_not_called()
+
+
+def test_get_swift_codes_by_country_stream(
+    client, mock_swift_repository, hq_swift_detailed, branch_swift_detailed
+):
+    """Test streaming a country's SWIFT codes as NDJSON."""
+    docs = [hq_swift_detailed.model_dump(), branch_swift_detailed.model_dump()]
+
+    async def stream_iter():
+        for doc in docs:
+            yield doc
+
+    mock_swift_repository.client.find.return_value.sort.return_value = stream_iter()
+
+    response = client.get(f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}?stream=true")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == docs
+
+
+def test_get_swift_codes_by_country_stream_not_found(client, mock_swift_repository):
+    """Test that streaming an unknown country still returns 404."""
+
+    async def empty_iter():
+        return
+        yield
+
+    mock_swift_repository.client.find.return_value.sort.return_value = empty_iter()
+
+    response = client.get(
+        f"/v1/swift-codes/country/{TEST_NONEXISTENT_COUNTRY}?stream=true"
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.fixture
+def mock_versions(client):
+    """Enables HTTP caching with a mocked version repository."""
+    versions = MagicMock(spec=VersionRepository)
+    versions.get_validators = AsyncMock(
+        return_value=('"v1"', datetime(2025, 1, 2, 12, 0, tzinfo=timezone.utc))
+    )
+
+    async def override_get_version_repository():
+        return versions
+
+    app.dependency_overrides[get_version_repository] = override_get_version_repository
+    return versions
+
+
+def test_get_swift_code_details_caching_headers(
+    client, mock_swift_repository, mock_versions, branch_swift_dict
+):
+    """Test that lookups carry ETag, Last-Modified and Cache-Control."""
+    mock_swift_repository.client.get_item.return_value = branch_swift_dict
+
+    response = client.get(f"/v1/swift-codes/{TEST_SWIFT_CODE_BRANCH}")
+
+    assert response.status_code == status.HTTP_200_OK
+    # TestClient accepts gzip, so the compression middleware weakens the ETag
+    assert response.headers["etag"] == 'W/"v1"'
+    assert response.headers["last-modified"] == "Thu, 02 Jan 2025 12:00:00 GMT"
+    assert "max-age" in response.headers["cache-control"]
+    mock_versions.get_validators.assert_awaited_once_with(
+        [f"prefix:{TEST_SWIFT_CODE_BRANCH[:8]}"], ANY
+    )
+
+
+def test_get_swift_code_details_not_modified(
+    client, mock_swift_repository, mock_versions
+):
+    """Test that a matching If-None-Match is answered without reading the code."""
+    response = client.get(
+        f"/v1/swift-codes/{TEST_SWIFT_CODE_HQ}", headers={"If-None-Match": '"v1"'}
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == 'W/"v1"'
+    mock_swift_repository.client.aggregate.assert_not_called()
+    mock_swift_repository.client.get_item.assert_not_awaited()
+
+
+def test_get_swift_codes_by_country_not_modified_since(
+    client, mock_swift_repository, mock_versions
+):
+    """Test that If-Modified-Since at or after Last-Modified returns 304."""
+    response = client.get(
+        f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}",
+        headers={"If-Modified-Since": "Thu, 02 Jan 2025 12:00:00 GMT"},
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    mock_swift_repository.client.find.assert_not_called()
+    mock_versions.get_validators.assert_awaited_once_with(
+        [f"country:{TEST_COUNTRY_ISO}"], ANY
+    )
+
+
+def test_get_swift_codes_by_country_stale_etag(
+    client, mock_swift_repository, mock_versions, hq_swift_dict
+):
+    """Test that a stale ETag gets the full response."""
+
+    async def async_gen():
+        yield hq_swift_dict
+
+    mock_swift_repository.client.find.return_value = async_gen()
+
+    response = client.get(
+        f"/v1/swift-codes/country/{TEST_COUNTRY_ISO}",
+        headers={"If-None-Match": '"v0"'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] == 'W/"v1"'
+
+
+def test_get_swift_code_details_cache_hit_after_external_bump(
+    client, mock_swift_repository, mock_versions, branch_swift_dict
+):
+    """Test that a cached body is not served under a version bumped elsewhere."""
+    mock_swift_repository.cache = TTLCache(max_size=10, ttl=60)
+    mock_swift_repository.client.get_item.return_value = branch_swift_dict
+    first = client.get(f"/v1/swift-codes/{TEST_SWIFT_CODE_BRANCH}")
+    assert first.json()["address"] == branch_swift_dict["address"]
+
+    # Another replica updates the branch and bumps its prefix version
+    updated = {**branch_swift_dict, "address": "NEW ADDRESS"}
+    mock_swift_repository.client.get_item.return_value = updated
+    mock_versions.get_validators.return_value = ('"v2"', None)
+
+    response = client.get(
+        f"/v1/swift-codes/{TEST_SWIFT_CODE_BRANCH}", headers={"If-None-Match": '"v1"'}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] == 'W/"v2"'
+    assert response.json()["address"] == "NEW ADDRESS"
+    assert mock_swift_repository.client.get_item.await_count == 2
+
+    # Served from the cache again while the version holds
+    client.get(f"/v1/swift-codes/{TEST_SWIFT_CODE_BRANCH}")
+    assert mock_swift_repository.client.get_item.await_count == 2
+
+
+def test_get_swift_code_details_versioned_read_skips_index(
+    client, mock_swift_repository, mock_versions, branch_swift_dict
+):
+    """Test that lookups served with an ETag do not come from the in-memory index."""
+    index = SwiftIndex()
+    index.upsert({**branch_swift_dict, "address": "STALE ADDRESS"})
+    index.built_at = 1700000000.0
+    mock_swift_repository.index = index
+    mock_swift_repository.client.get_item.return_value = branch_swift_dict
+
+    response = client.get(f"/v1/swift-codes/{TEST_SWIFT_CODE_BRANCH}")
+
+    assert response.json()["address"] == branch_swift_dict["address"]
+    mock_swift_repository.client.get_item.assert_awaited_once()
+
+
+def test_swift_repository_is_shared_across_requests():
+    """Test that the lifespan builds one repository that every request reuses."""
+    with patch("swiftatlas.settings.SWIFT_INDEX_BOOTSTRAP", "off"), TestClient(
+        app
+    ) as c:
+        repo = app.state.swift_repository
+        repo.get_swift_with_branches = AsyncMock(return_value=None)
+
+        for _ in range(2):
+            response = c.get(f"/v1/swift-codes/{TEST_NONEXISTENT_CODE}")
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        assert repo.get_swift_with_branches.await_count == 2
+        assert repo.client.collection == settings.MONGODB_COLLECTION_NAME
+
+
+@pytest.mark.asyncio
+async def test_add_swift_code_concurrent_duplicates(
+    mock_swift_repository, hq_swift_detailed
+):
+    """Test that simultaneous POSTs of one code create it exactly once."""
+    inserted = set()
+
+    async def put_item(doc):
+        # Let every request reach its insert before any of them completes
+        await asyncio.sleep(0.01)
+        if doc["swiftCode"] in inserted:
+            raise DuplicateKeyError(
+                "E11000 duplicate key error", DUPLICATE_KEY_ERROR_CODE
+            )
+        inserted.add(doc["swiftCode"])
+        return InsertOneResult(inserted_id=doc["swiftCode"], acknowledged=True)
+
+    mock_swift_repository.client.put_item.side_effect = put_item
+
+    async def override_get_swift_repository():
+        return mock_swift_repository
+
+    app.dependency_overrides[get_swift_repository] = override_get_swift_repository
+    payload = hq_swift_detailed.model_dump()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+        ) as async_client:
+            responses = await asyncio.gather(
+                *(async_client.post("/v1/swift-codes", json=payload) for _ in range(5))
+            )
+    finally:
+        app.dependency_overrides = {}
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [status.HTTP_201_CREATED] + [status.HTTP_409_CONFLICT] * 4
+    assert mock_swift_repository.client.put_item.await_count == 5
+    mock_swift_repository.client.get_item.assert_not_awaited()
@@ -0,0 +1,138 @@
+import pandas as pd
+
+from swiftatlas.schemas.swift_schemas import (
+    COUNTRY_ISO2_PATTERN,
+    HEADQUARTER_SUFFIX,
+    SWIFT_CODE_PATTERN,
+    SwiftCodeDetailed,
+)
+
+DETAILED_FIELDS = list(SwiftCodeDetailed.model_fields)
+REASON_COLUMN = "reason"
+
+# Values pydantic accepts for a bool field in lax mode, strings compared lowercased
+_BOOL_VALUES = {
+    True: True,
+    False: False,
+    "true": True,
+    "t": True,
+    "yes": True,
+    "y": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "f": False,
+    "no": False,
+    "n": False,
+    "off": False,
+    "0": False,
+}
+
+
+def _column(df: pd.DataFrame, field: str) -> pd.Series:
+    if field in df:
+        return df[field]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _string_column(df: pd.DataFrame, field: str) -> tuple[pd.Series, pd.Series]:
+    """Returns the stripped column and a mask of rows holding an actual string."""
+    column = _column(df, field).astype(object)
+    is_str = column.apply(isinstance, args=(str,)).astype(bool)
+    return column.where(is_str).str.strip(), is_str
+
+
+def _bool_column(df: pd.DataFrame, field: str) -> tuple[pd.Series, pd.Series]:
+    column = _column(df, field)
+    if pd.api.types.is_bool_dtype(column):
+        return column.astype(bool), pd.Series(True, index=df.index)
+    lowered = column.map(lambda v: v.lower() if isinstance(v, str) else v)
+    coerced = lowered.map(_BOOL_VALUES)
+    is_bool = coerced.notna()
+    return coerced.where(is_bool, False).astype(bool), is_bool
+
+
+def validate_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Applies the SwiftCodeDetailed validators to whole columns at once.
+
+    Returns a clean frame holding exactly the fields and values that
+    SwiftCodeDetailed(**row).model_dump() would produce, and a rejects frame
+    holding the original rows plus a reason column with the first failed rule.
+    """
+    reasons = pd.Series(None, index=df.index, dtype=object)
+
+    def reject(mask: pd.Series, reason):
+        nonlocal reasons
+        reasons = reasons.where(~mask | reasons.notna(), reason)
+
+    address, address_ok = _string_column(df, "address")
+    reject(~address_ok, "address must be a string")
+
+    bank_name, bank_name_ok = _string_column(df, "bankName")
+    reject(~bank_name_ok, "bankName must be a string")
+
+    country_iso2, country_iso2_ok = _string_column(df, "countryISO2")
+    country_iso2 = country_iso2.str.upper()
+    reject(~country_iso2_ok, "countryISO2 must be a string")
+    bad_iso2_length = country_iso2_ok & (country_iso2.str.len() != 2)
+    reject(bad_iso2_length, "countryISO2 must be 2 characters long")
+    bad_iso2_format = (
+        country_iso2_ok
+        & ~bad_iso2_length
+        & ~country_iso2.str.match(COUNTRY_ISO2_PATTERN, na=False)
+    )
+    reject(bad_iso2_format, "countryISO2 must contain only uppercase letters")
+
+    is_headquarter, is_headquarter_ok = _bool_column(df, "isHeadquarter")
+    reject(~is_headquarter_ok, "isHeadquarter must be a valid boolean")
+
+    swift_code, swift_code_ok = _string_column(df, "swiftCode")
+    swift_code = swift_code.str.upper()
+    reject(~swift_code_ok, "swiftCode must be a string")
+    code_length = swift_code.str.len()
+    bad_code_length = swift_code_ok & ~code_length.isin([8, 11])
+    reject(
+        bad_code_length,
+        "SWIFT code '" + swift_code + "' must be 8 or 11 characters long.",
+    )
+    swift_code = swift_code.where(code_length != 8, swift_code + HEADQUARTER_SUFFIX)
+    bad_code_format = (
+        swift_code_ok
+        & ~bad_code_length
+        & ~swift_code.str.match(SWIFT_CODE_PATTERN, na=False)
+    )
+    reject(
+        bad_code_format,
+        "Input '" + swift_code + "' has an invalid SWIFT code format.",
+    )
+
+    country_name, country_name_ok = _string_column(df, "countryName")
+    country_name = country_name.str.upper()
+    reject(~country_name_ok, "countryName must be a string")
+
+    # Model-level rule, only reached by rows whose fields are all valid
+    ends_with_suffix = swift_code.str.endswith(HEADQUARTER_SUFFIX, na=False)
+    reject(
+        ends_with_suffix & ~is_headquarter,
+        f"If swiftCode ends with '{HEADQUARTER_SUFFIX}', isHeadquarter must be True",
+    )
+    reject(
+        ~ends_with_suffix & is_headquarter,
+        f"If isHeadquarter is True, swiftCode must end with '{HEADQUARTER_SUFFIX}'",
+    )
+
+    rejected = reasons.notna()
+    clean = pd.DataFrame(
+        {
+            "address": address,
+            "bankName": bank_name,
+            "countryISO2": country_iso2,
+            "isHeadquarter": is_headquarter,
+            "swiftCode": swift_code,
+            "countryName": country_name,
+        },
+        index=df.index,
+    )[DETAILED_FIELDS]
+    rejects = df.assign(**{REASON_COLUMN: reasons})
+    return clean[~rejected], rejects[rejected]
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from swiftatlas.import_data import prepare_frame
+from swiftatlas.readers.swift_readers import iter_excel_chunks
+from swiftatlas.schemas.swift_frames import REASON_COLUMN, validate_frame
+from swiftatlas.schemas.swift_schemas import SwiftCodeDetailed
+
+
+def valid_row(**overrides):
+    row = {
+        "address": " 1 Main St ",
+        "bankName": " Test Bank ",
+        "countryISO2": " pl ",
+        "isHeadquarter": True,
+        "swiftCode": " bankplpwxxx ",
+        "countryName": " poland ",
+    }
+    row.update(overrides)
+    return row
+
+
+EDGE_CASE_ROWS = [
+    valid_row(),
+    valid_row(swiftCode="bankplpw"),  # 8 chars, padded to XXX
+    valid_row(swiftCode="BANKPLPWABC", isHeadquarter=False),
+    valid_row(swiftCode="BANKPLPWABC"),  # HQ flag without XXX suffix
+    valid_row(isHeadquarter=False),  # XXX suffix without HQ flag
+    valid_row(swiftCode="SHORT"),
+    valid_row(swiftCode="BANK!LPWXXX"),
+    valid_row(swiftCode="1ANKPLPWXXX"),
+    valid_row(swiftCode=None),
+    valid_row(swiftCode=12345678),
+    valid_row(countryISO2="POL"),
+    valid_row(countryISO2="P1"),
+    valid_row(countryISO2=np.nan),
+    valid_row(address=np.nan),
+    valid_row(bankName=None),
+    valid_row(countryName=7),
+    valid_row(isHeadquarter="yes"),
+    valid_row(isHeadquarter="maybe"),
+    valid_row(isHeadquarter=1),
+    valid_row(isHeadquarter=None),
+]
+
+
+def pydantic_path(rows):
+    documents, rejected = [], []
+    for i, row in enumerate(rows):
+        try:
+            documents.append(SwiftCodeDetailed(**row).model_dump())
+        except ValidationError:
+            rejected.append(i)
+    return documents, rejected
+
+
+def test_validate_frame_matches_pydantic():
+    df = pd.DataFrame(EDGE_CASE_ROWS)
+    clean, rejects = validate_frame(df)
+
+    expected_documents, expected_rejected = pydantic_path(EDGE_CASE_ROWS)
+    assert clean.to_dict("records") == expected_documents
+    assert rejects.index.tolist() == expected_rejected
+
+
+def test_validate_frame_matches_pydantic_on_source_file():
+    file_path = "swiftatlas/data/Interns_2025_SWIFT_CODES.xlsx"
+    df = pd.concat(
+        [prepare_frame(c) for c in iter_excel_chunks(file_path, 500)],
+        ignore_index=True,
+    )
+    clean, rejects = validate_frame(df)
+
+    expected_documents, expected_rejected = pydantic_path(df.to_dict("records"))
+    assert clean.to_dict("records") == expected_documents
+    assert rejects.index.tolist() == expected_rejected
+
+
+def test_validate_frame_clean_values():
+    clean, rejects = validate_frame(pd.DataFrame([valid_row(swiftCode="bankplpw")]))
+    assert rejects.empty
+    record = clean.to_dict("records")[0]
+    assert record == {
+        "address": "1 Main St",
+        "bankName": "Test Bank",
+        "countryISO2": "PL",
+        "isHeadquarter": True,
+        "swiftCode": "BANKPLPWXXX",
+        "countryName": "POLAND",
+    }
+    assert type(record["isHeadquarter"]) is bool
+
+
+@pytest.mark.parametrize(
+    "overrides, reason",
+    [
+        ({"countryISO2": "POL"}, "countryISO2 must be 2 characters long"),
+        ({"countryISO2": "P1"}, "countryISO2 must contain only uppercase letters"),
+        ({"swiftCode": "short"}, "SWIFT code 'SHORT' must be 8 or 11 characters long."),
+        (
+            {"swiftCode": "ABCD!FGH123", "isHeadquarter": False},
+            "Input 'ABCD!FGH123' has an invalid SWIFT code format.",
+        ),
+        (
+            {"isHeadquarter": False},
+            "If swiftCode ends with 'XXX', isHeadquarter must be True",
+        ),
+        (
+            {"swiftCode": "BANKPLPWABC"},
+            "If isHeadquarter is True, swiftCode must end with 'XXX'",
+        ),
+        ({"address": None}, "address must be a string"),
+    ],
+)
+def test_validate_frame_reject_reasons(overrides, reason):
+    row = valid_row(**overrides)
+    clean, rejects = validate_frame(pd.DataFrame([row]))
+    assert clean.empty
+    assert rejects[REASON_COLUMN].tolist() == [reason]
+    assert rejects["swiftCode"].tolist() == [row["swiftCode"]]
+
+
+def test_validate_frame_missing_column():
+    df = pd.DataFrame([valid_row()]).drop(columns=["countryName"])
+    clean, rejects = validate_frame(df)
+    assert clean.empty
+    assert rejects[REASON_COLUMN].tolist() == ["countryName must be a string"]
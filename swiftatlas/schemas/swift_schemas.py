@@ -4,7 +4,11 @@ from pydantic import (
     field_validator,
     model_validator,
 )
-from typing import List
+from typing import Any, Dict, List, Literal, Optional, Union
+
+COUNTRY_ISO2_PATTERN = r"^[A-Z]{2}$"
+SWIFT_CODE_PATTERN = r"^[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}[A-Z0-9]{3}$"
+HEADQUARTER_SUFFIX = "XXX"
 
 
 class SwiftCodeBase(BaseModel):
@@ -25,7 +29,7 @@ class SwiftCodeBase(BaseModel):
         v = v.strip().upper()
         if len(v) != 2:
             raise ValueError("countryISO2 must be 2 characters long")
-        if not re.match(r"^[A-Z]{2}$", v):
+        if not re.match(COUNTRY_ISO2_PATTERN, v):
             raise ValueError("countryISO2 must contain only uppercase letters")
         return v
 
@@ -42,12 +46,11 @@ class SwiftCodeBase(BaseModel):
             )
 
         if length == 8:
-            padded_v = v + "XXX"
+            padded_v = v + HEADQUARTER_SUFFIX
         else:
             padded_v = v
 
-        pattern_11 = r"^[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}[A-Z0-9]{3}$"
-        if not re.match(pattern_11, padded_v):
+        if not re.match(SWIFT_CODE_PATTERN, padded_v):
             raise ValueError(
                 f"Input '{original_input}' has an invalid SWIFT code format."
             )
@@ -93,6 +96,8 @@ class SwiftCodeCountryGroup(BaseModel):
     countryISO2: str
     countryName: str
     swiftCodes: List[SwiftCodeBase]
+    # swiftCode to pass as `after` for the next page, set only when more remain
+    nextAfter: Optional[str] = None
 
     @model_validator(mode="after")
     def check_country_iso2(self) -> "SwiftCodeCountryGroup":
@@ -102,3 +107,57 @@ class SwiftCodeCountryGroup(BaseModel):
                     f"Swift code '{swift_code.swiftCode}' countryISO2 '{swift_code.countryISO2}' does not match the country group '{self.countryISO2}'"
                 )
         return self
+
+
+# Trusted constructors for documents read back from MongoDB. Everything stored was
+# validated on write, so reads build their models without running validators again.
+def construct_headquarter_group(
+    doc: dict, branches: List[dict]
+) -> SwiftCodeHeadquarterGroup:
+    return SwiftCodeHeadquarterGroup.model_construct(
+        **{**doc, "branches": [SwiftCodeBase.model_construct(**b) for b in branches]}
+    )
+
+
+def construct_country_group(
+    country_iso2: str,
+    country_name: str,
+    docs: List[dict],
+    next_after: Optional[str] = None,
+) -> SwiftCodeCountryGroup:
+    return SwiftCodeCountryGroup.model_construct(
+        countryISO2=country_iso2,
+        countryName=country_name,
+        swiftCodes=[SwiftCodeBase.model_construct(**doc) for doc in docs],
+        nextAfter=next_after,
+    )
+
+
+class SwiftCodeBatchRequest(BaseModel):
+    swiftCodes: List[str]
+
+
+class SwiftCodeBatchResult(BaseModel):
+    swiftCode: str
+    status: Literal["found", "not_found", "invalid"]
+    detail: Optional[str] = None
+    data: Optional[Union[SwiftCodeHeadquarterGroup, SwiftCodeDetailed]] = None
+
+
+class SwiftCodeBatchResponse(BaseModel):
+    results: List[SwiftCodeBatchResult]
+
+
+class SwiftCodeBulkCreateRequest(BaseModel):
+    # Validated item by item, so one bad record does not reject the whole batch
+    swiftCodes: List[Dict[str, Any]]
+
+
+class SwiftCodeBulkResult(BaseModel):
+    swiftCode: Optional[str] = None
+    status: Literal["created", "duplicate", "deleted", "not_found", "invalid"]
+    detail: Optional[str] = None
+
+
+class SwiftCodeBulkResponse(BaseModel):
+    results: List[SwiftCodeBulkResult]
@@ -6,6 +6,8 @@ from swiftatlas.schemas.swift_schemas import (
     SwiftCodeDetailed,
     SwiftCodeHeadquarterGroup,
     SwiftCodeCountryGroup,
+    construct_country_group,
+    construct_headquarter_group,
 )
 
 # --- Helper Fixtures for Test Data ---
@@ -265,3 +267,53 @@ def test_swift_code_country_group_invalid_country_mismatch(country_group_data):
         "Swift code 'BANKTWOADFS' countryISO2 'US' does not match the country group 'CA'"
         in str(excinfo.value)
     )
+
+
+# --- Tests for trusted constructors ---
+
+
+def test_construct_headquarter_group_matches_validated():
+    hq = SwiftCodeDetailed(
+        address="HQ Ave",
+        bankName="HQ Bank",
+        countryISO2="FR",
+        isHeadquarter=True,
+        swiftCode="HQCODEFRXXX",
+        countryName="FRANCE",
+    )
+    branch = SwiftCodeBase(
+        address="Branch St",
+        bankName="Branch Bank",
+        countryISO2="FR",
+        isHeadquarter=False,
+        swiftCode="HQCODEFRERT",
+    )
+    doc = {**hq.model_dump(), "_id": "ignored", "branches": "ignored"}
+
+    model = construct_headquarter_group(doc, [branch.model_dump()])
+
+    assert isinstance(model.branches[0], SwiftCodeBase)
+    assert (
+        model.model_dump_json()
+        == SwiftCodeHeadquarterGroup(
+            **hq.model_dump(), branches=[branch]
+        ).model_dump_json()
+    )
+
+
+def test_construct_country_group_skips_validation():
+    # Stored documents are trusted, so even an out-of-country code is not rejected
+    docs = [
+        {
+            "address": "A",
+            "bankName": "B",
+            "countryISO2": "US",
+            "isHeadquarter": True,
+            "swiftCode": "BANKONE1XXX",
+        }
+    ]
+
+    model = construct_country_group("CA", "CANADA", docs, next_after="BANKONE1XXX")
+
+    assert model.swiftCodes[0].countryISO2 == "US"
+    assert model.nextAfter == "BANKONE1XXX"